@@ -21,6 +21,7 @@ from srunner.scenariomanager.timer import GameTime
 from leaderboard.envs.sensor_interface import CallBack, OpenDriveMapReader, SpeedometerReader, SensorConfigurationInvalid
 from leaderboard.autoagents.autonomous_agent import Track
 from leaderboard.autoagents.ros_base_agent import ROSBaseAgent
+from leaderboard.utils.tick_profiler import TickProfiler
 
 MAX_ALLOWED_RADIUS_SENSOR = 3.0
 QUALIFIER_SENSORS_LIMITS = {
@@ -136,7 +137,8 @@ class AgentWrapper(object):
         """
         Pass the call directly to the agent
         """
-        return self._agent()
+        with TickProfiler.timer('agent'):
+            return self._agent()
 
     def _preprocess_sensor_spec(self, sensor_spec):
         type_ = sensor_spec["type"]
@@ -251,8 +253,9 @@ class AgentWrapper(object):
                     bp.set_attribute(str(key), str(value))
                 sensor = CarlaDataProvider.get_world().spawn_actor(bp, sensor_transform, vehicle)
 
-            # setup callback
-            sensor.listen(CallBack(id_, type_, sensor, self._agent.sensor_interface))
+            # setup callback. Cameras can ask for RGB images instead of the raw BGRA ones
+            image_format = sensor_spec.get('format', 'bgra')
+            sensor.listen(CallBack(id_, type_, sensor, self._agent.sensor_interface, image_format))
             self._sensors_list.append(sensor)
 
         # Some sensors miss sending data during the first ticks, so tick several times and remove the data
@@ -16,6 +16,7 @@ from srunner.scenariomanager.timer import GameTime
 
 from leaderboard.utils.route_manipulation import downsample_route
 from leaderboard.envs.sensor_interface import SensorInterface
+from leaderboard.utils.tick_profiler import TickProfiler
 
 
 class Track(Enum):
@@ -71,6 +72,9 @@ class AutonomousAgent(object):
              'id': 'LIDAR'}
         ]
 
+        Cameras accept an optional 'format' key: 'bgra' (default) gives the raw BGRA image, while 'rgb'
+        gives an RGB image without the alpha channel. Sensor data is handed out as read-only arrays,
+        which are reused after a few frames, so copy any data that has to be kept across steps.
         """
         sensors = []
 
@@ -114,7 +118,8 @@ class AutonomousAgent(object):
         print('=== [Agent] -- Wallclock = {} -- System time = {} -- Game time = {} -- Ratio = {}x'.format(
             str(wallclock)[:-3], format(wallclock_diff, '.3f'), format(timestamp, '.3f'), format(sim_ratio, '.3f')))
 
-        control = self.run_step(input_data, timestamp)
+        with TickProfiler.timer('agent.run_step'):
+            control = self.run_step(input_data, timestamp)
         control.manual_gear_shift = False
 
         return control
@@ -1,26 +1,14 @@
-import copy
 import logging
 import numpy as np
 import os
 import time
-from threading import Thread
-
-from queue import Queue
-from queue import Empty
+from threading import Condition
 
 import carla
 from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
 from srunner.scenariomanager.timer import GameTime
 
-
-def threaded(fn):
-    def wrapper(*args, **kwargs):
-        thread = Thread(target=fn, args=args, kwargs=kwargs)
-        thread.setDaemon(True)
-        thread.start()
-
-        return thread
-    return wrapper
+from leaderboard.utils.tick_profiler import TickProfiler
 
 
 class SensorConfigurationInvalid(Exception):
@@ -48,43 +36,44 @@ class GenericMeasurement(object):
 
 
 class BaseReader(object):
+    """
+    Pseudo-sensor producing its measurements from the CarlaDataProvider tick callback,
+    so that they are generated right after each tick instead of by a polling thread
+    """
+
+    # Tolerance for the floating point accumulation of the game time
+    TIME_EPSILON = 1e-6
+
     def __init__(self, vehicle, reading_frequency=1.0):
         self._vehicle = vehicle
         self._reading_frequency = reading_frequency
         self._callback = None
-        self._run_ps = True
-        self.run()
+        self._latest_time = None
+        CarlaDataProvider.register_tick_callback(self._on_tick)
 
     def __call__(self):
         pass
 
-    @threaded
-    def run(self):
-        first_time = True
-        latest_time = GameTime.get_time()
-        while self._run_ps:
-            if self._callback is not None:
-                current_time = GameTime.get_time()
+    def _on_tick(self):
+        if self._callback is None:
+            return
 
-                # Second part forces the sensors to send data at the first tick, regardless of frequency
-                if current_time - latest_time > (1 / self._reading_frequency) \
-                        or (first_time and GameTime.get_frame() != 0):
-                    self._callback(GenericMeasurement(self.__call__(), GameTime.get_frame()))
-                    latest_time = GameTime.get_time()
-                    first_time = False
-
-                else:
-                    time.sleep(0.001)
+        # The first measurement is sent at the first tick, regardless of the frequency
+        current_time = GameTime.get_time()
+        if self._latest_time is None \
+                or current_time - self._latest_time >= (1 / self._reading_frequency) - self.TIME_EPSILON:
+            self._callback(GenericMeasurement(self.__call__(), GameTime.get_frame()))
+            self._latest_time = current_time
 
     def listen(self, callback):
         # Tell that this function receives what the producer does.
         self._callback = callback
 
     def stop(self):
-        self._run_ps = False
+        CarlaDataProvider.remove_tick_callback(self._on_tick)
 
     def destroy(self):
-        self._run_ps = False
+        CarlaDataProvider.remove_tick_callback(self._on_tick)
 
 
 class SpeedometerReader(BaseReader):
@@ -126,14 +115,56 @@ class SpeedometerReader(BaseReader):
 
 
 class OpenDriveMapReader(BaseReader):
+    """
+    Sensor giving the OpenDRIVE description of the map. It is serialized only once per map.
+    """
+    _cached_map = None
+    _cached_opendrive = None
+
     def __call__(self):
-        return {'opendrive': CarlaDataProvider.get_map().to_opendrive()}
+        carla_map = CarlaDataProvider.get_map()
+        if OpenDriveMapReader._cached_map is not carla_map:
+            OpenDriveMapReader._cached_opendrive = carla_map.to_opendrive()
+            OpenDriveMapReader._cached_map = carla_map
+
+        return {'opendrive': OpenDriveMapReader._cached_opendrive}
+
+
+class FrameRing(object):
+    """
+    Preallocated buffers reused by the measurements of one sensor. Each measurement is copied exactly once
+    into the next buffer, and a read-only view of it is handed out. As buffers are reused after 'size'
+    measurements, the data has to be copied by whoever needs to keep it for longer.
+    """
+
+    def __init__(self, size=4):
+        self._slots = [None] * size
+        self._index = 0
+
+    def write(self, source):
+        """Copies the source array into the next buffer and returns a read-only view with its shape"""
+        slot = self._slots[self._index]
+        if slot is None or slot.dtype != source.dtype or slot.size < source.size:
+            # Lidar and radar measurements change their size, so keep the largest buffer seen
+            slot = np.empty(source.size, dtype=source.dtype)
+            self._slots[self._index] = slot
+        self._index = (self._index + 1) % len(self._slots)
+
+        view = slot[:source.size].reshape(source.shape)
+        np.copyto(view, source)
+        view.flags.writeable = False
+        return view
 
 
 class CallBack(object):
-    def __init__(self, tag, sensor_type, sensor, data_provider):
+    def __init__(self, tag, sensor_type, sensor, data_provider, image_format='bgra'):
+        if image_format not in ('bgra', 'rgb'):
+            raise SensorConfigurationInvalid("Unknown image format [{}] for sensor [{}]".format(image_format, tag))
+
         self._tag = tag
         self._data_provider = data_provider
+        self._image_format = image_format
+        self._ring = FrameRing()
 
         self._data_provider.register_sensor(tag, sensor_type, sensor)
 
@@ -156,22 +187,24 @@ class CallBack(object):
     # Parsing CARLA physical Sensors
     def _parse_image_cb(self, image, tag):
         array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-        array = copy.deepcopy(array)
         array = np.reshape(array, (image.height, image.width, 4))
+        if self._image_format == 'rgb':
+            # Drop the alpha channel and reverse BGR as part of the single copy
+            array = array[:, :, 2::-1]
+        array = self._ring.write(array)
         self._data_provider.update_sensor(tag, array, image.frame)
 
     def _parse_lidar_cb(self, lidar_data, tag):
         points = np.frombuffer(lidar_data.raw_data, dtype=np.dtype('f4'))
-        points = copy.deepcopy(points)
         points = np.reshape(points, (int(points.shape[0] / 4), 4))
+        points = self._ring.write(points)
         self._data_provider.update_sensor(tag, points, lidar_data.frame)
 
     def _parse_radar_cb(self, radar_data, tag):
         # [depth, azimuth, altitute, velocity]
         points = np.frombuffer(radar_data.raw_data, dtype=np.dtype('f4'))
-        points = copy.deepcopy(points)
         points = np.reshape(points, (int(points.shape[0] / 4), 4))
-        points = np.flip(points, 1)
+        points = self._ring.write(np.flip(points, 1))
         self._data_provider.update_sensor(tag, points, radar_data.frame)
 
     def _parse_gnss_cb(self, gnss_data, tag):
@@ -198,9 +231,16 @@ class CallBack(object):
 class SensorInterface(object):
     def __init__(self):
         self._sensors_objects = {}
-        self._data_buffers = Queue()
         self._queue_timeout = 10
 
+        # Sensor data buffered per frame, as {frame: {tag: (frame, data, arrival time)}}
+        self._frames_buffer = {}
+        self._frames_condition = Condition()
+        self._last_frame = -1
+
+        # Arrival latency of each sensor with respect to the data request, as {tag: [count, total, max]}
+        self._latency_stats = {}
+
         # Only sensor that doesn't get the data on tick, needs special treatment
         self._opendrive_tag = None
 
@@ -209,6 +249,7 @@ class SensorInterface(object):
             raise SensorConfigurationInvalid("Duplicated sensor tag [{}]".format(tag))
 
         self._sensors_objects[tag] = sensor
+        self._latency_stats[tag] = [0, 0.0, 0.0]
 
         if sensor_type == 'sensor.opendrive_map': 
             self._opendrive_tag = tag
@@ -217,24 +258,59 @@ class SensorInterface(object):
         if tag not in self._sensors_objects:
             raise SensorConfigurationInvalid("The sensor with tag [{}] has not been created!".format(tag))
 
-        self._data_buffers.put((tag, frame, data))
+        with self._frames_condition:
+            if frame <= self._last_frame:
+                return  # Late data of a frame that has already been given to the agent
+            self._frames_buffer.setdefault(frame, {})[tag] = (frame, data, time.time())
+            self._frames_condition.notify_all()
 
     def get_data(self, frame):
-        """Read the queue to get the sensors data"""
-        try:
-            data_dict = {}
-            while len(data_dict.keys()) < len(self._sensors_objects.keys()):
-                # Don't wait for the opendrive sensor
-                if self._opendrive_tag and self._opendrive_tag not in data_dict.keys() \
-                        and len(self._sensors_objects.keys()) == len(data_dict.keys()) + 1:
+        """Wait until all the sensors, except the opendrive one, have sent the data of the given frame"""
+        request_time = time.time()
+        profile_start = time.perf_counter()
+        deadline = request_time + self._queue_timeout
+        required_tags = set(self._sensors_objects.keys())
+        required_tags.discard(self._opendrive_tag)
+
+        with self._frames_condition:
+            # Data of older frames will never be requested
+            for stale_frame in [f for f in self._frames_buffer if f < frame]:
+                del self._frames_buffer[stale_frame]
+
+            while True:
+                missing_tags = required_tags.difference(self._frames_buffer.get(frame, {}))
+                if not missing_tags:
                     break
 
-                sensor_data = self._data_buffers.get(True, self._queue_timeout)
-                if sensor_data[1] != frame:
-                    continue
-                data_dict[sensor_data[0]] = ((sensor_data[1], sensor_data[2]))
+                remaining_time = deadline - time.time()
+                if remaining_time <= 0:
+                    raise SensorReceivedNoData("The sensors {} took too long to send their data".format(
+                        sorted(missing_tags)))
+                self._frames_condition.wait(remaining_time)
 
-        except Empty:
-            raise SensorReceivedNoData("A sensor took too long to send their data")
+            frame_data = self._frames_buffer.pop(frame, {})
+            self._last_frame = max(self._last_frame, frame)
 
+        data_dict = {}
+        for tag, (data_frame, data, arrival_time) in frame_data.items():
+            data_dict[tag] = (data_frame, data)
+
+            latency = max(0.0, arrival_time - request_time)
+            stats = self._latency_stats[tag]
+            stats[0] += 1
+            stats[1] += latency
+            stats[2] = max(stats[2], latency)
+
+        TickProfiler.add_sample('sensor_interface.get_data', time.perf_counter() - profile_start, profile_start)
         return data_dict
+
+    def get_latency_stats(self):
+        """Returns the mean and max time (in seconds) each sensor's data arrived after it was requested"""
+        latency_stats = {}
+        for tag, (count, total, maximum) in self._latency_stats.items():
+            latency_stats[tag] = {
+                'count': count,
+                'mean': total / count if count else 0.0,
+                'max': maximum
+            }
+        return latency_stats
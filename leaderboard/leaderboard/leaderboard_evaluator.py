@@ -33,6 +33,9 @@ from leaderboard.envs.sensor_interface import SensorConfigurationInvalid
 from leaderboard.autoagents.agent_wrapper import AgentError, validate_sensor_configuration
 from leaderboard.utils.statistics_manager import StatisticsManager, FAILURE_MESSAGES
 from leaderboard.utils.route_indexer import RouteIndexer
+from leaderboard.utils.route_manipulation import set_route_cache_dir
+from leaderboard.utils.route_sharding import ShardCoordinator
+from leaderboard.utils.tick_profiler import TickProfiler
 
 
 sensors_to_icons = {
@@ -77,6 +80,11 @@ class LeaderboardEvaluator(object):
 
         # Setup the simulation
         self.client, self.client_timeout, self.traffic_manager = self._setup_simulation(args)
+        set_route_cache_dir(args.route_cache)
+
+        # Profile the ticks, saving the timers of each route into its statistics
+        self._profile_trace = args.profile_trace
+        TickProfiler.enable(args.profile or bool(args.profile_trace), trace=bool(args.profile_trace))
 
         dist = pkg_resources.get_distribution("carla")
         if dist.version != 'leaderboard':
@@ -89,7 +97,7 @@ class LeaderboardEvaluator(object):
         self.module_agent = importlib.import_module(module_name)
 
         # Create the ScenarioManager
-        self.manager = ScenarioManager(args.timeout, self.statistics_manager, args.debug)
+        self.manager = ScenarioManager(args.timeout, self.statistics_manager, args.debug, args.live_results)
 
         # Time control for summary purposes
         self._start_time = GameTime.get_time()
@@ -242,6 +250,21 @@ class LeaderboardEvaluator(object):
             route_index, self.manager.scenario_duration_system, self.manager.scenario_duration_game, crash_message
         )
 
+        if TickProfiler.is_enabled():
+            profile = TickProfiler.get_summary()
+            try:
+                profile['waypoint_cache'] = CarlaDataProvider.get_waypoint_cache().get_stats()
+            except ValueError:
+                pass  # The world was never loaded
+            profile['actor_recycling'] = CarlaDataProvider.get_actor_recycling_stats()
+            profile['command_batch'] = CarlaDataProvider.command_batch().get_stats()
+            if self.agent_instance is not None:
+                profile['sensor_latency'] = self.agent_instance.sensor_interface.get_latency_stats()
+            self.statistics_manager.save_route_profile(route_index, profile)
+            if self._profile_trace:
+                route_id = self.statistics_manager.get_route_id(route_index)
+                TickProfiler.dump_trace(os.path.join(self._profile_trace, "{}.json".format(route_id)))
+
     def _load_and_run_scenario(self, args, config):
         """
         Load and run the scenario given by config.
@@ -263,6 +286,9 @@ class LeaderboardEvaluator(object):
         # Load the world and the scenario
         try:
             self._load_and_wait_for_world(args, config.town)
+            if TickProfiler.is_enabled():
+                # The caches are kept between routes, but their statistics are given per route
+                CarlaDataProvider.reset_stats()
             self.route_scenario = RouteScenario(world=self.world, config=config, debug_mode=args.debug)
             self.statistics_manager.set_scenario(self.route_scenario)
 
@@ -374,11 +400,12 @@ class LeaderboardEvaluator(object):
         # If the simulation crashed, stop the leaderboard, for the rest, move to the next route
         return crash_message == "Simulation crashed"
 
-    def run(self, args):
+    def run(self, args, route_indexer=None):
         """
-        Run the challenge mode
+        Run the challenge mode. Returns True if the simulation crashed
         """
-        route_indexer = RouteIndexer(args.routes, args.repetitions, args.routes_subset)
+        if route_indexer is None:
+            route_indexer = RouteIndexer(args.routes, args.repetitions, args.routes_subset)
 
         if args.resume:
             resume = route_indexer.validate_and_resume(args.checkpoint)
@@ -416,6 +443,7 @@ class LeaderboardEvaluator(object):
             self.statistics_manager.compute_global_statistics()
             self.statistics_manager.validate_and_write_statistics(self.sensors_initialized, crashed)
 
+        self.statistics_manager.close_live_results()
         return crashed
 
 def main():
@@ -445,6 +473,18 @@ def main():
                         help='Execute a specific set of routes')
     parser.add_argument('--repetitions', type=int, default=1,
                         help='Number of repetitions per route.')
+    parser.add_argument('--route-cache', type=str, default='',
+                        help='Folder where the interpolated routes are stored, to reuse them across runs')
+
+    # sharded execution
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of CARLA servers the routes are run at, one worker process per server (default: 1)')
+    parser.add_argument('--worker-hosts', type=str, nargs='+', default=None,
+                        help='Hosts of the servers of each worker (default: --host)')
+    parser.add_argument('--worker-ports', type=int, nargs='+', default=None,
+                        help='Ports of the servers of each worker (default: --port, spaced by 3 per worker)')
+    parser.add_argument('--worker-traffic-manager-ports', type=int, nargs='+', default=None,
+                        help='Traffic Manager ports of each worker (default: --traffic-manager-port, plus the worker index)')
 
     # agent-related options
     parser.add_argument("-a", "--agent", type=str,
@@ -459,15 +499,36 @@ def main():
     parser.add_argument("--checkpoint", type=str, default='./simulation_results.json',
                         help="Path to checkpoint used for saving statistics and resuming")
     parser.add_argument("--debug-checkpoint", type=str, default='./live_results.txt',
-                        help="Path to checkpoint used for saving live results")
+                        help="Path to checkpoint used for saving live results. Use 'http://<host>:<port>' or\n"
+                             "'unix:<path>' to serve them as json instead")
+    parser.add_argument("--live-results", action="store_true",
+                        help="Publish the live results without the rest of the debug output of '--debug 2'")
+    parser.add_argument("--live-period", type=float, default=1.0,
+                        help="Minimum wall-clock seconds between live results updates (default: 1.0)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each part of the ticks, adding their percentiles to the route statistics")
+    parser.add_argument("--profile-trace", type=str, default='',
+                        help="Folder where the Chrome trace of each route is saved, enables '--profile'")
+    parser.add_argument("--checkpoint-journal", action="store_true",
+                        help="Append the checkpoint changes to a journal next to it, writing the checkpoint at the end")
 
     arguments = parser.parse_args()
 
-    statistics_manager = StatisticsManager(arguments.checkpoint, arguments.debug_checkpoint)
-    leaderboard_evaluator = LeaderboardEvaluator(arguments, statistics_manager)
-    crashed = leaderboard_evaluator.run(arguments)
+    if arguments.workers > 1:
+        for name in ('worker_ports', 'worker_traffic_manager_ports'):
+            values = getattr(arguments, name)
+            if values and len(values) != arguments.workers:
+                parser.error("--{} needs one value per worker".format(name.replace('_', '-')))
+
+        crashed = ShardCoordinator(arguments).run()
+    else:
+        statistics_manager = StatisticsManager(arguments.checkpoint, arguments.debug_checkpoint,
+                                               journal=arguments.checkpoint_journal,
+                                               live_period=arguments.live_period)
+        leaderboard_evaluator = LeaderboardEvaluator(arguments, statistics_manager)
+        crashed = leaderboard_evaluator.run(arguments)
 
-    del leaderboard_evaluator
+        del leaderboard_evaluator
 
     if crashed:
         sys.exit(-1)
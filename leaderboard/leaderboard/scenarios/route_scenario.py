@@ -11,11 +11,6 @@ This module provides Challenge routes as standalone scenarios
 
 from __future__ import print_function
 
-import glob
-import os
-import sys
-import importlib
-import inspect
 import py_trees
 import traceback
 import numpy as np
@@ -38,6 +33,8 @@ from srunner.scenariomanager.scenarioatomics.atomic_criteria import (CollisionTe
                                                                      MinimumSpeedRouteTest)
 
 from srunner.scenarios.basic_scenario import BasicScenario
+from srunner.tools.route_geometry import RouteGeometry
+from srunner.tools.scenario_registry import get_scenario_registry
 from srunner.scenarios.background_activity import BackgroundBehavior
 from srunner.scenariomanager.weather_sim import RouteWeatherBehavior
 from srunner.scenariomanager.lights_sim import RouteLightsBehavior
@@ -46,7 +43,7 @@ from srunner.scenariomanager.timer import RouteTimeoutBehavior
 from leaderboard.utils.route_parser import RouteParser, DIST_THRESHOLD
 from leaderboard.utils.route_manipulation import interpolate_trajectory
 
-import leaderboard.utils.parked_vehicles as parked_vehicles
+from leaderboard.utils.parking_index import get_parking_index
 
 
 class RouteScenario(BasicScenario):
@@ -80,7 +77,8 @@ class RouteScenario(BasicScenario):
 
         self.list_scenarios = []
         self.occupied_parking_locations = []
-        self.available_parking_locations = []
+        self.available_parking_slots = np.array([], dtype=np.int64)
+        self._parking_index = None
 
         scenario_configurations = self._filter_scenarios(config.scenario_configs)
         self.scenario_configurations = scenario_configurations
@@ -130,9 +128,10 @@ class RouteScenario(BasicScenario):
         - scenario_configs: list of ScenarioConfiguration
         """
         new_scenarios_config = []
+        route_geometry = RouteGeometry(self.route)
         for scenario_number, scenario_config in enumerate(scenario_configs):
             trigger_point = scenario_config.trigger_points[0]
-            if not RouteParser.is_scenario_at_route(trigger_point, self.route):
+            if not RouteParser.is_scenario_at_route(trigger_point, route_geometry):
                 print("WARNING: Ignoring scenario '{}' as it is too far from the route".format(scenario_config.name))
                 continue
 
@@ -161,76 +160,45 @@ class RouteScenario(BasicScenario):
         return ego_vehicle
 
     def _get_parking_slots(self, max_distance=100, route_step=10):
-        """Spawn parked vehicles."""
-
-        def is_close(slot_location):
-            for i in range(0, len(self.route), route_step):
-                route_transform = self.route[i][0]
-                if route_transform.location.distance(slot_location) < max_distance:
-                    return True
-            return False
-
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = float('-inf'), float('-inf')
-        for route_transform, _ in self.route:
-            min_x = min(min_x, route_transform.location.x - max_distance)
-            min_y = min(min_y, route_transform.location.y - max_distance)
-            max_x = max(max_x, route_transform.location.x + max_distance)
-            max_y = max(max_y, route_transform.location.y + max_distance)
-
-        # Occupied parking locations
-        occupied_parking_locations = []
-        for scenario in self.list_scenarios:
-            occupied_parking_locations.extend(scenario.get_parking_slots())
-
-        available_parking_locations = []
+        """Get the parking slots close to the route, which are the candidates to spawn parked vehicles."""
         map_name = self.map.name.split('/')[-1]
-        available_parking_locations = getattr(parked_vehicles, map_name, [])
-
-        # Exclude parking slots that are too far from the route
-        for slot in available_parking_locations:
-            slot_transform = carla.Transform(
-                location=carla.Location(slot["location"][0], slot["location"][1], slot["location"][2]),
-                rotation=carla.Rotation(slot["rotation"][0], slot["rotation"][1], slot["rotation"][2])
-            )
+        self._parking_index = get_parking_index(map_name)
 
-            in_area = (min_x < slot_transform.location.x < max_x) and (min_y < slot_transform.location.y < max_y)
-            close_to_route = is_close(slot_transform.location)
-            if not in_area or not close_to_route:
-                available_parking_locations.remove(slot)
-                continue
+        route_points = [[t.location.x, t.location.y, t.location.z] for t, _ in self.route[::route_step]]
+        last_location = self.route[-1][0].location
+        route_points.append([last_location.x, last_location.y, last_location.z])
 
-        self.available_parking_locations = available_parking_locations
+        self.available_parking_slots = self._parking_index.near_polyline(route_points, max_distance)
 
     def spawn_parked_vehicles(self, ego_vehicle, max_scenario_distance=10):
         """Spawn parked vehicles."""
-        def is_close(slot_location, ego_location):
-            return slot_location.distance(ego_location) < self.PARKED_VEHICLES_INIT_THRESHOLD
-        def is_free(slot_location):
-            for occupied_slot in self.occupied_parking_locations:
-                if slot_location.distance(occupied_slot) < max_scenario_distance:
-                    return False
-            return True
-
-        new_parked_vehicles = []
+        if len(self.available_parking_slots) == 0:
+            return
 
         ego_location = CarlaDataProvider.get_location(ego_vehicle)
         if ego_location is None:
             return
 
-        for slot in self.available_parking_locations:
-            slot_transform = carla.Transform(
-                location=carla.Location(slot["location"][0], slot["location"][1], slot["location"][2]),
-                rotation=carla.Rotation(slot["rotation"][0], slot["rotation"][1], slot["rotation"][2])
-            )
+        # Add all vehicles that are close to the ego and in a free space
+        slots = self.available_parking_slots
+        is_close = self._parking_index.near_points(
+            [[ego_location.x, ego_location.y, ego_location.z]], self.PARKED_VEHICLES_INIT_THRESHOLD, slots)
+        occupied_points = [[loc.x, loc.y, loc.z] for loc in self.occupied_parking_locations]
+        is_free = ~self._parking_index.near_points(occupied_points, max_scenario_distance, slots[is_close])
+
+        spawned_slots = slots[is_close][is_free]
+        if len(spawned_slots) == 0:
+            return
+
+        new_parked_vehicles = []
+        mesh_id = CarlaDataProvider.get_blueprint_ids("static.prop.mesh")[0]
+        for slot in spawned_slots:
+            mesh_bp = CarlaDataProvider.get_blueprint(mesh_id)
+            mesh_bp.set_attribute("mesh_path", self._parking_index.get_mesh(slot))
+            mesh_bp.set_attribute("scale", "0.9")
+            new_parked_vehicles.append(carla.command.SpawnActor(mesh_bp, self._parking_index.get_transform(slot)))
 
-            # Add all vehicles that are close to the ego and in a free space
-            if is_close(slot_transform.location, ego_location) and is_free(slot_transform.location):
-                mesh_bp = CarlaDataProvider.get_world().get_blueprint_library().filter("static.prop.mesh")[0]
-                mesh_bp.set_attribute("mesh_path", slot["mesh"])
-                mesh_bp.set_attribute("scale", "0.9")
-                new_parked_vehicles.append(carla.command.SpawnActor(mesh_bp, slot_transform))
-                self.available_parking_locations.remove(slot)
+        self.available_parking_slots = np.setdiff1d(slots, spawned_slots, assume_unique=True)
 
         # Add the actors to _parked_ids
         for response in CarlaDataProvider.get_client().apply_batch_sync(new_parked_vehicles):
@@ -270,26 +238,10 @@ class RouteScenario(BasicScenario):
 
     def get_all_scenario_classes(self):
         """
-        Searches through the 'scenarios' folder for all the Python classes
+        Returns the registry of the Python classes at the 'scenarios' folder. It is shared by all routes,
+        and the scenario modules are only imported once one of their classes is used
         """
-        # Path of all scenario at "srunner/scenarios" folder
-        scenarios_list = glob.glob("{}/srunner/scenarios/*.py".format(os.getenv('SCENARIO_RUNNER_ROOT', "./")))
-
-        all_scenario_classes = {}
-
-        for scenario_file in scenarios_list:
-
-            # Get their module
-            module_name = os.path.basename(scenario_file).split('.')[0]
-            sys.path.insert(0, os.path.dirname(scenario_file))
-            scenario_module = importlib.import_module(module_name)
-
-            # And their members of type class
-            for member in inspect.getmembers(scenario_module, inspect.isclass):
-                # TODO: Filter out any class that isn't a child of BasicScenario
-                all_scenario_classes[member[0]] = member[1]
-
-        return all_scenario_classes
+        return get_scenario_registry()
 
     def build_scenarios(self, ego_vehicle, debug=False):
         """
@@ -26,6 +26,7 @@ from srunner.scenariomanager.watchdog import Watchdog
 from leaderboard.autoagents.agent_wrapper import AgentWrapperFactory, AgentError
 from leaderboard.envs.sensor_interface import SensorReceivedNoData
 from leaderboard.utils.result_writer import ResultOutputProvider
+from leaderboard.utils.tick_profiler import TickProfiler
 
 
 class ScenarioManager(object):
@@ -45,7 +46,7 @@ class ScenarioManager(object):
     4. If needed, cleanup with manager.stop_scenario()
     """
 
-    def __init__(self, timeout, statistics_manager, debug_mode=0):
+    def __init__(self, timeout, statistics_manager, debug_mode=0, live_results=False):
         """
         Setups up the parameters, which will be filled at load_scenario()
         """
@@ -56,6 +57,7 @@ class ScenarioManager(object):
         self.other_actors = None
 
         self._debug_mode = debug_mode
+        self._live_results = live_results or debug_mode > 1
         self._agent_wrapper = None
         self._running = False
         self._timestamp_last_run = 0.0
@@ -109,6 +111,7 @@ class ScenarioManager(object):
         """
 
         GameTime.restart()
+        TickProfiler.reset()
         self._agent_wrapper = AgentWrapperFactory.get_wrapper(agent)
         self.route_index = route_index
         self.scenario = scenario
@@ -156,24 +159,30 @@ class ScenarioManager(object):
         self._scenario_thread.start()
 
         while self._running:
-            self._tick_scenario()
+            with TickProfiler.timer('tick'):
+                self._tick_scenario()
 
     def _tick_scenario(self):
         """
         Run next tick of scenario and the agent and tick the world.
         """
         if self._running and self.get_running_status():
-            CarlaDataProvider.get_world().tick(self._timeout)
+            with TickProfiler.timer('world.tick'):
+                CarlaDataProvider.get_world().tick(self._timeout)
 
-        timestamp = CarlaDataProvider.get_world().get_snapshot().timestamp
+        with TickProfiler.timer('world.get_snapshot'):
+            snapshot = CarlaDataProvider.get_world().get_snapshot()
+        timestamp = snapshot.timestamp
 
         if self._timestamp_last_run < timestamp.elapsed_seconds and self._running:
             self._timestamp_last_run = timestamp.elapsed_seconds
+            TickProfiler.count('ticks')
 
             self._watchdog.update()
             # Update game time and actor information
-            GameTime.on_carla_tick(timestamp)
-            CarlaDataProvider.on_carla_tick()
+            with TickProfiler.timer('carla_data_provider.on_carla_tick'):
+                GameTime.on_carla_tick(timestamp)
+                CarlaDataProvider.on_carla_tick(snapshot)
             self._watchdog.pause()
 
             try:
@@ -194,24 +203,23 @@ class ScenarioManager(object):
 
             # Tick scenario. Add the ego control to the blackboard in case some behaviors want to change it
             py_trees.blackboard.Blackboard().set("AV_control", ego_action, overwrite=True)
-            self.scenario_tree.tick_once()
+            with TickProfiler.timer('scenario_tree.tick_once'):
+                with CarlaDataProvider.command_batch():
+                    self.scenario_tree.tick_once()
 
-            if self._debug_mode > 1:
+            if self._live_results:
                 self.compute_duration_time()
 
-                # Update live statistics
-                self._statistics_manager.compute_route_statistics(
-                    self.route_index,
-                    self.scenario_duration_system,
-                    self.scenario_duration_game,
-                    failure_message=""
-                )
-                self._statistics_manager.write_live_results(
-                    self.route_index,
-                    self.ego_vehicles[0].get_velocity().length(),
-                    ego_action,
-                    self.ego_vehicles[0].get_location()
-                )
+                # Update live statistics, only with the new events
+                with TickProfiler.timer('statistics.live_results'):
+                    self._statistics_manager.write_live_results(
+                        self.route_index,
+                        CarlaDataProvider.get_velocity(self.ego_vehicles[0]),
+                        ego_action,
+                        CarlaDataProvider.get_location(self.ego_vehicles[0]),
+                        self.scenario_duration_system,
+                        self.scenario_duration_game
+                    )
 
             if self._debug_mode > 2:
                 print("\n")
@@ -221,9 +229,10 @@ class ScenarioManager(object):
             if self.scenario_tree.status != py_trees.common.Status.RUNNING:
                 self._running = False
 
-            ego_trans = self.ego_vehicles[0].get_transform()
-            self._spectator.set_transform(carla.Transform(ego_trans.location + carla.Location(z=70),
-                                                          carla.Rotation(pitch=-90)))
+            with TickProfiler.timer('spectator'):
+                ego_trans = self.ego_vehicles[0].get_transform()
+                self._spectator.set_transform(carla.Transform(ego_trans.location + carla.Location(z=70),
+                                                              carla.Rotation(pitch=-90)))
 
     def get_running_status(self):
         """
@@ -0,0 +1,7 @@
+"""
+Unit tests of the leaderboard. They use the CARLA mocks of the scenario runner, so they are run
+from the root of the repository with the leaderboard, the scenario runner and the mocks in the PYTHONPATH:
+
+    PYTHONPATH=scenario_runner/srunner/tests/carla_mocks:scenario_runner:leaderboard \
+        python -m pytest leaderboard/leaderboard/tests
+"""
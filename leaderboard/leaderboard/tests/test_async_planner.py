@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the asynchronous LLM planner of the LLM agents.
+"""
+
+import io
+import threading
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+import numpy as np
+
+from team_code.async_planner import AsyncPlanner, WaypointPlan
+
+
+class TestWaypointPlan(TestCase):
+    """
+    Test class for the WaypointPlan
+    """
+
+    def test_same_pose(self):
+        """
+        The waypoints are unchanged at the pose they were planned for
+        """
+        plan = WaypointPlan({'output_waypoints': [[0.5, -2.0], [1.0, -4.0]]}, 0.0, [10.0, 5.0], 0.3)
+        np.testing.assert_allclose(plan.waypoints([10.0, 5.0], 0.3), [[0.5, -2.0], [1.0, -4.0]], atol=1e-9)
+
+    def test_moved_pose(self):
+        """
+        The waypoints get closer as the ego drives forward, and keep their world position when it turns
+        """
+        plan = WaypointPlan({'output_waypoints': [[0.0, -2.0]]}, 0.0, [0.0, 0.0], 0.0)
+
+        # With a compass of 0, forward is the world x axis
+        np.testing.assert_allclose(plan.waypoints([1.0, 0.0], 0.0), [[0.0, -1.0]], atol=1e-9)
+
+        # Expressing the waypoints at another pose and planning from it gives back the same waypoints
+        local = plan.waypoints([3.0, -1.0], 1.2)
+        replanned = WaypointPlan({'output_waypoints': local}, 0.0, [3.0, -1.0], 1.2)
+        np.testing.assert_allclose(replanned.waypoints([0.0, 0.0], 0.0), [[0.0, -2.0]], atol=1e-9)
+
+
+class TestAsyncPlanner(TestCase):
+    """
+    Test class for the AsyncPlanner
+    """
+
+    def setUp(self):
+        self.planner = AsyncPlanner()
+
+    def tearDown(self):
+        self.planner.shutdown()
+
+    def test_one_request_in_flight(self):
+        """
+        Only one request runs at a time, and its plan is kept once finished
+        """
+        release = threading.Event()
+
+        def request():
+            release.wait(5)
+            return {'output_waypoints': [[0.0, -2.0]]}
+
+        self.assertTrue(self.planner.submit(request, 1.0, [0.0, 0.0], 0.0))
+        self.assertFalse(self.planner.submit(request, 2.0, [0.0, 0.0], 0.0))
+        self.assertIsNone(self.planner.latest())
+
+        release.set()
+        self.planner._future.result(5)  # pylint: disable=protected-access
+        self.assertEqual(self.planner.latest().timestamp, 1.0)
+        self.assertFalse(self.planner.busy())
+
+    def test_failed_request(self):
+        """
+        An exception of the worker is reported, the previous plan kept, and new requests accepted
+        """
+        self.planner.submit(lambda: {'output_waypoints': [[0.0, -2.0]]}, 1.0, [0.0, 0.0], 0.0)
+        self.planner._future.result(5)  # pylint: disable=protected-access
+
+        def failing_request():
+            raise RuntimeError("connection refused")
+
+        self.planner.submit(failing_request, 2.0, [0.0, 0.0], 0.0)
+        self.planner._future.exception(5)  # pylint: disable=protected-access
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            plan = self.planner.latest()
+        self.assertIn("connection refused", output.getvalue())
+        self.assertEqual(plan.timestamp, 1.0)
+        self.assertTrue(self.planner.submit(lambda: {}, 3.0, [0.0, 0.0], 0.0))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the append-only journal of the leaderboard checkpoints.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from leaderboard.utils.checkpoint_tools import fetch_checkpoint, get_journal_path, read_journal
+from leaderboard.utils.statistics_manager import StatisticsManager
+
+
+class TestCheckpointJournal(TestCase):
+    """
+    Test class for the checkpoint journal
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.endpoint = os.path.join(self.folder, 'results.json')
+        self.debug_endpoint = os.path.join(self.folder, 'live_results.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _run_routes(self, journal, routes=3):
+        statistics_manager = StatisticsManager(self.endpoint, self.debug_endpoint, journal=journal)
+        statistics_manager.clear_records()
+        statistics_manager.save_sensors(['camera'])
+        statistics_manager.save_progress(0, routes)
+        statistics_manager.write_statistics()
+
+        for index in range(routes):
+            statistics_manager.create_route_data("RouteScenario_{}_rep0".format(index), index)
+            statistics_manager.write_statistics()
+            statistics_manager.compute_route_statistics(index, 1.0, 1.0)
+            statistics_manager.save_progress(index + 1, routes)
+            statistics_manager.write_statistics()
+        return statistics_manager
+
+    def test_same_checkpoint(self):
+        """
+        The replayed journal and its compaction match the checkpoint written without it
+        """
+        self._run_routes(journal=False).validate_and_write_statistics(True, False)
+        with open(self.endpoint) as fd:
+            expected = json.load(fd)
+        os.remove(self.endpoint)
+
+        self._run_routes(journal=True).validate_and_write_statistics(True, False)
+        with open(self.endpoint) as fd:
+            self.assertEqual(json.load(fd), expected)
+        self.assertEqual(read_journal(get_journal_path(self.endpoint)), expected)
+
+    def test_appends_changes(self):
+        """
+        Each write only appends the changed parts, and the checkpoint is read from the journal
+        """
+        self._run_routes(journal=True)
+        journal = get_journal_path(self.endpoint)
+        with open(journal) as fd:
+            records = [json.loads(line) for line in fd if json.loads(line)['type'] == 'record']
+        self.assertEqual(len(records), 6)
+
+        data = fetch_checkpoint(self.endpoint)
+        self.assertEqual(len(data['_checkpoint']['records']), 3)
+        self.assertEqual(data['_checkpoint']['progress'], [3, 3])
+
+    def test_partial_last_line(self):
+        """
+        A partially written last line is ignored
+        """
+        self._run_routes(journal=True)
+        journal = get_journal_path(self.endpoint)
+        with open(journal, 'a') as fd:
+            fd.write('{"type": "progress", "prog')
+
+        data = read_journal(journal)
+        self.assertEqual(data['_checkpoint']['progress'], [3, 3])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the live results of the leaderboard.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from urllib.request import urlopen
+
+import carla
+from srunner.scenariomanager.traffic_events import TrafficEvent, TrafficEventType
+
+from leaderboard.utils.live_results import HttpPublisher, UnixSocketPublisher
+from leaderboard.utils.statistics_manager import StatisticsManager
+
+CONTROL = SimpleNamespace(throttle=0.5, brake=0.0, steer=0.1)
+
+
+class StandInScenario(object):
+    """
+    Has the criteria and timeout node used by the statistics
+    """
+
+    def __init__(self):
+        self.route = []
+        self.timeout_node = SimpleNamespace(timeout=False)
+        self.criteria = [SimpleNamespace(events=[]) for _ in range(3)]
+        self.completion = TrafficEvent(TrafficEventType.ROUTE_COMPLETION, frame=0)
+        self.completion.set_dict({'route_completed': 0})
+        self.criteria[0].events.append(self.completion)
+
+    def get_criteria(self):
+        return self.criteria
+
+
+def add_event(criterion, event_type, frame, **kwargs):
+    event = TrafficEvent(event_type, frame=frame, message="{} at {}".format(event_type, frame))
+    event.set_dict(kwargs)
+    criterion.events.append(event)
+    return event
+
+
+class TestLiveResults(TestCase):
+    """
+    Test class for the live results
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.live_endpoint = os.path.join(self.folder, 'live_results.txt')
+        self.statistics_manager = StatisticsManager(os.path.join(self.folder, 'results.json'), self.live_endpoint,
+                                                    live_period=3600)
+        self.scenario = StandInScenario()
+        self.statistics_manager.create_route_data("RouteScenario_0_rep0", 0)
+        self.statistics_manager.set_scenario(self.scenario)
+
+    def tearDown(self):
+        self.statistics_manager.close_live_results()
+        shutil.rmtree(self.folder)
+
+    def _write(self, force=False):
+        self.statistics_manager.write_live_results(0, 10.0, CONTROL, carla.Location(1, 2, 3),
+                                                   5.0, 4.0, force=force)
+
+    def test_same_scores(self):
+        """
+        The incremental scores match the ones of compute_route_statistics
+        """
+        criteria = self.scenario.criteria
+        self._write()
+        add_event(criteria[1], TrafficEventType.COLLISION_VEHICLE, 10)
+        self.scenario.completion.set_dict({'route_completed': 40})
+        self._write()
+        add_event(criteria[2], TrafficEventType.MIN_SPEED_INFRACTION, 20, percentage=50)
+        outside_lanes = add_event(criteria[2], TrafficEventType.OUTSIDE_ROUTE_LANES_INFRACTION, 30, percentage=5)
+        self._write()
+        outside_lanes.set_dict({'percentage': 10})
+        add_event(criteria[1], TrafficEventType.COLLISION_STATIC, 40)
+        self.scenario.completion.set_dict({'route_completed': 80})
+        self._write(force=True)
+
+        with open(self.live_endpoint) as fd:
+            text = fd.read()
+        self.statistics_manager.compute_route_statistics(0, 5.0, 4.0)
+        record = self.statistics_manager._results.checkpoint.records[0]  # pylint: disable=protected-access
+
+        self.assertIn("Driving score:      {:.3f}".format(record.scores['score_composed']), text)
+        self.assertIn("Infraction penalty: {:.3f}".format(record.scores['score_penalty']), text)
+        self.assertIn("Total infractions: {}".format(record.num_infractions), text)
+        self.assertIn("    COLLISION_STATIC (penalty: 0.6)\n    OUTSIDE_ROUTE_LANES_INFRACTION (value: 10%)", text)
+
+    def test_throttled(self):
+        """
+        Only forced or periodic updates are published, and the pending one is published with the route
+        """
+        self._write(force=True)
+        os.remove(self.live_endpoint)
+        self._write()
+        self.assertFalse(os.path.exists(self.live_endpoint))
+        self.statistics_manager.remove_scenario()
+        self.assertTrue(os.path.exists(self.live_endpoint))
+
+    def test_served(self):
+        """
+        The HTTP and Unix socket publishers serve the last published data as json
+        """
+        http_publisher = HttpPublisher('127.0.0.1', 0)
+        socket_path = os.path.join(self.folder, 'live.sock')
+        socket_publisher = UnixSocketPublisher(socket_path)
+        try:
+            for publisher in (http_publisher, socket_publisher):
+                publisher.publish({'route_id': 'a'})
+                publisher.publish({'route_id': 'b'})
+
+            with urlopen("http://{}:{}".format(*http_publisher.address)) as response:
+                self.assertEqual(json.loads(response.read()), {'route_id': 'b'})
+
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            with client.makefile('rb') as fd:
+                self.assertEqual(json.loads(fd.readline()), {'route_id': 'b'})
+            client.close()
+        finally:
+            http_publisher.close()
+            socket_publisher.close()
+        self.assertFalse(os.path.exists(socket_path))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the LLM backends of the LLM agents, using the stand-in server.
+"""
+
+import json
+import threading
+from argparse import Namespace
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import TestCase, skipIf
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from team_code.llm_backend import OpenAIChatBackend, OpenAIResponsesBackend, create_backend
+from team_code.standin_llm_server import StandInHandler, build_answer
+
+try:
+    import openai  # pylint: disable=unused-import
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+class TestLLMBackend(TestCase):
+    """
+    Test class for the LLM backends, answered by the stand-in server
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        StandInHandler.answer = build_answer(Namespace(num_waypoints=3, spacing=2.0, end_prob=0.0))
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        cls.server.quiet = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:{}/v1'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def make_config(self, backend):
+        """Returns an agent config using that backend with the stand-in server"""
+        return SimpleNamespace(llm_backend=backend, llm_model='stand-in', llm_key='none',
+                               llm_base_url=self.base_url, llm_max_output_tokens=100)
+
+    def post(self, endpoint, body):
+        """Sends the request to the stand-in server and returns its answer"""
+        request = Request(self.base_url + endpoint, data=json.dumps(body).encode('utf-8'),
+                          headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def test_standin_server(self):
+        """
+        The stand-in server answers both APIs with the same waypoints, counting the requests
+        """
+        served = StandInHandler.requests_served
+        chat = self.post('/chat/completions', {'model': 'm', 'messages': []})
+        responses = self.post('/responses', {'model': 'm', 'input': []})
+
+        text = chat['choices'][0]['message']['content']
+        self.assertEqual(responses['output'][0]['content'][0]['text'], text)
+        answer = json.loads(text.split('```json\n')[1].split('\n```')[0])
+        self.assertEqual(answer['output_waypoints'], [[0.0, -2.0], [0.0, -4.0], [0.0, -6.0]])
+        self.assertEqual(StandInHandler.requests_served, served + 2)
+
+        with self.assertRaises(HTTPError):
+            self.post('/embeddings', {})
+
+    def test_unknown_backend(self):
+        """
+        Backends missing from the registry are rejected
+        """
+        with self.assertRaises(ValueError):
+            create_backend(self.make_config('carrier_pigeon'))
+
+    @skipIf(not OPENAI_AVAILABLE, "The openai package isn't installed")
+    def test_create_backend(self):
+        """
+        The backend named by the config is created, and gets the answer of the stand-in server
+        """
+        for name, backend_class in (('openai_chat', OpenAIChatBackend), ('openai_responses', OpenAIResponsesBackend)):
+            backend = create_backend(self.make_config(name))
+            self.assertIsInstance(backend, backend_class)
+            self.assertEqual(backend.complete("Plan the next waypoints"), StandInHandler.answer)
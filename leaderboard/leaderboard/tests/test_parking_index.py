@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the parking slots index of the leaderboard
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from leaderboard.utils.parking_index import ParkingSlotIndex, read_parking_file, write_parking_file
+
+
+def make_slots(amount, seed=3):
+    """Returns random slots spread around the origin, including negative coordinates"""
+    rng = np.random.RandomState(seed)
+    slots = []
+    for i in range(amount):
+        slots.append({
+            'location': [float(rng.uniform(-200, 200)), float(rng.uniform(-200, 200)), float(rng.uniform(0, 2))],
+            'rotation': [0.0, float(rng.uniform(-180, 180)), 0.0],
+            'tilex': i % 3,
+            'tiley': -(i % 2),
+            'mesh': '/Game/Carla/Static/Car/mesh_{}'.format(i % 4)
+        })
+    return slots
+
+
+def brute_force_near_polyline(locations, points, radius):
+    """Returns the indices of the locations closer than radius to any segment of the polyline"""
+    close = []
+    for i, location in enumerate(locations):
+        for a, b in zip(points[:-1], points[1:]):
+            segment = b - a
+            t = np.clip(np.dot(location - a, segment) / max(np.dot(segment, segment), 1e-9), 0.0, 1.0)
+            if np.linalg.norm(location - (a + t * segment)) < radius:
+                close.append(i)
+                break
+    return close
+
+
+class TestParkingSlotIndex(TestCase):
+    """
+    Test class for the ParkingSlotIndex and its file format
+    """
+
+    def setUp(self):
+        self.slots = make_slots(300)
+        self.index = ParkingSlotIndex.from_slots(self.slots, cell_size=20.0)
+        self.locations = np.array([slot['location'] for slot in self.slots])
+
+    def test_near_points(self):
+        """
+        The slots near the points are the same as with a brute force search, also for a subset of slots
+        """
+        points = np.array([[0.0, 0.0, 0.0], [-150.0, 120.0, 1.0], [75.0, -60.0, 0.0]])
+        distances = np.linalg.norm(self.locations[:, None, :] - points[None, :, :], axis=2)
+        expected = (distances < 30.0).any(axis=1)
+
+        mask = self.index.near_points(points, 30.0)
+        np.testing.assert_array_equal(mask, expected)
+        self.assertTrue(mask.any())
+
+        subset = np.arange(0, len(self.slots), 3)
+        np.testing.assert_array_equal(self.index.near_points(points, 30.0, subset), expected[subset])
+
+    def test_near_polyline(self):
+        """
+        The slots near the polyline are the same as with a brute force search, with several chunks of segments
+        """
+        points = np.array([[-190.0, -190.0, 0.0], [-50.0, -20.0, 0.0], [10.0, 0.0, 1.0],
+                           [10.0, 150.0, 1.0], [180.0, 170.0, 0.0]])
+        expected = brute_force_near_polyline(self.locations, points, 15.0)
+
+        for chunk_size in (1, 2, 64):
+            indices = self.index.near_polyline(points, 15.0, chunk_size=chunk_size)
+            self.assertEqual(indices.tolist(), expected)
+        self.assertTrue(expected)
+
+        # A single point is checked as a point
+        single = self.index.near_polyline(points[2:3], 25.0)
+        self.assertEqual(single.tolist(), np.flatnonzero(self.index.near_points(points[2:3], 25.0)).tolist())
+
+    def test_file_round_trip(self):
+        """
+        The slots written to a file are read back unchanged, and build the same index
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'Town01.bin')
+            write_parking_file(path, self.slots)
+            locations, rotations, tiles, mesh_ids, meshes = read_parking_file(path)
+
+            np.testing.assert_allclose(locations, self.locations, atol=1e-4)
+            np.testing.assert_allclose(rotations, [slot['rotation'] for slot in self.slots], atol=1e-4)
+            self.assertEqual(tiles.tolist(), [[slot['tilex'], slot['tiley']] for slot in self.slots])
+            self.assertEqual([meshes[i] for i in mesh_ids], [slot['mesh'] for slot in self.slots])
+
+            index = ParkingSlotIndex.from_file(path, cell_size=20.0)
+            self.assertEqual(index.get_mesh(7), self.slots[7]['mesh'])
+            self.assertAlmostEqual(index.get_transform(7).rotation.yaw, self.slots[7]['rotation'][1], places=3)
+            points = np.array([[0.0, 0.0, 0.0], [100.0, 100.0, 0.0]])
+            self.assertEqual(index.near_polyline(points, 20.0).tolist(),
+                             self.index.near_polyline(points, 20.0).tolist())
+
+            # Empty files and files of other formats
+            write_parking_file(path, [])
+            self.assertEqual(len(ParkingSlotIndex.from_file(path)), 0)
+            with open(path, 'wb') as fd:
+                fd.write(b'\0' * 32)
+            with self.assertRaises(ValueError):
+                read_parking_file(path)
+        finally:
+            shutil.rmtree(folder)
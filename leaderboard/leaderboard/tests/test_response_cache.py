@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the LLM response cache of the LLM agents.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from team_code.response_cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+    """
+    Test class for the ResponseCache
+    """
+
+    def test_key_normalization(self):
+        """
+        The whitespace of the texts and small changes of the speed and target point don't change the key
+        """
+        cache = ResponseCache(speed_step=0.5, target_step=1.0)
+        key = cache.make_key(['a car ahead', 'a  red\nlight'], 5.1, [[10.2, -3.9]])
+
+        self.assertEqual(cache.make_key([' a car ahead ', 'a red light'], 4.9, [10.4, -4.1]), key)
+        self.assertNotEqual(cache.make_key(['a car ahead', 'a green light'], 5.1, [10.2, -3.9]), key)
+        self.assertNotEqual(cache.make_key(['a car ahead', 'a red light'], 5.5, [10.2, -3.9]), key)
+        self.assertNotEqual(cache.make_key(['a car ahead', 'a red light'], 5.1, [11.2, -3.9]), key)
+
+    def test_lru(self):
+        """
+        The least recently used outputs are evicted first, and nothing is kept without a size
+        """
+        cache = ResponseCache(max_size=2)
+        cache.put('a', {'end_prob': [0.1]})
+        cache.put('b', {'end_prob': [0.2]})
+        cache.get('a')
+        cache.put('c', {'end_prob': [0.3]})
+
+        self.assertEqual(cache.get('a'), {'end_prob': [0.1]})
+        self.assertIsNone(cache.get('b'))
+
+        no_cache = ResponseCache(max_size=0)
+        no_cache.put('a', {'end_prob': [0.1]})
+        self.assertIsNone(no_cache.get('a'))
+
+    def test_sqlite_round_trip(self):
+        """
+        Outputs saved to the sqlite file are found by a new cache, without requesting them again
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'responses.sqlite')
+            outputs = {'output_waypoints': [[0.0, -2.0], [0.1, -4.0]], 'end_prob': [0.0]}
+
+            cache = ResponseCache(path=path)
+            key = cache.make_key(['a straight road'], 8.0, [20.0, 0.0])
+            cache.get_or_request(key, lambda: outputs)
+            cache.close()
+
+            new_cache = ResponseCache(max_size=1, path=path)
+            self.assertEqual(new_cache.get_or_request(key, lambda: self.fail("Requested again")), outputs)
+            self.assertEqual((new_cache.hits, new_cache.misses), (1, 0))
+            new_cache.close()
+        finally:
+            shutil.rmtree(folder)
+
+    def test_in_flight_requests(self):
+        """
+        Identical requests made while the first one runs wait for its outputs, and failures reach all of them
+        """
+        cache = ResponseCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def request():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'end_prob': [0.5]}
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(cache.get_or_request('key', request)))
+        thread.start()
+        started.wait(5)
+
+        waiter = threading.Thread(target=lambda: results.append(cache.get_or_request('key', request)))
+        waiter.start()
+        release.set()
+        thread.join(5)
+        waiter.join(5)
+
+        self.assertEqual(results, [{'end_prob': [0.5]}] * 2)
+        self.assertEqual(len(calls), 1)
+
+        def failing_request():
+            raise RuntimeError("timeout")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_request('other', failing_request)
+        self.assertIsNone(cache.get('other'))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the streaming parser of the leaderboard routes files.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from leaderboard.utils.route_indexer import RouteIndexer
+from leaderboard.utils.route_parser import RouteFileIndex, RouteParser
+
+ROUTE = """
+    <route id="{0}" town="Town0{0}">
+      <waypoints>
+        <position x="{0}" y="1.5" z="0"/>
+        <position x="{0}" y="2.5" z="0"/>
+      </waypoints>
+      <scenarios>
+        <scenario name="Accident_{0}" type="Accident">
+          <trigger_point x="{0}" y="1.5" z="0" yaw="90"/>
+          <distance value="50"/>
+        </scenario>
+      </scenarios>
+    </route>"""
+
+
+class TestRouteFileIndex(TestCase):
+    """
+    Test class for the RouteFileIndex
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.routes_file = os.path.join(self.folder, 'routes.xml')
+        with open(self.routes_file, 'w') as fd:
+            fd.write('<?xml version="1.0" encoding="UTF-8"?>\n<routes>\n  <!-- <route id="0"/> -->')
+            fd.write(''.join(ROUTE.format(i) for i in (3, 1, 4, 5, 9, 2, 6)))
+            fd.write('\n</routes>\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_same_configs(self):
+        """
+        Routes read through the index are the same as the streamed ones
+        """
+        route_index = RouteFileIndex(self.routes_file)
+        self.assertEqual(route_index.ids, ['3', '1', '4', '5', '9', '2', '6'])
+
+        streamed = list(RouteParser.iter_routes_file(self.routes_file))
+        for position, expected in enumerate(streamed):
+            config = route_index.parse_route(position)
+            self.assertEqual(config.name, expected.name)
+            self.assertEqual(config.town, expected.town)
+            self.assertEqual([p.x for p in config.keypoints], [p.x for p in expected.keypoints])
+            self.assertEqual(config.scenario_configs[0].name, expected.scenario_configs[0].name)
+            self.assertEqual(config.scenario_configs[0].other_parameters, {'distance': {'value': '50'}})
+
+    def test_subset(self):
+        """
+        Subsets keep the order of the file, and raise for missing, repeated or reversed ids
+        """
+        route_index = RouteFileIndex(self.routes_file)
+        self.assertEqual(route_index.get_subset('9, 1-4'), [1, 2, 4])
+        for routes_subset in ('7', '4-1', '1-4,4'):
+            with self.assertRaises(ValueError):
+                route_index.get_subset(routes_subset)
+
+        names = [config.name for config in RouteParser.parse_routes_file(self.routes_file, '2,5-9')]
+        self.assertEqual(names, ['RouteScenario_5', 'RouteScenario_9', 'RouteScenario_2'])
+
+    def test_indexer(self):
+        """
+        The indexer parses the routes as they are run, sharing them between repetitions
+        """
+        route_indexer = RouteIndexer(self.routes_file, 2, '4-5')
+        self.assertEqual(route_indexer.get_config_keys(), ['RouteScenario_4.0', 'RouteScenario_4.1',
+                                                           'RouteScenario_5.0', 'RouteScenario_5.1'])
+        configs = []
+        while route_indexer.peek():
+            configs.append(route_indexer.get_next_config())
+
+        self.assertEqual([(c.index, c.repetition_index) for c in configs], [(0, 0), (1, 1), (2, 0), (3, 1)])
+        self.assertIs(configs[0].keypoints, configs[1].keypoints)
+        self.assertEqual(route_indexer.get_config('RouteScenario_5.1').town, 'Town05')
+
+    def test_empty_routes(self):
+        """
+        Empty routes are read without the closing tags that follow them
+        """
+        with open(self.routes_file, 'w') as fd:
+            fd.write('<routes><route id="1" town="Town01"/><route id="2" town="Town02" ></route >'
+                     '<route id="3" town="Town03" /></routes>')
+
+        route_index = RouteFileIndex(self.routes_file)
+        self.assertEqual([route_index.read_route(i).attrib['town'] for i in range(3)],
+                         ['Town01', 'Town02', 'Town03'])
+
+    def test_large_subset(self):
+        """
+        Subsets of many routes keep the order of the file
+        """
+        with open(self.routes_file, 'w') as fd:
+            fd.write('<routes>')
+            fd.write(''.join('<route id="{0}" town="Town01"/>'.format(i) for i in range(5000)))
+            fd.write('</routes>')
+
+        route_index = RouteFileIndex(self.routes_file)
+        self.assertEqual(route_index.get_subset('4000, 0-3999'), list(range(4001)))
+        with self.assertRaises(ValueError):
+            route_index.get_subset('0-4999, 2500')
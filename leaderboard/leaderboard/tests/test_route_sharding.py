@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the sharded execution of the leaderboard,
+using stand-in workers instead of CARLA servers. It needs the leaderboard in the PYTHONPATH
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from leaderboard.utils.route_sharding import ShardCoordinator, ShardedRouteIndexer, WorkStealingQueue
+from leaderboard.utils.statistics_manager import StatisticsManager
+
+ROUTE = '<route id="{}" town="Town01"><waypoints><position x="0" y="0" z="0"/></waypoints><scenarios/></route>'
+
+
+def standin_worker(args, worker_id, connection):
+    """
+    Does the same as the leaderboard evaluator, but without running the routes. Worker 0 is slower than the rest
+    """
+    route_indexer = ShardedRouteIndexer(args.routes, args.repetitions, args.routes_subset, worker_id, connection)
+    statistics_manager = StatisticsManager(args.checkpoint, args.debug_checkpoint)
+    statistics_manager.clear_records()
+
+    while route_indexer.peek():
+        config = route_indexer.get_next_config()
+        route_name = "{}_rep{}".format(config.name, config.repetition_index)
+        statistics_manager.create_route_data(route_name, config.index)
+        time.sleep(0.2 if worker_id == 0 else 0.01)
+        statistics_manager.compute_route_statistics(config.index)
+        statistics_manager.save_progress(route_indexer.index, route_indexer.total)
+        statistics_manager.write_statistics()
+
+    connection.close()
+
+
+class TestRouteSharding(TestCase):
+    """
+    Test class for the coordinator of the sharded execution
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.routes = os.path.join(self.folder, 'routes.xml')
+        with open(self.routes, 'w', encoding='utf-8') as fd:
+            fd.write('<routes>{}</routes>'.format(''.join(ROUTE.format(i) for i in range(6))))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_queue(self):
+        """
+        Shards are contiguous, and emptied shards steal from the end of the largest one
+        """
+        queue = WorkStealingQueue(list(range(7)), 3)
+        self.assertEqual([queue.next_route(0) for _ in range(3)], [0, 1, 2])
+        self.assertEqual(queue.next_route(0), 4)
+        self.assertEqual(queue.next_route(1), 3)
+        self.assertEqual(queue.stolen, 1)
+        self.assertEqual(queue.remaining(), 2)
+
+    def test_coordinator(self):
+        """
+        All routes are run once, and the results of the workers merged into the checkpoint
+        """
+        args = argparse.Namespace(
+            routes=self.routes, repetitions=2, routes_subset='', resume=False,
+            host='localhost', port=2000, traffic_manager_port=8000,
+            worker_hosts=None, worker_ports=None, worker_traffic_manager_ports=None, workers=3,
+            checkpoint=os.path.join(self.folder, 'results.json'),
+            debug_checkpoint=os.path.join(self.folder, 'live_results.txt'))
+
+        coordinator = ShardCoordinator(args, worker_target=standin_worker)
+        self.assertFalse(coordinator.run())
+        self.assertEqual(sum(coordinator.routes_per_worker), 12)
+        self.assertGreater(coordinator.queue.stolen, 0)
+
+        with open(args.checkpoint, encoding='utf-8') as fd:
+            results = json.load(fd)
+        route_ids = [record['route_id'] for record in results['_checkpoint']['records']]
+        self.assertEqual(route_ids, ["RouteScenario_{}_rep{}".format(i, r) for i in range(6) for r in range(2)])
+        self.assertEqual(results['_checkpoint']['progress'], [12, 12])
+        self.assertTrue(results['_checkpoint']['global_record'])
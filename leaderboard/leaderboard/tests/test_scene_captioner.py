@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the batched scene captioner of the LLM agents.
+"""
+
+from unittest import TestCase
+
+import numpy as np
+
+from team_code.scene_captioner import BatchCaptioner, CaptionCache, hamming_distance, image_hash
+from team_code.timing import StageTimer
+
+
+class FakeCaptioner(BatchCaptioner):
+    """
+    Captioner whose descriptor returns the first pixel value of each image, recording its calls
+    """
+
+    def __init__(self, cache=None):
+        super(FakeCaptioner, self).__init__(None, None, 'cpu', cache)
+        self.calls = []
+
+    def _generate(self, images):
+        self.calls.append(len(images))
+        return ['pixel {}'.format(image[0, 0, 0]) for image in images]
+
+
+def make_image(value):
+    """Returns a random RGB image, seeded by the value of its first pixel"""
+    image = np.random.RandomState(value).randint(0, 255, (24, 32, 3)).astype(np.uint8)
+    image[0, 0, 0] = value
+    return image
+
+
+class TestBatchCaptioner(TestCase):
+    """
+    Test class for the BatchCaptioner
+    """
+
+    def test_single_pass(self):
+        """
+        All cameras are captioned with one call of the descriptor, in the order of the images
+        """
+        captioner = FakeCaptioner()
+        captions = captioner([make_image(10), make_image(20), make_image(30)])
+
+        self.assertEqual(captions, ['pixel 10', 'pixel 20', 'pixel 30'])
+        self.assertEqual(captioner.calls, [3])
+        self.assertEqual(captioner([]), [])
+        self.assertEqual(captioner.calls, [3])
+
+    def test_cached_cameras(self):
+        """
+        Only the images without a cached caption are sent to the descriptor
+        """
+        captioner = FakeCaptioner(CaptionCache())
+        captioner([make_image(10), make_image(20)])
+        captions = captioner([make_image(10), make_image(50)])
+
+        self.assertEqual(captions, ['pixel 10', 'pixel 50'])
+        self.assertEqual(captioner.calls, [2, 1])
+        self.assertEqual((captioner.cache.hits, captioner.cache.misses), (1, 3))
+
+
+class TestCaptionCache(TestCase):
+    """
+    Test class for the CaptionCache
+    """
+
+    def test_image_hash(self):
+        """
+        Equal images have the same hash, and slightly changed ones a close hash
+        """
+        rng = np.random.RandomState(0)
+        image = rng.randint(0, 255, (48, 64, 3)).astype(np.uint8)
+        noisy = np.clip(image.astype(np.int16) + rng.randint(-2, 3, image.shape), 0, 255).astype(np.uint8)
+        other = rng.randint(0, 255, (48, 64, 3)).astype(np.uint8)
+
+        self.assertEqual(image_hash(image), image_hash(image.copy()))
+        self.assertLessEqual(hamming_distance(image_hash(image), image_hash(noisy)), 4)
+        self.assertGreater(hamming_distance(image_hash(image), image_hash(other)), 4)
+
+    def test_hamming_threshold(self):
+        """
+        Hashes up to max_distance bits away from a cached one of the same camera reuse its caption
+        """
+        cache = CaptionCache(max_distance=4)
+        cache.put(0, 0b1010101010, 'a road')
+
+        self.assertEqual(cache.get(0, 0b1010101010), 'a road')
+        self.assertEqual(cache.get(0, 0b1010101010 ^ 0b1111), 'a road')
+        self.assertIsNone(cache.get(0, 0b1010101010 ^ 0b11111))
+        self.assertIsNone(cache.get(1, 0b1010101010))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+        # Without a distance, only the exact hash is a hit
+        exact_cache = CaptionCache(max_distance=0)
+        exact_cache.put(0, 0b1010101010, 'a road')
+        self.assertIsNone(exact_cache.get(0, 0b1010101010 ^ 0b1))
+
+    def test_lru(self):
+        """
+        The least recently used captions are evicted first
+        """
+        cache = CaptionCache(max_size=2, max_distance=0)
+        cache.put(0, 1, 'first')
+        cache.put(0, 2, 'second')
+        cache.get(0, 1)
+        cache.put(0, 4, 'third')
+
+        self.assertEqual(cache.get(0, 1), 'first')
+        self.assertIsNone(cache.get(0, 2))
+        self.assertAlmostEqual(cache.hit_rate(), 2 / 3)
+
+
+class TestStageTimer(TestCase):
+    """
+    Test class for the StageTimer
+    """
+
+    def test_stages(self):
+        """
+        The time of repeated stages is accumulated, and the summary lists them in order
+        """
+        timer = StageTimer()
+        for name in ('capture', 'caption', 'capture'):
+            with timer.stage(name):
+                pass
+
+        self.assertEqual(list(timer.stages), ['capture', 'caption'])
+        self.assertAlmostEqual(timer.total(), sum(timer.stages.values()))
+        self.assertTrue(timer.summary().startswith('capture: '))
+        self.assertIn('| total: ', timer.summary())
+
+        timer.reset()
+        self.assertEqual(timer.stages, {})
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the frame buffer of the leaderboard sensor interface
+"""
+
+import threading
+import time
+from unittest import TestCase
+
+from leaderboard.envs.sensor_interface import SensorInterface, SensorReceivedNoData
+
+
+class TestSensorInterface(TestCase):
+    """
+    Test class for the SensorInterface
+    """
+
+    def setUp(self):
+        self.interface = SensorInterface()
+        self.interface.register_sensor('rgb', 'sensor.camera.rgb', None)
+        self.interface.register_sensor('speed', 'sensor.speedometer', None)
+        self.interface.register_sensor('map', 'sensor.opendrive_map', None)
+
+    def test_frame_data(self):
+        """
+        Only the data of the requested frame is returned, without waiting for the opendrive sensor
+        """
+        self.interface.update_sensor('rgb', 'rgb_5', 5)
+        self.interface.update_sensor('speed', 'speed_5', 5)
+
+        self.assertEqual(self.interface.get_data(5), {'rgb': (5, 'rgb_5'), 'speed': (5, 'speed_5')})
+        stats = self.interface.get_latency_stats()
+        self.assertEqual((stats['rgb']['count'], stats['map']['count']), (1, 0))
+
+    def test_early_data(self):
+        """
+        Data of a later frame is kept until that frame is requested
+        """
+        self.interface.update_sensor('rgb', 'rgb_6', 6)
+        self.interface.update_sensor('rgb', 'rgb_5', 5)
+        self.interface.update_sensor('speed', 'speed_5', 5)
+        self.interface.update_sensor('speed', 'speed_6', 6)
+
+        self.assertEqual(self.interface.get_data(5)['rgb'], (5, 'rgb_5'))
+        self.assertEqual(self.interface.get_data(6)['rgb'], (6, 'rgb_6'))
+
+    def test_late_data(self):
+        """
+        Data of frames that were already given to the agent is dropped
+        """
+        self.interface.update_sensor('rgb', 'rgb_5', 5)
+        self.interface.update_sensor('speed', 'speed_5', 5)
+        self.interface.get_data(5)
+
+        self.interface.update_sensor('rgb', 'rgb_5_late', 5)
+        self.interface.update_sensor('speed', 'speed_4', 4)
+        self.assertEqual(self.interface._frames_buffer, {})  # pylint: disable=protected-access
+
+    def test_stale_frames(self):
+        """
+        Data of older frames that were never requested is evicted
+        """
+        self.interface.update_sensor('rgb', 'rgb_2', 2)
+        self.interface.update_sensor('speed', 'speed_3', 3)
+        self.interface.update_sensor('rgb', 'rgb_5', 5)
+        self.interface.update_sensor('speed', 'speed_5', 5)
+
+        self.interface.get_data(5)
+        self.assertEqual(self.interface._frames_buffer, {})  # pylint: disable=protected-access
+
+    def test_wait_for_data(self):
+        """
+        The request waits for the data sent by other threads
+        """
+        def send():
+            time.sleep(0.05)
+            self.interface.update_sensor('rgb', 'rgb_5', 5)
+            self.interface.update_sensor('speed', 'speed_5', 5)
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        data = self.interface.get_data(5)
+        thread.join()
+
+        self.assertEqual(data['speed'], (5, 'speed_5'))
+        self.assertGreater(self.interface.get_latency_stats()['speed']['max'], 0.0)
+
+    def test_missing_sensor(self):
+        """
+        A sensor that doesn't send its data raises an exception naming it
+        """
+        self.interface._queue_timeout = 0.05  # pylint: disable=protected-access
+        self.interface.update_sensor('rgb', 'rgb_5', 5)
+
+        with self.assertRaises(SensorReceivedNoData) as context:
+            self.interface.get_data(5)
+        self.assertIn('speed', str(context.exception))
+        self.assertNotIn('rgb', str(context.exception))
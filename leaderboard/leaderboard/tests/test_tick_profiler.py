@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the tick profiler of the leaderboard.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from leaderboard.utils.tick_profiler import TickProfiler
+
+
+class TestTickProfiler(TestCase):
+    """
+    Test class for the TickProfiler
+    """
+
+    def tearDown(self):
+        TickProfiler.enable(False)
+
+    def test_disabled(self):
+        """
+        Nothing is recorded while disabled, and all timers are the same no-op context
+        """
+        TickProfiler.enable(False)
+        self.assertIs(TickProfiler.timer('a'), TickProfiler.timer('b'))
+        with TickProfiler.timer('a'):
+            TickProfiler.count('ticks')
+        TickProfiler.add_sample('b', 1.0)
+        self.assertEqual(TickProfiler.get_summary(), {'timers': {}, 'counters': {}})
+
+    def test_summary(self):
+        """
+        The summary has the percentiles of each timer, in milliseconds, and the counters
+        """
+        TickProfiler.enable()
+        for i in range(1, 101):
+            TickProfiler.add_sample('agent', i / 1000.0)
+            TickProfiler.count('ticks')
+        with TickProfiler.timer('tick'):
+            pass
+
+        summary = TickProfiler.get_summary()
+        agent = summary['timers']['agent']
+        self.assertEqual(agent['count'], 100)
+        self.assertAlmostEqual(agent['p50'], 50.5)
+        self.assertAlmostEqual(agent['p99'], 99.01)
+        self.assertAlmostEqual(agent['max'], 100.0)
+        self.assertEqual(summary['timers']['tick']['count'], 1)
+        self.assertEqual(summary['counters'], {'ticks': 100})
+
+        TickProfiler.reset()
+        self.assertEqual(TickProfiler.get_summary(), {'timers': {}, 'counters': {}})
+
+    def test_trace(self):
+        """
+        The timed calls are written as Chrome trace complete events
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            TickProfiler.enable(trace=True)
+            with TickProfiler.timer('tick'):
+                with TickProfiler.timer('agent'):
+                    pass
+            path = os.path.join(folder, 'traces', 'route.json')
+            TickProfiler.dump_trace(path)
+
+            with open(path) as fd:
+                events = json.load(fd)['traceEvents']
+            self.assertEqual([event['name'] for event in events], ['agent', 'tick'])
+            self.assertTrue(all(event['ph'] == 'X' for event in events))
+            self.assertLessEqual(events[1]['ts'], events[0]['ts'])
+        finally:
+            shutil.rmtree(folder)
@@ -58,3 +58,124 @@ def save_dict(endpoint, data):
     else:
         with open(endpoint, 'w') as fd:
             json.dump(data, fd, indent=4)
+
+
+JOURNAL_VERSION = 1
+
+
+def get_journal_path(endpoint):
+    """Path of the journal of a local checkpoint, next to it and with the '.jsonl' extension"""
+    root, extension = os.path.splitext(endpoint)
+    if extension == '.jsonl':
+        return endpoint + '.journal'
+    return root + '.jsonl'
+
+
+def append_journal(path, entries):
+    """
+    Appends the entries to the journal, one json object per line. Each entry is a dictionary with its 'type':
+    - 'header': first line of the journal, with its 'version'
+    - 'record': the route 'record' at the 'position' of the records list
+    - 'progress', 'sensors': the new value of that part of the checkpoint
+    - 'status': the new 'entry_status' and 'eligible' values
+    - 'global': the 'global_record', 'values' and 'labels' computed at the end of the evaluation
+    """
+    with open(path, 'a') as fd:
+        for entry in entries:
+            fd.write(json.dumps(entry) + '\n')
+
+
+def clear_journal(path):
+    """Empties the journal, leaving only its header"""
+    with open(path, 'w') as fd:
+        fd.write(json.dumps({'type': 'header', 'version': JOURNAL_VERSION}) + '\n')
+
+
+def read_journal(path):
+    """
+    Replays the journal, returning the checkpoint with the same shape as the one written by save_dict.
+    A partially written last line, from a crash while writing, is ignored
+    """
+    data = {
+        '_checkpoint': {'global_record': {}, 'progress': [], 'records': []},
+        'entry_status': 'Started',
+        'eligible': False,
+        'sensors': [],
+        'values': [],
+        'labels': []
+    }
+    records = {}
+
+    with open(path) as fd:
+        lines = fd.readlines()
+
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if i == len(lines) - 1:
+                print("WARNING: Ignoring the partially written last line of the journal '{}'".format(path))
+                continue
+            raise
+
+        entry_type = entry['type']
+        if entry_type == 'header':
+            if entry['version'] != JOURNAL_VERSION:
+                raise ValueError("Unsupported version {} of the journal '{}'".format(entry['version'], path))
+        elif entry_type == 'record':
+            records[entry['position']] = entry['record']
+        elif entry_type == 'progress':
+            data['_checkpoint']['progress'] = entry['progress']
+        elif entry_type == 'sensors':
+            data['sensors'] = entry['sensors']
+        elif entry_type == 'status':
+            data['entry_status'] = entry['entry_status']
+            data['eligible'] = entry['eligible']
+        elif entry_type == 'global':
+            data['_checkpoint']['global_record'] = entry['global_record']
+            data['values'] = entry['values']
+            data['labels'] = entry['labels']
+
+    # Index -1 = Route in progress
+    data['_checkpoint']['records'] = [records[position] for position in sorted(records)
+                                      if records[position]['index'] != -1]
+    return data
+
+
+def compact_journal(path, endpoint):
+    """
+    Writes the checkpoint of the journal to the endpoint, and rewrites the journal with only its current state
+    """
+    data = read_journal(path)
+    save_dict(endpoint, data)
+
+    entries = [{'type': 'header', 'version': JOURNAL_VERSION}]
+    entries.extend({'type': 'record', 'position': i, 'record': record}
+                   for i, record in enumerate(data['_checkpoint']['records']))
+    entries.append({'type': 'progress', 'progress': data['_checkpoint']['progress']})
+    entries.append({'type': 'sensors', 'sensors': data['sensors']})
+    entries.append({'type': 'status', 'entry_status': data['entry_status'], 'eligible': data['eligible']})
+    if data['_checkpoint']['global_record']:
+        entries.append({'type': 'global', 'global_record': data['_checkpoint']['global_record'],
+                        'values': data['values'], 'labels': data['labels']})
+
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    append_journal(temp_path, entries)
+    os.replace(temp_path, path)
+
+
+def fetch_checkpoint(endpoint):
+    """
+    Reads a checkpoint, from its journal if it has one that is newer than the endpoint
+    """
+    if not endpoint.startswith(('http:', 'https:', 'ftp:')):
+        journal = get_journal_path(endpoint)
+        if os.path.exists(journal) and os.path.getsize(journal) > 0 and \
+                (not os.path.exists(endpoint) or os.path.getmtime(journal) >= os.path.getmtime(endpoint)):
+            return read_journal(journal)
+
+    return fetch_dict(endpoint)
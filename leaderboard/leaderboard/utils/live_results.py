@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Publishers of the live results of the route being run, written by the StatisticsManager.
+
+The endpoint decides how they are published:
+- 'http://<host>:<port>': served as json to any GET request
+- 'unix:<path>': served as json, one line per connection, through a Unix socket
+- Otherwise, the endpoint is a text file, rewritten each time
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+LIVE_RESULTS_TEMPLATE = (
+    "Route id: {route_id}\n\n"
+    "Scores:\n"
+    "    Driving score:      {scores[score_composed]:.3f}\n"
+    "    Route completion:   {scores[score_route]:.3f}\n"
+    "    Infraction penalty: {scores[score_penalty]:.3f}\n\n"
+    "    Route length:    {meta[route_length]:.3f}\n"
+    "    Game duration:   {meta[duration_game]:.3f}\n"
+    "    System duration: {meta[duration_system]:.3f}\n\n"
+    "Ego:\n"
+    "    Throttle:           {ego[throttle]:.3f}\n"
+    "    Brake:              {ego[brake]:.3f}\n"
+    "    Steer:              {ego[steer]:.3f}\n\n"
+    "    Speed:           {ego[speed]:.3f} km/h\n\n"
+    "    Location:           ({ego[location][0]:.3f} {ego[location][1]:.3f} {ego[location][2]:.3f})\n\n"
+    "Total infractions: {num_infractions}\n"
+    "Last 5 infractions:\n"
+)
+
+
+def format_live_results(data):
+    """
+    Returns the text shown at the live results file
+    """
+    text = LIVE_RESULTS_TEMPLATE.format(**data)
+    for infraction in data['last_infractions']:
+        text += "    " + infraction + "\n"
+    return text
+
+
+class FilePublisher(object):
+
+    """
+    Rewrites a text file with the live results
+    """
+
+    def __init__(self, path):
+        self._path = path
+
+    def publish(self, data):
+        """Writes the data, replacing the file at once so that readers never see it half written"""
+        temp_path = self._path + '.tmp'
+        with open(temp_path, 'w') as fd:
+            fd.write(format_live_results(data))
+        os.replace(temp_path, self._path)
+
+    def close(self):
+        """Nothing to release"""
+
+
+class _ServedPublisher(object):
+
+    """
+    Keeps the json of the last published data, which is served from a background thread
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._payload = b'{}'
+        self._server = None
+
+    def get_payload(self):
+        """Returns the json of the last published data"""
+        with self._lock:
+            return self._payload
+
+    def publish(self, data):
+        """Replaces the data being served"""
+        payload = json.dumps(data).encode('utf-8')
+        with self._lock:
+            self._payload = payload
+
+    def _serve(self, server):
+        self._server = server
+        thread = threading.Thread(target=server.serve_forever, name="LiveResultsServer", daemon=True)
+        thread.start()
+
+    def close(self):
+        """Stops serving the data"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class HttpPublisher(_ServedPublisher):
+
+    """
+    Serves the live results as json at any path of 'host:port'
+    """
+
+    def __init__(self, host, port):
+        super(HttpPublisher, self).__init__()
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                payload = publisher.get_payload()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self._serve(ThreadingHTTPServer((host, port), Handler))
+
+    @property
+    def address(self):
+        """Host and port the server is listening to"""
+        return self._server.server_address[:2]
+
+
+class UnixSocketPublisher(_ServedPublisher):
+
+    """
+    Sends the live results as a json line to each connection to the Unix socket, which is then closed
+    """
+
+    def __init__(self, path):
+        super(UnixSocketPublisher, self).__init__()
+        publisher = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(publisher.get_payload() + b'\n')
+
+        if os.path.exists(path):
+            os.remove(path)
+        self._path = path
+        self._serve(socketserver.ThreadingUnixStreamServer(path, Handler))
+
+    def close(self):
+        super(UnixSocketPublisher, self).close()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+def create_live_publisher(endpoint):
+    """
+    Creates the publisher of the endpoint
+    """
+    if endpoint.startswith(('http:', 'https:')):
+        url = urlparse(endpoint)
+        return HttpPublisher(url.hostname or 'localhost', url.port or 8080)
+    if endpoint.startswith('unix:'):
+        return UnixSocketPublisher(endpoint[len('unix:'):])
+    return FilePublisher(endpoint)
+
+
+def get_worker_live_endpoint(endpoint, worker_id):
+    """
+    Endpoint of the live results of a sharded worker: served ones use the next ports,
+    while the files and sockets are placed next to the given one
+    """
+    if endpoint.startswith(('http:', 'https:')):
+        url = urlparse(endpoint)
+        return "{}://{}:{}".format(url.scheme, url.hostname or 'localhost', (url.port or 8080) + worker_id)
+
+    prefix = 'unix:' if endpoint.startswith('unix:') else ''
+    root, extension = os.path.splitext(endpoint[len(prefix):])
+    return "{}{}_worker{}{}".format(prefix, root, worker_id, extension)
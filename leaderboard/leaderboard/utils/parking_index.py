@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Spatial index over the parking slots of a map, used by the RouteScenario to find the slots
+next to the route and those free of scenarios, without scanning the whole map every time.
+
+The slots are read from the compiled files at 'parked_vehicles_data', one per town, which are
+built from the 'parked_vehicles' module by scripts/compile_parked_vehicles.py. Only the file of
+the map being run is loaded, and it is memory mapped, so the module is only imported as a fallback
+for towns without a compiled file.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+import carla
+
+PARKING_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parked_vehicles_data')
+PARKING_FILE_MAGIC = b'PKSL'
+PARKING_FILE_VERSION = 1
+
+# magic, version, amount of slots, size of the mesh table in bytes
+_HEADER = struct.Struct('<4sIII')
+_ALIGNMENT = 8
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_parking_file(path, slots):
+    """
+    Writes the slots to a columnar binary file. After the header and the mesh table, which is a
+    json list of the different mesh paths, come the float32 locations and rotations (N x 3 each),
+    the int16 tiles (N x 2) and the uint16 index of the mesh of each slot, all 8-byte aligned
+    """
+    meshes = sorted({slot['mesh'] for slot in slots})
+    mesh_ids = {mesh: i for i, mesh in enumerate(meshes)}
+
+    columns = [
+        np.array([slot['location'] for slot in slots], dtype='<f4').reshape(-1, 3),
+        np.array([slot['rotation'] for slot in slots], dtype='<f4').reshape(-1, 3),
+        np.array([(slot['tilex'], slot['tiley']) for slot in slots], dtype='<i2').reshape(-1, 2),
+        np.array([mesh_ids[slot['mesh']] for slot in slots], dtype='<u2'),
+    ]
+
+    mesh_table = json.dumps(meshes).encode('utf-8')
+    with open(path, 'wb') as fd:
+        fd.write(_HEADER.pack(PARKING_FILE_MAGIC, PARKING_FILE_VERSION, len(slots), len(mesh_table)))
+        fd.write(mesh_table)
+        for column in columns:
+            fd.write(b'\0' * (_aligned(fd.tell()) - fd.tell()))
+            fd.write(column.tobytes())
+
+
+def read_parking_file(path):
+    """
+    Memory maps a file written by write_parking_file(), returning the locations, rotations,
+    tiles and mesh ids arrays, and the list of meshes they refer to
+    """
+    with open(path, 'rb') as fd:
+        magic, version, amount, table_size = _HEADER.unpack(fd.read(_HEADER.size))
+        if magic != PARKING_FILE_MAGIC or version != PARKING_FILE_VERSION:
+            raise ValueError("'{}' isn't a parking slots file of version {}".format(path, PARKING_FILE_VERSION))
+        meshes = json.loads(fd.read(table_size).decode('utf-8'))
+
+    offset = _HEADER.size + table_size
+    columns = []
+    for dtype, shape in (('<f4', (amount, 3)), ('<f4', (amount, 3)), ('<i2', (amount, 2)), ('<u2', (amount,))):
+        offset = _aligned(offset)
+        if amount == 0:
+            columns.append(np.zeros(shape, dtype=dtype))
+            continue
+        column = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+        columns.append(column)
+        offset += column.nbytes
+
+    return columns[0], columns[1], columns[2], columns[3], meshes
+
+
+class ParkingSlotIndex(object):
+
+    """
+    Stores the slots of a map as numpy arrays, bucketed into a uniform 2D grid of square cells.
+    All queries work with arrays of slot indices, which can be turned back into the slot data
+    with get_transform() and get_mesh()
+    """
+
+    def __init__(self, locations, rotations, mesh_ids, meshes, cell_size=50.0):
+        """
+        Parameters:
+        - locations: array with the x, y, z location of each slot
+        - rotations: array with the pitch, yaw, roll rotation of each slot
+        - mesh_ids: array with the index in 'meshes' of the parked vehicle of each slot
+        - meshes: list of mesh paths
+        - cell_size: side of the grid cells, in meters
+        """
+        self.cell_size = cell_size
+        self.locations = np.asarray(locations).reshape(-1, 3)
+        self.rotations = np.asarray(rotations).reshape(-1, 3)
+        self.mesh_ids = np.asarray(mesh_ids)
+        self.meshes = meshes
+
+        # Sort the slots by cell, so that each cell is a contiguous range of the order array
+        cells = self._to_cells(self.locations[:, :2])
+        keys = self._to_keys(cells)
+        self._order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[self._order]
+        unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+        self._cells = {int(k): (s, s + c) for k, s, c in zip(unique_keys, starts, counts)}
+
+    @classmethod
+    def from_slots(cls, slots, cell_size=50.0):
+        """
+        Creates the index from a list of dictionaries with the 'location', 'rotation' and 'mesh' of each slot
+        """
+        meshes = sorted({slot['mesh'] for slot in slots})
+        mesh_ids = {mesh: i for i, mesh in enumerate(meshes)}
+        return cls([slot['location'] for slot in slots],
+                   [slot['rotation'] for slot in slots],
+                   [mesh_ids[slot['mesh']] for slot in slots],
+                   meshes, cell_size)
+
+    @classmethod
+    def from_file(cls, path, cell_size=50.0):
+        """
+        Creates the index from a file written by write_parking_file()
+        """
+        locations, rotations, _, mesh_ids, meshes = read_parking_file(path)
+        return cls(locations, rotations, mesh_ids, meshes, cell_size)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def _to_cells(self, xy):
+        return np.floor(np.asarray(xy, dtype=np.float64) / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _to_keys(cells):
+        # Pack both cell coordinates into one integer, maps are far from reaching 2^31 cells per axis
+        return (cells[:, 0] << 32) + (cells[:, 1] & 0xFFFFFFFF)
+
+    def _candidates(self, min_xy, max_xy):
+        """
+        Returns the indices of the slots in the cells overlapping any of the given boxes
+        """
+        min_cells = self._to_cells(min_xy)
+        max_cells = self._to_cells(max_xy)
+
+        keys = set()
+        for (min_cx, min_cy), (max_cx, max_cy) in zip(min_cells, max_cells):
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    keys.add((cx << 32) + (cy & 0xFFFFFFFF))
+
+        ranges = [self._cells[key] for key in keys if key in self._cells]
+        if not ranges:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self._order[start:end] for start, end in ranges]))
+
+    def near_points(self, points, radius, indices=None):
+        """
+        Returns a boolean mask, telling which slots are closer than 'radius' to any of the points.
+        If 'indices' is given, only those slots are checked and the mask is relative to them
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        indices = np.asarray(indices, dtype=np.int64)
+        mask = np.zeros(len(indices), dtype=bool)
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points) == 0 or len(indices) == 0:
+            return mask
+
+        candidates = np.intersect1d(self._candidates(points[:, :2] - radius, points[:, :2] + radius), indices)
+        if len(candidates) == 0:
+            return mask
+
+        distances = np.linalg.norm(self.locations[candidates, None, :] - points[None, :, :], axis=2)
+        close = candidates[(distances < radius).any(axis=1)]
+        mask[np.isin(indices, close)] = True
+        return mask
+
+    def near_polyline(self, points, radius, chunk_size=64):
+        """
+        Returns the sorted indices of the slots closer than 'radius' to the polyline joining the points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points) == 0 or len(self) == 0:
+            return np.array([], dtype=np.int64)
+        if len(points) == 1:
+            return np.flatnonzero(self.near_points(points, radius))
+
+        starts, ends = points[:-1], points[1:]
+        candidates = self._candidates(np.minimum(starts, ends)[:, :2] - radius,
+                                      np.maximum(starts, ends)[:, :2] + radius)
+        close = np.zeros(len(candidates), dtype=bool)
+
+        # Chunk the segments so that each chunk is only checked against the candidates in its bounding box
+        for i in range(0, len(starts), chunk_size):
+            a = starts[i:i + chunk_size]
+            b = ends[i:i + chunk_size]
+            min_xy = np.minimum(a, b)[:, :2].min(axis=0) - radius
+            max_xy = np.maximum(a, b)[:, :2].max(axis=0) + radius
+
+            candidate_xy = self.locations[candidates, :2]
+            in_box = np.flatnonzero(~close & np.all((candidate_xy > min_xy) & (candidate_xy < max_xy), axis=1))
+            if len(in_box) == 0:
+                continue
+
+            slots = self.locations[candidates[in_box]]
+            segments = b - a
+            lengths = np.maximum(np.einsum('ij,ij->i', segments, segments), 1e-9)
+            offsets = slots[:, None, :] - a[None, :, :]
+            t = np.clip(np.einsum('kmj,mj->km', offsets, segments) / lengths, 0.0, 1.0)
+            distances = np.linalg.norm(offsets - t[:, :, None] * segments[None, :, :], axis=2)
+            close[in_box[(distances < radius).any(axis=1)]] = True
+
+        return candidates[close]
+
+    def get_transform(self, index):
+        """
+        Returns the carla.Transform of the slot
+        """
+        x, y, z = self.locations[index]
+        pitch, yaw, roll = self.rotations[index]
+        return carla.Transform(carla.Location(float(x), float(y), float(z)),
+                               carla.Rotation(pitch=float(pitch), yaw=float(yaw), roll=float(roll)))
+
+    def get_mesh(self, index):
+        """
+        Returns the mesh path of the parked vehicle of the slot
+        """
+        return self.meshes[self.mesh_ids[index]]
+
+
+_PARKING_INDEXES = {}
+
+
+def get_parking_index(map_name):
+    """
+    Returns the parking slot index of the map, building it the first time it is requested.
+    Maps without parking slots have an empty index
+    """
+    if map_name not in _PARKING_INDEXES:
+        path = os.path.join(PARKING_DATA_DIR, map_name + '.bin')
+        if os.path.isfile(path):
+            _PARKING_INDEXES[map_name] = ParkingSlotIndex.from_file(path)
+        else:
+            import leaderboard.utils.parked_vehicles as parked_vehicles  # pylint: disable=import-outside-toplevel
+            _PARKING_INDEXES[map_name] = ParkingSlotIndex.from_slots(getattr(parked_vehicles, map_name, []))
+    return _PARKING_INDEXES[map_name]
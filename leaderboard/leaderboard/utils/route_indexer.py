@@ -1,29 +1,52 @@
-from collections import OrderedDict
 from dictor import dictor
 
 import copy
 
-from leaderboard.utils.route_parser import RouteParser
-from leaderboard.utils.checkpoint_tools import fetch_dict
+from leaderboard.utils.route_parser import RouteFileIndex
+from leaderboard.utils.checkpoint_tools import fetch_checkpoint
 
 
 class RouteIndexer():
     def __init__(self, routes_file, repetitions, routes_subset):
-        self._configs_dict = OrderedDict()
-        self._configs_list = []
         self.index = 0
 
-        route_configurations = RouteParser.parse_routes_file(routes_file, routes_subset)
-        self.total = len(route_configurations) * repetitions
-
-        for i, config in enumerate(route_configurations):
-            for repetition in range(repetitions):
-                config.index = i * repetitions + repetition
-                config.repetition_index = repetition
-                self._configs_dict['{}.{}'.format(config.name, repetition)] = copy.copy(config)
+        # Routes are parsed when they are run, and all the repetitions of a route share its parsed configuration
+        self._route_index = RouteFileIndex(routes_file)
+        if routes_subset:
+            self._positions = self._route_index.get_subset(routes_subset)
+        else:
+            self._positions = list(range(len(self._route_index)))
+        self._repetitions = repetitions
+        self._parsed_position = None
+        self._parsed_config = None
+        self._key_indices = None
+
+        self.total = len(self._positions) * repetitions
+
+    def _get_route_name(self, index):
+        return "RouteScenario_{}".format(self._route_index.ids[self._positions[index // self._repetitions]])
+
+    def _get_config(self, index):
+        position = self._positions[index // self._repetitions]
+        if position != self._parsed_position:
+            self._parsed_config = self._route_index.parse_route(position)
+            self._parsed_position = position
+
+        config = copy.copy(self._parsed_config)
+        config.index = index
+        config.repetition_index = index % self._repetitions
+        return config
 
-        self._configs_list = list(self._configs_dict.values())
+    def get_config_keys(self):
+        """Returns the keys of all the route configurations, in order"""
+        return ['{}.{}'.format(self._get_route_name(i), i % self._repetitions)
+                for i in range(len(self._positions) * self._repetitions)]
 
+    def get_config(self, key):
+        """Returns the route configuration of the key"""
+        if self._key_indices is None:
+            self._key_indices = {key: i for i, key in enumerate(self.get_config_keys())}
+        return self._get_config(self._key_indices[key])
 
     def peek(self):
         return self.index < self.total
@@ -32,7 +55,7 @@ class RouteIndexer():
         if self.index >= self.total:
             return None
 
-        config = self._configs_list[self.index]
+        config = self._get_config(self.index)
         self.index += 1
 
         return config
@@ -43,7 +66,7 @@ class RouteIndexer():
         If all checks pass, the simulation starts from the last route.
         Otherwise, the resume is canceled, and the leaderboard goes back to normal behavior
         """
-        data = fetch_dict(endpoint)
+        data = fetch_checkpoint(endpoint)
         if not data:
             print('Problem reading checkpoint. Found no data')
             return False
@@ -72,8 +95,10 @@ class RouteIndexer():
         resume_index = progress[0]
         while check_index < resume_index:
             try:
-                route_id = self._configs_list[check_index].name
-                route_id += "_rep" + str(self._configs_list[check_index].repetition_index)
+                if check_index >= len(self._positions) * self._repetitions:
+                    raise IndexError
+                route_id = self._get_route_name(check_index)
+                route_id += "_rep" + str(check_index % self._repetitions)
                 checkpoint_route_id = route_data[check_index]['route_id']
 
                 if route_id != checkpoint_route_id:
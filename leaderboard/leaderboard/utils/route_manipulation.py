@@ -10,8 +10,15 @@ Module to manipulate the routes, by making then more or less dense (Up to a cert
 It also contains functions to convert the CARLA world location do GPS coordinates.
 """
 
+import hashlib
+import json
 import math
+import os
 import xml.etree.ElementTree as ET
+
+import numpy as np
+
+import carla
 from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
 from agents.navigation.global_route_planner import GlobalRoutePlanner
 from agents.navigation.local_planner import RoadOption
@@ -62,7 +69,14 @@ def _get_latlon_ref(world):
     Convert from waypoints world coordinates to CARLA GPS coordinates
     :return: tuple with lat and lon coordinates
     """
-    xodr = world.get_map().to_opendrive()
+    return _get_latlon_ref_from_xodr(world.get_map().to_opendrive())
+
+
+def _get_latlon_ref_from_xodr(xodr):
+    """
+    Get the GPS reference from the header of an OpenDRIVE string
+    :return: tuple with lat and lon coordinates
+    """
     tree = ET.ElementTree(ET.fromstring(xodr))
 
     # default reference
@@ -133,19 +147,132 @@ def downsample_route(route, sample_factor):
     return ids_to_sample
 
 
+# Interpolated routes and route planners, reused by all routes in the same process
+_ROUTE_CACHE_DIR = None
+_ROUTE_MEMORY_CACHE = {}
+_ROUTE_PLANNERS = {}
+_MAP_INFO = {'map': None, 'name': None, 'hash': None, 'latlon': None}
+
+
+def set_route_cache_dir(path):
+    """
+    Sets the folder where the interpolated routes are stored, so that they are reused across runs.
+    An empty path disables the disk cache, leaving only the in-process one
+    """
+    global _ROUTE_CACHE_DIR  # pylint: disable=global-statement
+    _ROUTE_CACHE_DIR = path or None
+    if _ROUTE_CACHE_DIR:
+        os.makedirs(_ROUTE_CACHE_DIR, exist_ok=True)
+
+
+def _get_map_info():
+    """
+    Returns the name, the hash of the OpenDRIVE and the GPS reference of the current map,
+    only recomputing them when the map changes
+    """
+    carla_map = CarlaDataProvider.get_map()
+    if carla_map is not _MAP_INFO['map']:
+        xodr = carla_map.to_opendrive()
+        _MAP_INFO['map'] = carla_map
+        _MAP_INFO['name'] = carla_map.name.split('/')[-1]
+        _MAP_INFO['hash'] = hashlib.sha1(xodr.encode('utf-8')).hexdigest()
+        _MAP_INFO['latlon'] = _get_latlon_ref_from_xodr(xodr)
+    return _MAP_INFO['name'], _MAP_INFO['hash'], _MAP_INFO['latlon']
+
+
+def _get_route_planner(map_name, map_hash, hop_resolution):
+    """
+    Returns the GlobalRoutePlanner of the map, creating it the first time it is requested
+    """
+    key = (map_name, map_hash, hop_resolution)
+    if key not in _ROUTE_PLANNERS:
+        _ROUTE_PLANNERS[key] = GlobalRoutePlanner(CarlaDataProvider.get_map(), hop_resolution)
+    return _ROUTE_PLANNERS[key]
+
+
+def _get_route_key(map_name, map_hash, waypoints_trajectory, hop_resolution):
+    keypoints = [[wp.x, wp.y, wp.z] for wp in waypoints_trajectory]
+    data = json.dumps([map_name, map_hash, keypoints, hop_resolution])
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _route_to_arrays(gps_route, route):
+    """
+    Packs the route as the (N x 6) transforms, (N x 3) GPS coordinates and (N) road options arrays
+    """
+    transforms = np.array([[t.location.x, t.location.y, t.location.z,
+                            t.rotation.pitch, t.rotation.yaw, t.rotation.roll] for t, _ in route],
+                          dtype=np.float64).reshape(-1, 6)
+    gps = np.array([[g['lat'], g['lon'], g['z']] for g, _ in gps_route], dtype=np.float64).reshape(-1, 3)
+    options = np.array([option.value for _, option in route], dtype=np.int8)
+    return transforms, gps, options
+
+
+def _route_from_arrays(transforms, gps, options):
+    """
+    Unpacks the arrays created by _route_to_arrays, creating new objects, so that the callers can modify them
+    """
+    route = []
+    gps_route = []
+    for transform, gps_coord, option in zip(transforms.tolist(), gps.tolist(), options.tolist()):
+        connection = RoadOption(option)
+        route.append((carla.Transform(carla.Location(transform[0], transform[1], transform[2]),
+                                      carla.Rotation(pitch=transform[3], yaw=transform[4], roll=transform[5])),
+                      connection))
+        gps_route.append(({'lat': gps_coord[0], 'lon': gps_coord[1], 'z': gps_coord[2]}, connection))
+    return gps_route, route
+
+
+def _load_cached_route(key):
+    if key in _ROUTE_MEMORY_CACHE:
+        return _ROUTE_MEMORY_CACHE[key]
+
+    if _ROUTE_CACHE_DIR:
+        path = os.path.join(_ROUTE_CACHE_DIR, key + '.npz')
+        if os.path.isfile(path):
+            try:
+                with np.load(path) as data:
+                    arrays = (data['transforms'], data['gps'], data['options'])
+            except (OSError, ValueError, KeyError) as e:
+                print("WARNING: Ignoring the cached route at '{}' as it couldn't be read: {}".format(path, e))
+                return None
+            _ROUTE_MEMORY_CACHE[key] = arrays
+            return arrays
+
+    return None
+
+
+def _save_cached_route(key, arrays):
+    _ROUTE_MEMORY_CACHE[key] = arrays
+
+    if _ROUTE_CACHE_DIR:
+        path = os.path.join(_ROUTE_CACHE_DIR, key + '.npz')
+        temp_path = '{}.{}.tmp.npz'.format(path, os.getpid())
+        transforms, gps, options = arrays
+        np.savez(temp_path, transforms=transforms, gps=gps, options=options)
+        os.replace(temp_path, path)
+
+
 def interpolate_trajectory(waypoints_trajectory, hop_resolution=1.0):
     """
     Given some raw keypoints interpolate a full dense trajectory to be used by the user.
     returns the full interpolated route both in GPS coordinates and also in its original form.
+    The results are cached per map and keypoints, in memory and, if set_route_cache_dir()
+    has been called, on disk.
     
     Args:
         - waypoints_trajectory: the current coarse trajectory
         - hop_resolution: distance between the trajectory's waypoints
     """
+    map_name, map_hash, (lat_ref, lon_ref) = _get_map_info()
+    key = _get_route_key(map_name, map_hash, waypoints_trajectory, hop_resolution)
+
+    arrays = _load_cached_route(key)
+    if arrays is not None:
+        return _route_from_arrays(*arrays)
 
-    grp = GlobalRoutePlanner(CarlaDataProvider.get_map(), hop_resolution)
     # Obtain route plan
-    lat_ref, lon_ref = _get_latlon_ref(CarlaDataProvider.get_world())
+    grp = _get_route_planner(map_name, map_hash, hop_resolution)
 
     route = []
     gps_route = []
@@ -160,4 +287,5 @@ def interpolate_trajectory(waypoints_trajectory, hop_resolution=1.0):
             gps_coord = _location_to_gps(lat_ref, lon_ref, wp.transform.location)
             gps_route.append((gps_coord, connection))
 
+    _save_cached_route(key, _route_to_arrays(gps_route, route))
     return gps_route, route
@@ -6,13 +6,15 @@
 """
 Module used to parse all the route and scenario configuration parameters.
 """
-import math
+import re
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
 
 import carla
 from agents.navigation.local_planner import RoadOption
 from srunner.scenarioconfigs.route_scenario_configuration import RouteScenarioConfiguration
 from srunner.scenarioconfigs.scenario_configuration import ScenarioConfiguration, ActorConfigurationData
+from srunner.tools.route_geometry import RouteGeometry
 
 # Threshold to say if a scenarios trigger position is part of the route
 DIST_THRESHOLD = 2.0
@@ -35,6 +37,100 @@ def convert_elem_to_transform(elem):
     )
 
 
+class RouteFileIndex(object):
+
+    """
+    Ids and byte offsets of the routes of a file, found in a single pass without building the tree.
+    Routes are parsed only when requested, by reading their part of the file
+    """
+
+    def __init__(self, route_filename):
+        self.route_filename = route_filename
+        self.ids = []
+        self._offsets = []  # Start of each route, and end reported by the parser
+        self._positions = {}
+        self._duplicates = set()
+
+        parser = expat.ParserCreate()
+        starts = []
+
+        def start_element(name, attrs):
+            if name == 'route':
+                starts.append(parser.CurrentByteIndex)
+                route_id = attrs['id']
+                if route_id in self._positions:
+                    self._duplicates.add(route_id)
+                else:
+                    self._positions[route_id] = len(self.ids)
+                self.ids.append(route_id)
+
+        def end_element(name):
+            if name == 'route':
+                self._offsets.append((starts.pop(), parser.CurrentByteIndex))
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        with open(route_filename, 'rb') as fd:
+            parser.ParseFile(fd)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _get_position(self, route_id):
+        if route_id not in self._positions:
+            raise ValueError(f"Couldn't find the route with id '{route_id}' inside the given routes file")
+        if route_id in self._duplicates:
+            raise ValueError(f"Found a repeated route with id '{route_id}'")
+        return self._positions[route_id]
+
+    def get_subset(self, routes_subset):
+        """
+        Returns the positions of the routes in the subset, in the order of the file.
+        The route subset can be indicated by single routes separated by commas,
+        or group of routes separated by dashes (or a combination of the two)
+        """
+        positions = set()
+        for group in routes_subset.replace(" ", "").split(','):
+            if "-" in group:
+                # Group of routes, from start to end, making sure both ids exist
+                start, end = group.split('-')
+                start_position = self._get_position(start)
+                end_position = self._get_position(end)
+                if end_position < start_position:
+                    raise ValueError(f"Malformed route subset '{group}', found the end id before the starting one")
+                group_positions = range(start_position, end_position + 1)
+            else:
+                group_positions = [self._get_position(group)]
+
+            for position in group_positions:
+                if position in positions or self.ids[position] in self._duplicates:
+                    raise ValueError(f"Found a repeated route with id '{self.ids[position]}'")
+                positions.add(position)
+
+        return sorted(positions)
+
+    def read_route(self, position):
+        """
+        Returns the element of the route at that position of the file
+        """
+        start, end = self._offsets[position]
+        with open(self.route_filename, 'rb') as fd:
+            fd.seek(start)
+            data = fd.read(end - start)
+            # The parser reports the end of non empty routes at the start of their closing tag,
+            # and that of empty ones (<route .../>) after it, where other closing tags may follow
+            closing = re.match(rb'</route\s*>', fd.read(64))
+        if closing:
+            data += closing.group(0)
+        return ET.fromstring(data)
+
+    def parse_route(self, position):
+        """
+        Returns the configuration of the route at that position of the file
+        """
+        return RouteParser.parse_route(self.read_route(position))
+
+
 class RouteParser(object):
 
     """
@@ -49,100 +145,62 @@ class RouteParser(object):
         :param routes_suset: If set, only the routes in the subset shall be returned
         :return: List of dicts containing the waypoints, id and town of the routes
         """
-        def get_routes_subset():
-            """
-            The route subset can be indicated by single routes separated by commas,
-            or group of routes separated by dashes (or a combination of the two)"""
-            subset_ids = []
-            subset_groups = routes_subset.replace(" ","").split(',')
-            for group in subset_groups:
-                if "-" in group:
-                    # Group of route, iterate from start to end, making sure both ids exist
-                    start, end = group.split('-')
-                    found_start, found_end = (False, False)
-
-                    for route in tree.iter("route"):
-                        route_id = route.attrib['id']
-                        if not found_start and route_id == start:
-                            found_start = True
-                        if not found_start and route_id == end:
-                            raise ValueError(f"Malformed route subset '{group}', found the end id before the starting one")
-                        if not found_end and found_start:
-                            if route_id in subset_ids:
-                                raise ValueError(f"Found a repeated route with id '{route_id}'")
-                            else:
-                                subset_ids.append(route_id)
-                            if route_id == end:
-                                found_end = True
-
-                    if not found_start:
-                        raise ValueError(f"Couldn\'t find the route with id '{start}' inside the given routes file")
-                    if not found_end:
-                        raise ValueError(f"Couldn\'t find the route with id '{end}' inside the given routes file")
+        if not routes_subset:
+            return list(RouteParser.iter_routes_file(route_filename))
+
+        route_index = RouteFileIndex(route_filename)
+        return [route_index.parse_route(position) for position in route_index.get_subset(routes_subset)]
+
+    @staticmethod
+    def iter_routes_file(route_filename):
+        """
+        Parses the routes one by one while the file is read, without keeping the already parsed ones in memory
+        """
+        root = None
+        for event, elem in ET.iterparse(route_filename, events=('start', 'end')):
+            if root is None:
+                root = elem
+            elif event == 'end' and elem.tag == 'route':
+                yield RouteParser.parse_route(elem)
+                root.clear()
 
+    @staticmethod
+    def parse_route(route):
+        """
+        Returns the configuration of a route element
+        """
+        route_config = RouteScenarioConfiguration()
+        route_config.town = route.attrib['town']
+        route_config.name = "RouteScenario_{}".format(route.attrib['id'])
+        route_config.weather = RouteParser.parse_weather(route)
+
+        # The list of carla.Location that serve as keypoints on this route
+        positions = []
+        for position in route.find('waypoints').iter('position'):
+            positions.append(carla.Location(x=float(position.attrib['x']),
+                                            y=float(position.attrib['y']),
+                                            z=float(position.attrib['z'])))
+        route_config.keypoints = positions
+
+        # The list of ScenarioConfigurations that store the scenario's data
+        scenario_configs = []
+        for scenario in route.find('scenarios').iter('scenario'):
+            scenario_config = ScenarioConfiguration()
+            scenario_config.name = scenario.attrib.get('name')
+            scenario_config.type = scenario.attrib.get('type')
+
+            for elem in scenario:
+                if elem.tag == 'trigger_point':
+                    scenario_config.trigger_points.append(convert_elem_to_transform(elem))
+                elif elem.tag == 'other_actor':
+                    scenario_config.other_actors.append(ActorConfigurationData.parse_from_node(elem, 'scenario'))
                 else:
-                    # Just one route, get its id while making sure it exists
-
-                    found = False
-                    for route in tree.iter("route"):
-                        route_id = route.attrib['id']
-                        if route_id == group:
-                            if route_id in subset_ids:
-                                raise ValueError(f"Found a repeated route with id '{route_id}'")
-                            else:
-                                subset_ids.append(route_id)
-                            found = True
-
-                    if not found:
-                        raise ValueError(f"Couldn't find the route with id '{group}' inside the given routes file")
-
-            subset_ids.sort(key=lambda k: int(k))
-            return subset_ids
-
-        route_configs = []
-        tree = ET.parse(route_filename)
-        if routes_subset:
-            subset_list = get_routes_subset()
-        for route in tree.iter("route"):
-
-            route_id = route.attrib['id']
-            if routes_subset and route_id not in subset_list:
-                continue
-
-            route_config = RouteScenarioConfiguration()
-            route_config.town = route.attrib['town']
-            route_config.name = "RouteScenario_{}".format(route_id)
-            route_config.weather = RouteParser.parse_weather(route)
-
-            # The list of carla.Location that serve as keypoints on this route
-            positions = []
-            for position in route.find('waypoints').iter('position'):
-                positions.append(carla.Location(x=float(position.attrib['x']),
-                                                y=float(position.attrib['y']),
-                                                z=float(position.attrib['z'])))
-            route_config.keypoints = positions
-
-            # The list of ScenarioConfigurations that store the scenario's data
-            scenario_configs = []
-            for scenario in route.find('scenarios').iter('scenario'):
-                scenario_config = ScenarioConfiguration()
-                scenario_config.name = scenario.attrib.get('name')
-                scenario_config.type = scenario.attrib.get('type')
-
-                for elem in scenario.getchildren():
-                    if elem.tag == 'trigger_point':
-                        scenario_config.trigger_points.append(convert_elem_to_transform(elem))
-                    elif elem.tag == 'other_actor':
-                        scenario_config.other_actors.append(ActorConfigurationData.parse_from_node(elem, 'scenario'))
-                    else:
-                        scenario_config.other_parameters[elem.tag] = elem.attrib
-
-                scenario_configs.append(scenario_config)
-            route_config.scenario_configs = scenario_configs
-
-            route_configs.append(route_config)
-
-        return route_configs
+                    scenario_config.other_parameters[elem.tag] = elem.attrib
+
+            scenario_configs.append(scenario_config)
+        route_config.scenario_configs = scenario_configs
+
+        return route_config
 
     @staticmethod
     def parse_weather(route):
@@ -175,22 +233,9 @@ class RouteParser(object):
     def is_scenario_at_route(trigger_transform, route):
         """
         Check if the scenario is affecting the route.
-        This is true if the trigger position is very close to any route point
+        This is true if the trigger position is very close to any route point.
+        The route can also be given as a RouteGeometry, to avoid recomputing it for each scenario
         """
-        def is_trigger_close(trigger_transform, route_transform):
-            """Check if the two transforms are similar"""
-            dx = trigger_transform.location.x - route_transform.location.x
-            dy = trigger_transform.location.y - route_transform.location.y
-            dz = trigger_transform.location.z - route_transform.location.z
-            dpos = math.sqrt(dx * dx + dy * dy)
-
-            dyaw = (float(trigger_transform.rotation.yaw) - route_transform.rotation.yaw) % 360
-
-            return dz < DIST_THRESHOLD and dpos < DIST_THRESHOLD \
-                and (dyaw < ANGLE_THRESHOLD or dyaw > (360 - ANGLE_THRESHOLD))
-
-        for route_transform, _ in route:
-            if is_trigger_close(trigger_transform, route_transform):
-                return True
-
-        return False
+        if not isinstance(route, RouteGeometry):
+            route = RouteGeometry(route)
+        return route.is_transform_close(trigger_transform, DIST_THRESHOLD, ANGLE_THRESHOLD)
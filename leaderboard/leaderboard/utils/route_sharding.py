@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Sharded execution of the leaderboard, running the routes across several CARLA servers at the same time.
+
+A coordinator process starts one worker process per server, each one with its own host, ports, and checkpoint.
+The routes are split in contiguous shards, one per worker, and handed to them one at a time. Workers that
+run out of routes steal them from the end of the largest remaining shard. Once all workers are done, their
+checkpoints are merged into the one given to the leaderboard.
+"""
+
+from __future__ import print_function
+
+import copy
+import multiprocessing
+import multiprocessing.connection
+import os
+from collections import deque
+
+from leaderboard.utils.checkpoint_tools import get_journal_path
+from leaderboard.utils.live_results import get_worker_live_endpoint
+from leaderboard.utils.route_indexer import RouteIndexer
+from leaderboard.utils.statistics_merger import merge_statistics
+
+WORKER_PORT_STEP = 3  # CARLA servers use their port and the next two
+
+
+class WorkStealingQueue(object):
+
+    """
+    Splits the routes into contiguous shards, one per worker. Each worker takes the routes of its shard in order,
+    and when it is empty, the last route of the largest shard is stolen
+    """
+
+    def __init__(self, route_keys, num_workers):
+        self._shards = [deque() for _ in range(num_workers)]
+        shard_size, remainder = divmod(len(route_keys), num_workers)
+
+        start = 0
+        for worker_id in range(num_workers):
+            end = start + shard_size + (1 if worker_id < remainder else 0)
+            self._shards[worker_id].extend(route_keys[start:end])
+            start = end
+
+        self.stolen = 0
+
+    def next_route(self, worker_id):
+        """
+        Returns the next route of the worker, or None if there are no routes left
+        """
+        shard = self._shards[worker_id]
+        if shard:
+            return shard.popleft()
+
+        largest_shard = max(self._shards, key=len)
+        if not largest_shard:
+            return None
+
+        self.stolen += 1
+        return largest_shard.pop()
+
+    def remaining(self):
+        """
+        Returns the amount of routes that haven't been handed yet
+        """
+        return sum(len(shard) for shard in self._shards)
+
+
+class ShardedRouteIndexer(RouteIndexer):
+
+    """
+    RouteIndexer used by the workers, whose routes are requested one by one to the coordinator.
+    The configurations are indexed in the order they are run, as that is their position in the worker's checkpoint
+    """
+
+    def __init__(self, routes_file, repetitions, routes_subset, worker_id, connection):
+        super(ShardedRouteIndexer, self).__init__(routes_file, repetitions, routes_subset)
+        self._worker_id = worker_id
+        self._connection = connection
+        self._next_config = None
+        self._finished = False
+        self.total = 0
+
+    def peek(self):
+        if self._next_config is None and not self._finished:
+            self._connection.send(('next', self._worker_id))
+            key = self._connection.recv()
+            if key is None:
+                self._finished = True
+            else:
+                self._next_config = self.get_config(key)
+                self._next_config.index = self.index
+
+        self.total = self.index + (1 if self._next_config is not None else 0)
+        return self._next_config is not None
+
+    def get_next_config(self):
+        if not self.peek():
+            return None
+
+        config = self._next_config
+        self._next_config = None
+        self.index += 1
+        self.total = self.index
+        return config
+
+    def validate_and_resume(self, endpoint):
+        print("WARNING: The sharded evaluation can't be resumed, starting it from the beginning")
+        return False
+
+
+def get_worker_checkpoint(checkpoint, worker_id):
+    """
+    Path of the checkpoint of the worker, next to the global one
+    """
+    root, extension = os.path.splitext(checkpoint)
+    return "{}_worker{}{}".format(root, worker_id, extension)
+
+
+def get_worker_args(args, worker_id):
+    """
+    Copies the leaderboard arguments, changing the server, ports and checkpoints to the ones of the worker.
+    Unless given, ports are spaced from the main ones by WORKER_PORT_STEP per worker
+    """
+    worker_args = copy.copy(args)
+    worker_args.workers = 1
+    worker_args.resume = False
+
+    worker_args.host = args.worker_hosts[worker_id % len(args.worker_hosts)] if args.worker_hosts else args.host
+    if args.worker_ports:
+        worker_args.port = args.worker_ports[worker_id]
+    else:
+        worker_args.port = args.port + WORKER_PORT_STEP * worker_id
+    if args.worker_traffic_manager_ports:
+        worker_args.traffic_manager_port = args.worker_traffic_manager_ports[worker_id]
+    else:
+        worker_args.traffic_manager_port = args.traffic_manager_port + worker_id
+
+    worker_args.checkpoint = get_worker_checkpoint(args.checkpoint, worker_id)
+    worker_args.debug_checkpoint = get_worker_live_endpoint(args.debug_checkpoint, worker_id)
+    return worker_args
+
+
+def run_worker(args, worker_id, connection):
+    """
+    Runs a leaderboard evaluation with the routes handed by the coordinator. Exits with an error if it crashed
+    """
+    # pylint: disable=import-outside-toplevel
+    from leaderboard.leaderboard_evaluator import LeaderboardEvaluator
+    from leaderboard.utils.statistics_manager import StatisticsManager
+
+    route_indexer = ShardedRouteIndexer(args.routes, args.repetitions, args.routes_subset, worker_id, connection)
+    statistics_manager = StatisticsManager(args.checkpoint, args.debug_checkpoint,
+                                           journal=getattr(args, 'checkpoint_journal', False),
+                                           live_period=getattr(args, 'live_period', 1.0))
+    leaderboard_evaluator = LeaderboardEvaluator(args, statistics_manager)
+    crashed = leaderboard_evaluator.run(args, route_indexer)
+
+    del leaderboard_evaluator
+    connection.close()
+
+    if crashed:
+        raise SystemExit(-1)
+
+
+class ShardCoordinator(object):
+
+    """
+    Runs the routes across 'args.workers' processes, started with 'worker_target(args, worker_id, connection)'
+    """
+
+    def __init__(self, args, worker_target=run_worker, start_method='spawn'):
+        self._args = args
+        self._worker_target = worker_target
+        self._context = multiprocessing.get_context(start_method)
+
+        route_indexer = RouteIndexer(args.routes, args.repetitions, args.routes_subset)
+        self.route_keys = route_indexer.get_config_keys()
+        self.queue = WorkStealingQueue(self.route_keys, args.workers)
+        self.routes_per_worker = [0] * args.workers
+
+    def run(self):
+        """
+        Starts the workers, hands them the routes until there are none left and merges their results.
+        Returns True if any of the workers crashed
+        """
+        if self._args.resume:
+            print("WARNING: The sharded evaluation can't be resumed, starting it from the beginning")
+
+        processes = []
+        connections = {}
+        for worker_id in range(self._args.workers):
+            worker_args = get_worker_args(self._args, worker_id)
+            parent_connection, child_connection = self._context.Pipe()
+            process = self._context.Process(target=self._worker_target,
+                                            args=(worker_args, worker_id, child_connection),
+                                            name="LeaderboardWorker{}".format(worker_id))
+            process.start()
+            child_connection.close()
+
+            print("\033[1m> Started worker {} at {}:{} (Traffic Manager port {})\033[0m".format(
+                worker_id, worker_args.host, worker_args.port, worker_args.traffic_manager_port))
+            processes.append(process)
+            connections[parent_connection] = worker_id
+
+        while connections:
+            for connection in multiprocessing.connection.wait(list(connections)):
+                worker_id = connections[connection]
+                try:
+                    _ = connection.recv()
+                except EOFError:
+                    # The worker has finished, or died
+                    del connections[connection]
+                    continue
+
+                route_key = self.queue.next_route(worker_id)
+                if route_key is not None:
+                    self.routes_per_worker[worker_id] += 1
+                connection.send(route_key)
+
+        crashed = False
+        for worker_id, process in enumerate(processes):
+            process.join()
+            if process.exitcode != 0:
+                print("\n\033[91mWorker {} stopped with exit code {}\033[0m".format(worker_id, process.exitcode))
+                crashed = True
+
+        if self.queue.remaining():
+            print("\n\033[91m{} routes were never run, as all workers stopped\033[0m".format(self.queue.remaining()))
+            crashed = True
+
+        print("\033[1m> Merging the results of the workers ({} routes each, {} stolen)\033[0m".format(
+            self.routes_per_worker, self.queue.stolen))
+        worker_checkpoints = [get_worker_checkpoint(self._args.checkpoint, worker_id)
+                              for worker_id in range(self._args.workers)]
+        merge_statistics([path for path in worker_checkpoints
+                          if os.path.exists(path) or os.path.exists(get_journal_path(path))],
+                         self._args.checkpoint, expected_routes=len(self.route_keys))
+
+        return crashed
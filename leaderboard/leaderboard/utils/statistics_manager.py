@@ -11,12 +11,17 @@ This module contains a statistics manager for the CARLA AD leaderboard
 
 from __future__ import print_function
 
+from collections import deque
 from dictor import dictor
 import math
+import os
+import time
 
 from srunner.scenariomanager.traffic_events import TrafficEventType
 
-from leaderboard.utils.checkpoint_tools import fetch_dict, save_dict
+from leaderboard.utils.checkpoint_tools import (append_journal, clear_journal, compact_journal, fetch_checkpoint,
+                                                get_journal_path, save_dict)
+from leaderboard.utils.live_results import create_live_publisher
 
 PENALTY_VALUE_DICT = {
     # Traffic events that substract a set amount of points
@@ -165,6 +170,107 @@ def to_route_record(record_dict):
     return record
 
 
+class LiveRouteStatistics(object):
+
+    """
+    Route statistics for the live results. Each update only goes through the criteria events raised since
+    the previous one, except for those changed in place by their criteria, which are few and checked every time
+    """
+
+    VARIABLE_EVENTS = (TrafficEventType.ROUTE_COMPLETION, TrafficEventType.OUTSIDE_ROUTE_LANES_INFRACTION)
+
+    def __init__(self, route_id, route_length, scenario):
+        self.route_id = route_id
+        self.route_length = route_length
+        self.scenario = scenario
+        self._criteria = scenario.get_criteria() if scenario else []
+        self._seen_events = [0] * len(self._criteria)
+
+        self.infraction_value = 0
+        self.num_infractions = 0
+        self.failure_message = ""
+        self._variable_events = []
+        self._last_events = deque(maxlen=5)
+
+    def update(self):
+        """Goes through the new events of the criteria"""
+        for i, criterion in enumerate(self._criteria):
+            events = criterion.events
+            for event in events[self._seen_events[i]:]:
+                event_type = event.get_type()
+                if event_type in self.VARIABLE_EVENTS:
+                    self._variable_events.append(event)
+                    if event_type == TrafficEventType.OUTSIDE_ROUTE_LANES_INFRACTION:
+                        self.num_infractions += 1
+                    continue
+
+                if event_type in PENALTY_VALUE_DICT:
+                    value = PENALTY_VALUE_DICT[event_type]
+                    if event_type == TrafficEventType.MIN_SPEED_INFRACTION:
+                        value *= (1 - event.get_dict()['percentage'] / 100)
+                    self.infraction_value += value
+                elif event_type == TrafficEventType.ROUTE_DEVIATION:
+                    self.failure_message = "Agent deviated from the route"
+                elif event_type == TrafficEventType.VEHICLE_BLOCKED:
+                    self.failure_message = "Agent got blocked"
+                else:
+                    continue
+                self.num_infractions += 1
+                self._last_events.append(event)
+            self._seen_events[i] = len(events)
+
+    def to_json(self, duration_time_system, duration_time_game, ego_speed, ego_control, ego_location):
+        """Return a JSON serializable object, with the same scores as compute_route_statistics"""
+        score_route = 0.0
+        score_penalty = 1.0
+        last_events = list(self._last_events)
+        for event in self._variable_events:
+            if event.get_type() == TrafficEventType.ROUTE_COMPLETION:
+                score_route = event.get_dict()['route_completed']
+            else:
+                score_penalty *= (1 - event.get_dict()['percentage'] / 100)
+                last_events.append(event)
+        score_penalty *= 1 / (1 + self.infraction_value)
+
+        num_infractions = self.num_infractions
+        if self.scenario and self.scenario.timeout_node.timeout:
+            num_infractions += 1
+
+        last_infractions = []
+        for event in sorted(last_events, key=lambda e: e.get_frame(), reverse=True)[:5]:
+            event_type = event.get_type()
+            string = str(event_type).replace("TrafficEventType.", "")
+            if event_type in [TrafficEventType.OUTSIDE_ROUTE_LANES_INFRACTION, TrafficEventType.MIN_SPEED_INFRACTION]:
+                string += " (value: " + str(round(event.get_dict()['percentage'], 3)) + "%)"
+            elif event_type in PENALTY_VALUE_DICT:
+                string += " (penalty: " + str(PENALTY_VALUE_DICT[event_type]) + ")"
+            last_infractions.append(string)
+
+        return {
+            'route_id': self.route_id,
+            'scores': {
+                'score_route': round(score_route, ROUND_DIGITS_SCORE),
+                'score_penalty': round(score_penalty, ROUND_DIGITS_SCORE),
+                'score_composed': round(max(score_route * score_penalty, 0.0), ROUND_DIGITS_SCORE)
+            },
+            'meta': {
+                'route_length': self.route_length,
+                'duration_game': round(duration_time_game, ROUND_DIGITS),
+                'duration_system': round(duration_time_system, ROUND_DIGITS)
+            },
+            'ego': {
+                'throttle': ego_control.throttle,
+                'brake': ego_control.brake,
+                'steer': ego_control.steer,
+                'speed': ego_speed * 3.6,
+                'location': [ego_location.x, ego_location.y, ego_location.z]
+            },
+            'num_infractions': num_infractions,
+            'failure_message': self.failure_message,
+            'last_infractions': last_infractions
+        }
+
+
 def compute_route_length(route):
     route_length = 0.0
     previous_location = None
@@ -187,7 +293,12 @@ class StatisticsManager(object):
     It gathers data at runtime via the scenario evaluation criteria.
     """
 
-    def __init__(self, endpoint, debug_endpoint):
+    def __init__(self, endpoint, debug_endpoint, journal=False, live_period=1.0):
+        """
+        With 'journal', write_statistics() only appends the changes since its last call to a journal
+        next to the endpoint, which is compacted into the endpoint by validate_and_write_statistics().
+        The live results are published to the debug endpoint at most once every 'live_period' seconds
+        """
         self._scenario = None
         self._route_length = 0
         self._total_routes = 0
@@ -195,21 +306,41 @@ class StatisticsManager(object):
         self._endpoint = endpoint
         self._debug_endpoint = debug_endpoint
 
+        self._journal = None
+        if journal:
+            if endpoint.startswith(('http:', 'https:', 'ftp:')):
+                print("WARNING: The checkpoint journal is only available for local files, ignoring it")
+            else:
+                self._journal = get_journal_path(endpoint)
+
+        # Parts of the results changed since the last write to the journal
+        self._changed_records = set()
+        self._changed = set()
+
+        self._live_period = live_period
+        self._live_time = -float('inf')
+        self._live_statistics = None
+        self._live_publisher = None
+        self._live_values = None  # Values of the last update, if it hasn't been published yet
+
     def add_file_records(self, endpoint):
         """Reads a file and saves its records onto the statistics manager"""
-        data = fetch_dict(endpoint)
+        data = fetch_checkpoint(endpoint)
 
         if data:
             route_records = dictor(data, '_checkpoint.records')
             if route_records:
                 for record in route_records:
                     self._results.checkpoint.records.append(to_route_record(record))
+                    self._changed_records.add(len(self._results.checkpoint.records) - 1)
 
     def clear_records(self):
         """Cleanes up the file"""
         if not self._endpoint.startswith(('http:', 'https:', 'ftp:')):
             with open(self._endpoint, 'w') as fd:
                 fd.truncate(0)
+        if self._journal:
+            clear_journal(self._journal)
 
     def sort_records(self):
         """Sorts the route records according to their route id (This being i.e RouteScenario0_rep0)"""
@@ -220,77 +351,52 @@ class StatisticsManager(object):
 
         for i, record in enumerate(self._results.checkpoint.records):
             record.index = i
+            self._changed_records.add(i)
 
-    def write_live_results(self, index, ego_speed, ego_control, ego_location):
-        """Writes live results"""
-        route_record = self._results.checkpoint.records[index]
-
-        all_events = []
-        if self._scenario:
-            for node in self._scenario.get_criteria():
-                all_events.extend(node.events)
-
-        all_events.sort(key=lambda e: e.get_frame(), reverse=True)
-
-        with open(self._debug_endpoint, 'w') as f:
-            f.write("Route id: {}\n\n"
-                    "Scores:\n"
-                    "    Driving score:      {:.3f}\n"
-                    "    Route completion:   {:.3f}\n"
-                    "    Infraction penalty: {:.3f}\n\n"
-                    "    Route length:    {:.3f}\n"
-                    "    Game duration:   {:.3f}\n"
-                    "    System duration: {:.3f}\n\n"
-                    "Ego:\n"
-                    "    Throttle:           {:.3f}\n"
-                    "    Brake:              {:.3f}\n"
-                    "    Steer:              {:.3f}\n\n"
-                    "    Speed:           {:.3f} km/h\n\n"
-                    "    Location:           ({:.3f} {:.3f} {:.3f})\n\n"
-                    "Total infractions: {}\n"
-                    "Last 5 infractions:\n".format(
-                        route_record.route_id,
-                        route_record.scores["score_composed"],
-                        route_record.scores["score_route"],
-                        route_record.scores["score_penalty"],
-                        route_record.meta["route_length"],
-                        route_record.meta["duration_game"],
-                        route_record.meta["duration_system"],
-                        ego_control.throttle,
-                        ego_control.brake,
-                        ego_control.steer,
-                        ego_speed * 3.6,
-                        ego_location.x,
-                        ego_location.y,
-                        ego_location.z,
-                        route_record.num_infractions
-                    )
-                )
-            for e in all_events[:5]:
-                # Prevent showing the ROUTE_COMPLETION event.
-                event_type = e.get_type()
-                if event_type == TrafficEventType.ROUTE_COMPLETION:
-                    continue
-                string = "    " + str(e.get_type()).replace("TrafficEventType.", "")
-                if event_type in [TrafficEventType.OUTSIDE_ROUTE_LANES_INFRACTION, TrafficEventType.MIN_SPEED_INFRACTION]:
-                    string += " (value: " + str(round(e.get_dict()['percentage'], 3)) + "%)\n"
-                elif event_type in PENALTY_VALUE_DICT:
-                    string += " (penalty: " + str(PENALTY_VALUE_DICT[event_type]) + ")\n"
-
-                f.write(string)
+    def write_live_results(self, index, ego_speed, ego_control, ego_location,
+                           duration_time_system=-1, duration_time_game=-1, force=False):
+        """
+        Updates the live results with the criteria events raised since the last call,
+        publishing them if at least 'live_period' seconds have passed since the last publication
+        """
+        if self._live_statistics is None or self._live_statistics.scenario is not self._scenario:
+            route_id = self._results.checkpoint.records[index].route_id
+            self._live_statistics = LiveRouteStatistics(route_id, self._route_length, self._scenario)
+        self._live_statistics.update()
+        self._live_values = (duration_time_system, duration_time_game, ego_speed, ego_control, ego_location)
+
+        if force or time.time() - self._live_time >= self._live_period:
+            self._publish_live_results()
+
+    def _publish_live_results(self):
+        self._live_time = time.time()
+        if self._live_publisher is None:
+            self._live_publisher = create_live_publisher(self._debug_endpoint)
+        self._live_publisher.publish(self._live_statistics.to_json(*self._live_values))
+        self._live_values = None
+
+    def close_live_results(self):
+        """Stops publishing the live results"""
+        if self._live_publisher is not None:
+            self._live_publisher.close()
+            self._live_publisher = None
+        self._live_statistics = None
 
     def save_sensors(self, sensors):
         self._results.sensors = sensors
+        self._changed.add('sensors')
 
     def save_entry_status(self, entry_status):
         if entry_status not in ENTRY_STATUS_VALUES:
             raise ValueError("Found an invalid value for 'entry_status'")
         self._results.entry_status = entry_status
         self._results.eligible = ELIGIBLE_VALUES[entry_status]
+        self._changed.add('status')
 
     def save_progress(self, route_index, total_routes):
         self._results.checkpoint.progress = [route_index, total_routes]
         self._total_routes = total_routes
+        self._changed.add('progress')
 
     def create_route_data(self, route_id, index):
         """
@@ -304,8 +410,19 @@ class StatisticsManager(object):
         route_records = self._results.checkpoint.records
         if index < len(route_records):
             self._results.checkpoint.records[index] = route_record
+            self._changed_records.add(index)
         else:
             self._results.checkpoint.records.append(route_record)
+            self._changed_records.add(len(route_records) - 1)
+
+    def get_route_id(self, index):
+        """Returns the id of the route record"""
+        return self._results.checkpoint.records[index].route_id
+
+    def save_route_profile(self, index, profile):
+        """Saves the summary of the TickProfiler timers and counters of the route"""
+        self._results.checkpoint.records[index].meta['profile'] = profile
+        self._changed_records.add(index)
 
     def set_scenario(self, scenario):
         """Sets the scenario from which the statistics will be taken"""
@@ -313,8 +430,12 @@ class StatisticsManager(object):
         self._route_length = round(compute_route_length(scenario.route), ROUND_DIGITS)
 
     def remove_scenario(self):
-        """Removes the scenario"""
+        """Removes the scenario, publishing the last live results"""
         self._scenario = None
+        if self._live_statistics is not None and self._live_values is not None:
+            self._publish_live_results()
+        self._live_statistics = None
+        self._live_time = -float('inf')
         self._route_length = 0
 
     def compute_route_statistics(self, route_index, duration_time_system=-1, duration_time_game=-1, failure_message=""):
@@ -412,6 +533,7 @@ class StatisticsManager(object):
             self._results.checkpoint.records[route_index] = route_record
         else:
             raise ValueError("Not enough entries in the route record")
+        self._changed_records.add(route_index)
 
     def compute_global_statistics(self):
         """Computes and saves the global statistics of the routes"""
@@ -484,6 +606,7 @@ class StatisticsManager(object):
 
         # Save the global records
         self._results.checkpoint.global_record = global_record
+        self._changed.add('global')
 
         # Change the values and labels. These MUST HAVE A MATCHING ORDER
         self._results.values = [
@@ -575,10 +698,37 @@ class StatisticsManager(object):
             self.save_entry_status('Invalid')
 
         self.write_statistics()
+        if self._journal:
+            compact_journal(self._journal, self._endpoint)
 
     def write_statistics(self):
         """
         Writes the results into the endpoint. Meant to be used only for partial evaluations,
         use 'validate_and_write_statistics' for the final one as it only validates the data.
+        With the journal, only the parts changed since the last call are appended to it.
         """
-        save_dict(self._endpoint, self._results.to_json())
+        if not self._journal:
+            save_dict(self._endpoint, self._results.to_json())
+            return
+
+        results = self._results
+        records = results.checkpoint.records
+        entries = []
+        if not os.path.exists(self._journal):
+            clear_journal(self._journal)
+        for position in sorted(self._changed_records):
+            if position < len(records):
+                entries.append({'type': 'record', 'position': position, 'record': records[position].to_json()})
+        if 'progress' in self._changed:
+            entries.append({'type': 'progress', 'progress': results.checkpoint.progress})
+        if 'sensors' in self._changed:
+            entries.append({'type': 'sensors', 'sensors': results.sensors})
+        if 'status' in self._changed:
+            entries.append({'type': 'status', 'entry_status': results.entry_status, 'eligible': results.eligible})
+        if 'global' in self._changed and results.checkpoint.global_record:
+            entries.append({'type': 'global', 'global_record': results.checkpoint.global_record.to_json(),
+                            'values': results.values, 'labels': results.labels})
+
+        append_journal(self._journal, entries)
+        self._changed_records.clear()
+        self._changed.clear()
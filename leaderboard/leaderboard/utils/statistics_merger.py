@@ -0,0 +1,104 @@
+"""
+Merges the partial results of several leaderboard runs, i.e. the checkpoints of the workers of a
+sharded evaluation, into one. While some checks are done, it is best to ensure that merging all files makes sense
+"""
+
+from leaderboard.utils.checkpoint_tools import fetch_checkpoint
+from leaderboard.utils.statistics_manager import StatisticsManager
+
+
+def check_duplicates(route_ids):
+    """Checks that all route ids are present only once in the files"""
+    for id in route_ids:
+        if route_ids.count(id) > 1:
+            raise ValueError(f"Stopping. Found that the route {id} has more than one record")
+
+
+def check_missing_data(route_ids):
+    """Checks that there is no missing data, by changing their route id to an integer"""
+    rep_num = 1
+    prev_rep_int = 0
+    prev_total_int = 0
+    prev_id = ""
+
+    for id in route_ids:
+        route_int = int(id.split('_')[1])
+        rep_int = int(id.split('_rep')[-1])
+
+        # Get the amount of repetitions. Done when a reset of the repetition number is found
+        if rep_int < prev_rep_int:
+            rep_num = prev_rep_int + 1
+
+        # Missing data will create a jump of 2 units
+        # (i.e if 'Route0_rep1' is missing, 'Route0_rep0' will be followed by 'Route0_rep2', which are two units)
+        total_int = route_int * rep_num + rep_int
+        if total_int - prev_total_int > 1: 
+            raise ValueError(f"Stopping. Missing some data as the ids jumped from {prev_id} to {id}")
+
+        prev_rep_int = rep_int
+        prev_total_int = total_int
+        prev_id = id
+
+
+def merge_statistics(file_paths, endpoint, expected_routes=None):
+    """
+    Joins the records of all the files into the endpoint. The global statistics are only computed
+    if the files have all the routes of the evaluation, which is returned.
+    If the amount of routes of the evaluation is known, it can be given as 'expected_routes',
+    instead of deducing it from the progress and route ids of the files
+    """
+    # Initialize the statistics manager
+    statistics_manager = StatisticsManager(endpoint, 0)
+
+    # Make sure that the data is correctly formed
+    sensors = []
+    route_ids = []
+    total_routes = 0
+    total_progress = 0
+
+    for file in file_paths:
+        data = fetch_checkpoint(file)
+        if not data:
+            continue
+
+        route_ids.extend([x['route_id'] for x in data['_checkpoint']['records']])
+        total_routes += len(data['_checkpoint']['records'])
+        total_progress += data['_checkpoint']['progress'][1]
+
+        if data['sensors']:
+            if not sensors:
+                sensors = data['sensors']
+            elif data['sensors'] != sensors:
+                raise ValueError("Stopping. Found two files with different sensor configurations")
+
+    route_ids.sort(key=lambda x: (
+        int(x.split('_')[1]),
+        int(x.split('_rep')[-1])
+    ))
+
+    if expected_routes is None:
+        global_statistics = total_progress != 0 and total_routes == total_progress
+    else:
+        global_statistics = expected_routes != 0 and total_routes == expected_routes
+        total_progress = expected_routes
+
+    if global_statistics:
+        check_duplicates(route_ids)
+        if expected_routes is None:
+            check_missing_data(route_ids)
+
+    # All good, join the data and get the global results
+    for file in file_paths:
+        statistics_manager.add_file_records(file)
+
+    statistics_manager.sort_records()
+    statistics_manager.save_sensors(sensors)
+    statistics_manager.save_progress(total_routes, total_progress)
+    statistics_manager.save_entry_status('Started')
+    if global_statistics:
+        statistics_manager.compute_global_statistics()
+        statistics_manager.validate_and_write_statistics(True, False)
+    else:
+        statistics_manager.write_statistics()
+
+    return global_statistics
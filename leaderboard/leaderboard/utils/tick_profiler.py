@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Tick-level profiling of the leaderboard, with named timers and counters.
+
+The timers are used as context managers around each part of a tick, for example:
+
+    with TickProfiler.timer('scenario_tree.tick_once'):
+        self.scenario_tree.tick_once()
+
+When the profiler is disabled, which is the default, timer() returns a shared no-op context,
+so the instrumentation can stay in place. When enabled, the duration of each timed call is kept,
+giving the percentiles of each timer per route, and optionally a Chrome trace (chrome://tracing).
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+class _NullTimer(object):
+
+    """
+    Timer used when the profiler is disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class _Timer(object):
+
+    """
+    Measures the wall time of its block, adding it as a sample of the named timer
+    """
+
+    __slots__ = ('_name', '_start')
+
+    def __init__(self, name):
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        TickProfiler.add_sample(self._name, time.perf_counter() - self._start, self._start)
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class TickProfiler(object):
+
+    """
+    Pure static class with the samples of the named timers and the counters of the current route
+    """
+
+    _enabled = False
+    _trace_enabled = False
+    _lock = threading.Lock()
+    _samples = defaultdict(list)
+    _counters = defaultdict(int)
+    _trace_events = []
+
+    @staticmethod
+    def enable(enabled=True, trace=False):
+        """
+        Enables or disables the profiler. With 'trace', the timed calls are also kept for dump_trace()
+        """
+        TickProfiler._enabled = enabled
+        TickProfiler._trace_enabled = enabled and trace
+        TickProfiler.reset()
+
+    @staticmethod
+    def is_enabled():
+        """Returns whether the profiler is enabled"""
+        return TickProfiler._enabled
+
+    @staticmethod
+    def timer(name):
+        """
+        Returns a context manager measuring the wall time of its block as a sample of the named timer
+        """
+        if not TickProfiler._enabled:
+            return _NULL_TIMER
+        return _Timer(name)
+
+    @staticmethod
+    def add_sample(name, duration, start=None):
+        """
+        Adds a duration, in seconds, to the named timer. 'start' is the perf_counter() value at which it started
+        """
+        if not TickProfiler._enabled:
+            return
+        with TickProfiler._lock:
+            TickProfiler._samples[name].append(duration)
+            if TickProfiler._trace_enabled:
+                if start is None:
+                    start = time.perf_counter() - duration
+                TickProfiler._trace_events.append((name, start, duration, threading.get_ident()))
+
+    @staticmethod
+    def count(name, value=1):
+        """Increments the named counter"""
+        if not TickProfiler._enabled:
+            return
+        with TickProfiler._lock:
+            TickProfiler._counters[name] += value
+
+    @staticmethod
+    def reset():
+        """Removes all the samples and counters, done at the start of each route"""
+        with TickProfiler._lock:
+            TickProfiler._samples = defaultdict(list)
+            TickProfiler._counters = defaultdict(int)
+            TickProfiler._trace_events = []
+
+    @staticmethod
+    def get_summary():
+        """
+        Returns the amount of samples, total, mean, p50, p95, p99 and max (all but the amount in milliseconds)
+        of each timer, and the value of each counter
+        """
+        with TickProfiler._lock:
+            samples = {name: np.array(values) * 1000 for name, values in TickProfiler._samples.items()}
+            counters = dict(TickProfiler._counters)
+
+        timers = {}
+        for name in sorted(samples):
+            values = samples[name]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            timers[name] = {
+                'count': len(values),
+                'total': round(float(values.sum()), 3),
+                'mean': round(float(values.mean()), 3),
+                'p50': round(float(p50), 3),
+                'p95': round(float(p95), 3),
+                'p99': round(float(p99), 3),
+                'max': round(float(values.max()), 3)
+            }
+        return {'timers': timers, 'counters': counters}
+
+    @staticmethod
+    def dump_trace(path):
+        """
+        Writes the timed calls as a Chrome trace json file, to be opened at chrome://tracing or Perfetto
+        """
+        with TickProfiler._lock:
+            trace_events = list(TickProfiler._trace_events)
+
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': round(start * 1e6, 3), 'dur': round(duration * 1e6, 3)}
+                  for name, start, duration, tid in trace_events]
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(path, 'w') as fd:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fd)
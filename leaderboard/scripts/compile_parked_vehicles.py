@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Compiles the parking slots of leaderboard/utils/parked_vehicles.py into one columnar binary file per town,
+which is what the RouteScenario loads. Run it again every time the parked_vehicles module is modified.
+"""
+
+import argparse
+import os
+
+import leaderboard.utils.parked_vehicles as parked_vehicles
+from leaderboard.utils.parking_index import PARKING_DATA_DIR, read_parking_file, write_parking_file
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument('--towns', nargs='+', default=None,
+                           help='Towns to compile (default: all the ones in the parked_vehicles module)')
+    argparser.add_argument('--output-dir', default=PARKING_DATA_DIR,
+                           help='Folder where the files are written (default: %(default)s)')
+    args = argparser.parse_args()
+
+    towns = args.towns or sorted(name for name in dir(parked_vehicles) if not name.startswith('_'))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for town in towns:
+        slots = getattr(parked_vehicles, town, None)
+        if slots is None:
+            print("WARNING: Town '{}' has no parking slots, skipping it".format(town))
+            continue
+
+        path = os.path.join(args.output_dir, town + '.bin')
+        write_parking_file(path, slots)
+
+        meshes = read_parking_file(path)[4]
+        print("{}: {} slots, {} meshes, {:.1f} KB -> {}".format(
+            town, len(slots), len(meshes), os.path.getsize(path) / 1024, path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def _ego_rotation(compass):
+    # same rotation the agents use to express the target point in the ego frame
+    theta = compass + np.pi / 2
+    return np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+
+
+class WaypointPlan(object):
+    """
+    The outputs of one finished LLM request, together with the ego pose of the frame it was requested for
+    """
+
+    def __init__(self, outputs, timestamp, position, compass):
+        self.outputs = outputs
+        self.timestamp = timestamp
+        self.position = np.array(position, dtype=np.float64)
+        self.compass = compass
+
+    def waypoints(self, position, compass):
+        """
+        Returns the planned waypoints expressed in the ego frame of the given (current) pose
+        """
+        waypoints = np.array(self.outputs['output_waypoints'], dtype=np.float64)
+        world = self.position + waypoints.dot(_ego_rotation(self.compass).T)
+        local = (world - np.array(position, dtype=np.float64)).dot(_ego_rotation(compass))
+        return local.tolist()
+
+
+class AsyncPlanner(object):
+    """
+    Runs the LLM requests on a background worker so that the simulation does not wait for them.
+    At most one request is in flight, and the last finished plan is kept until a newer one replaces it.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+        self._lock = threading.Lock()
+        self._latest = None
+
+    def busy(self):
+        return self._future is not None and not self._future.done()
+
+    def submit(self, request, timestamp, position, compass):
+        """
+        Starts the request (a callable returning the parsed LLM outputs) unless another one is still running
+        """
+        if self.busy():
+            return False
+
+        position = np.array(position, dtype=np.float64)
+
+        def _run():
+            plan = WaypointPlan(request(), timestamp, position, compass)
+            with self._lock:
+                self._latest = plan
+
+        self._future = self._executor.submit(_run)
+        return True
+
+    def latest(self):
+        if self._future is not None and self._future.done():
+            exception = self._future.exception()
+            if exception is not None:
+                print("The asynchronous LLM request failed: {}".format(exception))
+            self._future = None
+
+        with self._lock:
+            return self._latest
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
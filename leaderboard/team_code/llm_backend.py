@@ -0,0 +1,80 @@
+from leaderboard.utils.tick_profiler import TickProfiler
+
+
+class LLMBackend(object):
+    """
+    Base class of the services answering the planning prompt. complete() returns the raw text of the answer.
+    """
+
+    def complete(self, prompt):
+        raise NotImplementedError
+
+
+class OpenAIResponsesBackend(LLMBackend):
+    """
+    Uses the responses API of OpenAI, or of any server speaking it when a base_url is given
+    """
+
+    def __init__(self, model, api_key, base_url=None, max_output_tokens=2500):
+        from openai import OpenAI
+
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+
+    def complete(self, prompt):
+        with TickProfiler.timer('llm.complete'):
+            response = self.client.responses.create(
+                model=self.model,
+                input=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "input_text", "text": prompt},
+                        ],
+                    }
+                ],
+                max_output_tokens=self.max_output_tokens,
+            )
+        return response.output_text
+
+
+class OpenAIChatBackend(LLMBackend):
+    """
+    Uses the chat completions API, which most locally hosted models (vLLM, Ollama, llama.cpp, ...) expose
+    """
+
+    def __init__(self, model, api_key, base_url=None, max_output_tokens=2500):
+        from openai import OpenAI
+
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+
+    def complete(self, prompt):
+        with TickProfiler.timer('llm.complete'):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.max_output_tokens,
+            )
+        return response.choices[0].message.content
+
+
+BACKENDS = {
+    'openai_responses': OpenAIResponsesBackend,
+    'openai_chat': OpenAIChatBackend,
+}
+
+
+def create_backend(config):
+    """
+    Creates the backend named by config.llm_backend, pointed at config.llm_base_url if there is one
+    """
+    if config.llm_backend not in BACKENDS:
+        raise ValueError("Unknown LLM backend '{}', use one of {}".format(config.llm_backend, list(BACKENDS)))
+
+    return BACKENDS[config.llm_backend](model=config.llm_model,
+                                        api_key=config.llm_key,
+                                        base_url=config.llm_base_url,
+                                        max_output_tokens=config.llm_max_output_tokens)
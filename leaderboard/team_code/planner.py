@@ -215,7 +215,7 @@ class InstructionPlanner(object):
         return waypoints_list, traffic_light_dict
 
     def _find_closest_valid_traffic_light(self, loc, min_dis):
-        wp = self._map.get_waypoint(loc)
+        wp = CarlaDataProvider.get_waypoint(loc)
         min_wp = None
         min_distance = min_dis
         for waypoint in self._list_traffic_waypoints:
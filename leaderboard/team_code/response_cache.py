@@ -0,0 +1,123 @@
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def quantize(value, step):
+    if step <= 0:
+        return value
+    return round(round(value / step) * step, 6)
+
+
+class ResponseCache(object):
+    """
+    Cache of the parsed LLM outputs, keyed on the normalized prompt texts and the quantized speed and target point.
+    Entries live in an in-memory LRU and, if a path is given, in a sqlite file that survives across routes.
+    Identical requests made while the first one is still running wait for its result instead of querying again.
+    """
+
+    def __init__(self, max_size=256, path=None, speed_step=0.5, target_step=1.0):
+        self.max_size = max_size
+        self.speed_step = speed_step
+        self.target_step = target_step
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._in_flight = {}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, outputs TEXT)")
+            self._db.commit()
+
+    def make_key(self, texts, speed, target_point):
+        text = " | ".join(" ".join(str(t).split()) for t in texts)
+        speed = quantize(float(speed), self.speed_step)
+        target = [quantize(float(v), self.target_step) for v in np.ravel(target_point)]
+        return hashlib.sha1(json.dumps([text, speed, target]).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key, outputs):
+        with self._lock:
+            self._put(key, outputs)
+
+    def get_or_request(self, key, request):
+        """
+        Returns the cached outputs of the key, otherwise calls the request and caches what it returns
+        """
+        with self._lock:
+            outputs = self._get(key)
+            if outputs is not None:
+                self.hits += 1
+                return outputs
+
+            future = self._in_flight.get(key)
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            outputs = request()
+            self.put(key, outputs)
+            future.set_result(outputs)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return outputs
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        if self._db is not None:
+            row = self._db.execute("SELECT outputs FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                outputs = json.loads(row[0])
+                self._remember(key, outputs)
+                return outputs
+
+        return None
+
+    def _put(self, key, outputs):
+        self._remember(key, outputs)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO responses (key, outputs) VALUES (?, ?)",
+                             (key, json.dumps(outputs)))
+            self._db.commit()
+
+    def _remember(self, key, outputs):
+        if self.max_size <= 0:
+            return
+        self._memory[key] = outputs
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from leaderboard.utils.tick_profiler import TickProfiler
+
+
+def image_hash(image, hash_size=8):
+    """
+    Difference hash of the downsampled grayscale image, as an integer of hash_size * hash_size bits
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).tobytes().hex(), 16)
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count('1')
+
+
+class CaptionCache(object):
+    """
+    LRU cache of captions keyed on the perceptual hash of each camera image. An image whose hash is
+    within max_distance bits of a cached one of the same camera reuses its caption.
+    """
+
+    def __init__(self, max_size=64, max_distance=4):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, camera, hash_value):
+        key = (camera, hash_value)
+        if key not in self._entries and self.max_distance > 0:
+            for cached_camera, cached_hash in reversed(self._entries):
+                if cached_camera == camera and hamming_distance(cached_hash, hash_value) <= self.max_distance:
+                    key = (cached_camera, cached_hash)
+                    break
+
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, camera, hash_value, caption):
+        self._entries[(camera, hash_value)] = caption
+        self._entries.move_to_end((camera, hash_value))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class BatchCaptioner(object):
+    """
+    Captions the images of all cameras with a single processor call and a single
+    generate call of the scenario descriptor (e.g. BLIP-2), instead of one pass per camera.
+    Images found in the optional caption cache are not sent to the descriptor at all.
+    """
+
+    def __init__(self, processor, model, device, cache=None):
+        self.processor = processor
+        self.model = model
+        self.device = device
+        self.cache = cache
+
+    def __call__(self, images):
+        if not images:
+            return []
+
+        captions = [None] * len(images)
+        hashes = [None] * len(images)
+        if self.cache is not None:
+            for camera, image in enumerate(images):
+                hashes[camera] = image_hash(image)
+                captions[camera] = self.cache.get(camera, hashes[camera])
+
+        missing = [camera for camera, caption in enumerate(captions) if caption is None]
+        TickProfiler.count('captioner.images', len(images))
+        TickProfiler.count('captioner.cache_hits', len(images) - len(missing))
+        if missing:
+            with TickProfiler.timer('captioner.generate'):
+                generated = self._generate([images[camera] for camera in missing])
+            for camera, caption in zip(missing, generated):
+                captions[camera] = caption
+                if self.cache is not None:
+                    self.cache.put(camera, hashes[camera], caption)
+
+        # one caption per camera, in the order of the given images
+        return captions
+
+    def _generate(self, images):
+        import torch
+        from PIL import Image
+
+        pil_images = [Image.fromarray(image) for image in images]
+        inputs = self.processor(images=pil_images, return_tensors="pt").to(self.device, self.model.dtype)
+        with torch.no_grad():
+            generated_ids = self.model.generate(**inputs)
+        captions = self.processor.batch_decode(generated_ids, skip_special_tokens=True)
+        return [caption.strip() for caption in captions]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""
+Local stand-in for the LLM planner. It speaks the OpenAI responses and chat completions APIs and
+answers every prompt with the same waypoints after a configurable latency, so that the agent loop
+can be run, load-tested and profiled without network access. Point the agents to it with
+llm_base_url = 'http://<host>:<port>/v1'.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_answer(args):
+    # waypoints are in the ego frame used by the agents, where forward is negative y
+    waypoints = [[0.0, -round(args.spacing * (i + 1), 3)] for i in range(args.num_waypoints)]
+    answer = {
+        "analysis": ["stand-in planner, keep driving straight"],
+        "output_waypoints": waypoints,
+        "waypoints": waypoints,
+        "end_prob": [args.end_prob],
+    }
+    return "```json\n" + json.dumps(answer) + "\n```"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+
+    answer = ""
+    latency = 0.0
+    requests_served = 0
+    requests_lock = threading.Lock()  # the requests are served by several threads
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        model = request.get('model', 'stand-in')
+
+        if self.path.rstrip('/').endswith('/responses'):
+            body = self._responses_body(model)
+        elif self.path.rstrip('/').endswith('/chat/completions'):
+            body = self._chat_body(model)
+        else:
+            self.send_error(404, "Unknown endpoint {}".format(self.path))
+            return
+
+        time.sleep(self.latency)
+        with StandInHandler.requests_lock:
+            StandInHandler.requests_served += 1
+
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _responses_body(self, model):
+        return {
+            "id": "resp_" + uuid.uuid4().hex,
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "output": [{
+                "type": "message",
+                "id": "msg_" + uuid.uuid4().hex,
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": self.answer, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+
+    def _chat_body(self, model):
+        return {
+            "id": "chatcmpl-" + uuid.uuid4().hex,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument('--host', default='127.0.0.1', help='IP of the host (default: 127.0.0.1)')
+    argparser.add_argument('--port', default=8000, type=int, help='TCP port to listen to (default: 8000)')
+    argparser.add_argument('--latency', default=0.0, type=float, help='Seconds to wait before each answer')
+    argparser.add_argument('--num-waypoints', default=5, type=int, help='Number of returned waypoints')
+    argparser.add_argument('--spacing', default=2.0, type=float, help='Distance in meters between waypoints')
+    argparser.add_argument('--end-prob', default=0.0, type=float, help='Returned stop probability')
+    argparser.add_argument('--quiet', action='store_true', help='Do not log every request')
+    args = argparser.parse_args()
+
+    StandInHandler.answer = build_answer(args)
+    StandInHandler.latency = args.latency
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    server.quiet = args.quiet
+    print("Stand-in LLM server listening on http://{}:{}/v1".format(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Served {} requests".format(StandInHandler.requests_served))
+
+
+if __name__ == '__main__':
+    main()
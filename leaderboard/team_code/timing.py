@@ -0,0 +1,37 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from leaderboard.utils.tick_profiler import TickProfiler
+
+
+class StageTimer(object):
+    """
+    Accumulates the wall time spent in the named stages of one agent step,
+    so a single summary line can replace the scattered timing prints.
+    Each stage is also a sample of the 'agent.<stage>' timer of the TickProfiler.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def reset(self):
+        self.stages.clear()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + duration
+            TickProfiler.add_sample('agent.' + name, duration, start)
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def summary(self):
+        parts = ["%s: %.1f ms" % (name, 1000 * value) for name, value in self.stages.items()]
+        parts.append("total: %.1f ms" % (1000 * self.total()))
+        return " | ".join(parts)
@@ -20,6 +20,7 @@ from easydict import EasyDict
 from torchvision import transforms
 
 from leaderboard.autoagents import autonomous_agent
+from leaderboard.utils.tick_profiler import TickProfiler
 from team_code.planner import RoutePlanner, InstructionPlanner
 from team_code.pid_controller import PIDController
 
@@ -229,6 +230,7 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 1200,
                 "height": 900,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_front",
             },
             {
@@ -242,6 +244,7 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_left",
             },
             {
@@ -255,6 +258,7 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_right",
             },
             {
@@ -268,6 +272,7 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_rear",
             },
             {
@@ -302,14 +307,11 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
 
     def tick(self, input_data):
         # based on the input data to find the next ground_truth waypoint
-        rgb_front = cv2.cvtColor(input_data["rgb_front"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_left = cv2.cvtColor(input_data["rgb_left"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_right = cv2.cvtColor(
-            input_data["rgb_right"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
-        rgb_rear = cv2.cvtColor(
-            input_data["rgb_rear"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
+        # the cameras already deliver RGB images (see the "format" of the sensors)
+        rgb_front = input_data["rgb_front"][1]
+        rgb_left = input_data["rgb_left"][1]
+        rgb_right = input_data["rgb_right"][1]
+        rgb_rear = input_data["rgb_rear"][1]
         gps = input_data["gps"][1][:2]
         speed = input_data["speed"][1]["speed"]
         compass = input_data["imu"][1][-1]
@@ -521,19 +523,20 @@ class VisionLLMAgent(autonomous_agent.AutonomousAgent):
             print("The prompt is ", prompt)
 
             start_time = time.time()
-            response = self.net.responses.create(
-                model="o4-mini", # gpt-4.1
-                input=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "input_text", "text": prompt},
-                            {"type": "input_image", "image_url": f"data:image/jpeg;base64,{base64_image}"},
-                        ],
-                    }
-                ],
-                max_output_tokens=2500,
-            )
+            with TickProfiler.timer('agent.llm'):
+                response = self.net.responses.create(
+                    model="o4-mini", # gpt-4.1
+                    input=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "input_text", "text": prompt},
+                                {"type": "input_image", "image_url": f"data:image/jpeg;base64,{base64_image}"},
+                            ],
+                        }
+                    ],
+                    max_output_tokens=2500,
+                )
             print("The time to generate waypoints is ", time.time() - start_time)
             print(response.output_text)  # json
 
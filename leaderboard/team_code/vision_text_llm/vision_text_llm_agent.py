@@ -9,6 +9,7 @@ import imp
 from collections import deque
 import math
 import re
+import functools
 
 import yaml
 import cv2
@@ -23,6 +24,11 @@ from transformers import Blip2Processor, Blip2ForConditionalGeneration
 from leaderboard.autoagents import autonomous_agent
 from team_code.planner import RoutePlanner, InstructionPlanner
 from team_code.pid_controller import PIDController
+from team_code.scene_captioner import BatchCaptioner, CaptionCache
+from team_code.timing import StageTimer
+from team_code.async_planner import AsyncPlanner
+from team_code.response_cache import ResponseCache
+from team_code.llm_backend import create_backend
 
 try:
     import pygame
@@ -30,7 +36,6 @@ except ImportError:
     raise RuntimeError("cannot import pygame, make sure pygame package is installed")
 
 import base64
-from openai import OpenAI
 
 SAVE_PATH = os.environ.get("SAVE_PATH", 'eval')
 # why these number?
@@ -180,9 +185,8 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
 
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
-        print('use gpt-o4-mini...')
-        self.net = OpenAI(
-            api_key="your_api")
+        print(f'use {self.config.llm_model} through the {self.config.llm_backend} backend...')
+        self.llm_backend = create_backend(self.config)
         self.prev_lidar = None
         self.prev_control = None
         self.curr_instruction = 'Drive safely.'
@@ -203,6 +207,18 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                                                               revision="51572668da0eb669e01a189dc22abe6088589a24",
                                                               cache_dir=self.cache_dir).to(self.device)
         print(f"The time to load blip2 model is {time.time()-s1}")
+        self.caption_cache = None
+        if self.config.caption_cache_size > 0:
+            self.caption_cache = CaptionCache(self.config.caption_cache_size, self.config.caption_cache_distance)
+        self.captioner = BatchCaptioner(self.blip2_processor, self.blip2_model, self.device, cache=self.caption_cache)
+        self.timer = StageTimer()
+        self.async_planner = AsyncPlanner() if self.config.async_planner else None
+        self.response_cache = None
+        if self.config.response_cache:
+            self.response_cache = ResponseCache(self.config.response_cache_size,
+                                                self.config.response_cache_path,
+                                                self.config.response_cache_speed_step,
+                                                self.config.response_cache_target_step)
 
         # save the meta images
         self.save_path = None
@@ -243,6 +259,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 1200,
                 "height": 900,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_front",
             },
             {
@@ -256,6 +273,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_left",
             },
             {
@@ -269,6 +287,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_right",
             },
             {
@@ -282,6 +301,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_rear",
             },
             {
@@ -316,14 +336,11 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
 
     def tick(self, input_data):
         # based on the input data to find the next ground_truth waypoint
-        rgb_front = cv2.cvtColor(input_data["rgb_front"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_left = cv2.cvtColor(input_data["rgb_left"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_right = cv2.cvtColor(
-            input_data["rgb_right"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
-        rgb_rear = cv2.cvtColor(
-            input_data["rgb_rear"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
+        # the cameras already deliver RGB images (see the "format" of the sensors)
+        rgb_front = input_data["rgb_front"][1]
+        rgb_left = input_data["rgb_left"][1]
+        rgb_right = input_data["rgb_right"][1]
+        rgb_rear = input_data["rgb_rear"][1]
         gps = input_data["gps"][1][:2]
         speed = input_data["speed"][1]["speed"]
         compass = input_data["imu"][1][-1]
@@ -411,7 +428,9 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             self._init()
 
         self.step += 1
-        tick_data = self.tick(input_data)
+        self.timer.reset()
+        with self.timer.stage('tick'):
+            tick_data = self.tick(input_data)
         # tick_data["rgb_front"] numpy, the shape of each image is [900, 1200, 3]
 
         if self.step < 20:
@@ -479,62 +498,69 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             input_data['notice_text'] = [self.curr_notice]
             input_data['notice_frame_id'] = [self.curr_notice_frame_id]
 
-        with torch.cuda.amp.autocast(enabled=True):
-            # translate the image to words
-            image_descriptions = []
-            for image_opcv in images_list:
-                image = Image.fromarray(image_opcv)
-                s2_time = time.time()
-                inputs = self.blip2_processor(images=image, return_tensors="pt").to(self.device, self.blip2_model.dtype)
-                generated_ids = self.blip2_model.generate(**inputs)
-                caption = self.blip2_processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-                print(f"the time to descript the figure is {time.time() - s2_time}, and the caption is {caption}")
-                image_descriptions.append(caption)
-
-            # save the image with caption
-            self.image_id += 1
-            save_path = "./carla_outputs/vision_text_llm_camera/image_caption" + str(self.change_instruction) + "_" + str(self.image_id)
-            save_image_with_caption(images_list, image_descriptions, save_path)
-
-            if self.curr_notice is '':
-                self.curr_notice = 'please notice the traffic lights. When the traffic light is red, please stop util the lights turn green.'
-
-            prompt = (
-                f"You are a driver assistant for autonomous driving. "
-                f"The front camera shows {image_descriptions[0]}, and the left camera shows {image_descriptions[1]}."
-                f"The right camera shows {image_descriptions[2]}, and the rear camera shows {image_descriptions[3]}."
-                f"The current instruction you receive is {self.curr_instruction}. "
-                f"The things you should notice is {self.curr_notice}. "
-                f"Your current speed is {velocity}, and target point is {input_data['target_point']}."
-                "Please analyze the surroundings of the vehicle, and generate 5 waypoints."
-                "Then give a float number to show stop probability whether the vehicle should stop."
-                "All the outputs are returned in a JSON format, such as {analysis: []; output_waypoints: [[x1,y1], ...]; end_prob: []}."
-                # f"Do not add any comments to the output. If you want to exaplain the waypoints, add the commnets to analysis part."
-            )
-            print("The prompt is ", prompt)
-
-            start_time = time.time()
-            response = self.net.responses.create(
-                model="o4-mini",
-                input=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "input_text", "text": prompt},
-                            #{"type": "input_image", "image_url": f"data:image/jpeg;base64,{base64_image}"},
-                        ],
-                    }
-                ],
-                max_output_tokens=2500,
-            )
-            print("The time to generate waypoints is ", time.time() - start_time)
-            print(response.output_text)  # json
-
-            # find waypoints and end_prob in text
-            output_text = clean_json_string(response.output_text)
-            outputs = safe_json_extract(output_text, ["output_waypoints", "end_prob"])
-
-        waypoints = outputs['output_waypoints']
+        # in asynchronous mode, a new request is only prepared once the previous one has finished
+        request_plan = self.async_planner is None or not self.async_planner.busy()
+
+        if request_plan:
+            with torch.cuda.amp.autocast(enabled=True):
+                # translate the image to words
+                # all cameras are captioned in one batch
+                with self.timer.stage('caption'):
+                    image_descriptions = self.captioner(images_list)
+                if self.config.verbose:
+                    print("The captions are ", image_descriptions)
+
+                # save the image with caption
+                self.image_id += 1
+                save_path = "./carla_outputs/vision_text_llm_camera/image_caption" + str(self.change_instruction) + "_" + str(self.image_id)
+                with self.timer.stage('save_caption'):
+                    save_image_with_caption(images_list, image_descriptions, save_path)
+
+                if self.curr_notice is '':
+                    self.curr_notice = 'please notice the traffic lights. When the traffic light is red, please stop util the lights turn green.'
+
+                prompt = (
+                    f"You are a driver assistant for autonomous driving. "
+                    f"The front camera shows {image_descriptions[0]}, and the left camera shows {image_descriptions[1]}."
+                    f"The right camera shows {image_descriptions[2]}, and the rear camera shows {image_descriptions[3]}."
+                    f"The current instruction you receive is {self.curr_instruction}. "
+                    f"The things you should notice is {self.curr_notice}. "
+                    f"Your current speed is {velocity}, and target point is {input_data['target_point']}."
+                    "Please analyze the surroundings of the vehicle, and generate 5 waypoints."
+                    "Then give a float number to show stop probability whether the vehicle should stop."
+                    "All the outputs are returned in a JSON format, such as {analysis: []; output_waypoints: [[x1,y1], ...]; end_prob: []}."
+                    # f"Do not add any comments to the output. If you want to exaplain the waypoints, add the commnets to analysis part."
+                )
+                print("The prompt is ", prompt)
+
+            request = functools.partial(self.request_waypoints, prompt)
+            if self.response_cache is not None:
+                # replay the decision of an equivalent earlier prompt when there is one
+                key = self.response_cache.make_key(image_descriptions + [self.curr_instruction, self.curr_notice],
+                                                   velocity, tick_data['target_point'])
+                request = functools.partial(self.response_cache.get_or_request, key, request)
+            if self.async_planner is not None:
+                self.async_planner.submit(request, timestamp, tick_data['gps'], tick_data['compass'])
+            else:
+                with self.timer.stage('llm'):
+                    outputs = request()
+
+        if self.async_planner is not None:
+            plan = self.async_planner.latest()
+            if plan is None or timestamp - plan.timestamp > self.config.plan_max_age:
+                # the LLM has not produced a recent enough plan, so stop until it does
+                print("No plan newer than {} s is available, brake.".format(self.config.plan_max_age))
+                control = carla.VehicleControl()
+                control.steer = float(0)
+                control.throttle = float(0)
+                control.brake = float(1)
+                self.prev_control = control
+                return control
+            # the plan was made for an older frame, so shift it into the current ego frame
+            outputs = plan.outputs
+            waypoints = plan.waypoints(tick_data['gps'], tick_data['compass'])
+        else:
+            waypoints = outputs['output_waypoints']
         end_prob1 = outputs['end_prob']
 
         if isinstance(end_prob1, list):
@@ -542,7 +568,8 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
         else:
             end_prob = end_prob1
 
-        steer, throttle, brake, metadata = self.control_pid(waypoints, velocity)
+        with self.timer.stage('pid'):
+            steer, throttle, brake, metadata = self.control_pid(waypoints, velocity)
 
         if end_prob > 0.75:
             self.visual_feature_buffer = []
@@ -576,7 +603,8 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
         display_data['waypoints'] = 'Waypoints: (%.1f, %.1f), (%.1f, %.1f)' % (
             waypoints[0][0], -waypoints[0][1], waypoints[1][0], -waypoints[1][1])
         display_data['notice'] = "Notice: %s" % last_notice
-        surface = self._hic.run_interface(display_data)
+        with self.timer.stage('display'):
+            surface = self._hic.run_interface(display_data)
         tick_data['surface'] = surface
 
         if self.step % 2 != 0 and self.step > 4:
@@ -585,10 +613,27 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             self.prev_control = control
 
         if SAVE_PATH is not None:
-            self.save(tick_data)
+            with self.timer.stage('save'):
+                self.save(tick_data)
 
+        if self.config.verbose:
+            print("The time of each stage is", self.timer.summary())
         return control
 
+    def request_waypoints(self, prompt):
+        response_text = self.llm_backend.complete(prompt)
+        print(response_text)  # json
+
+        # find waypoints and end_prob in text
+        output_text = clean_json_string(response_text)
+        return safe_json_extract(output_text, ["output_waypoints", "end_prob"])
+
+    def destroy(self):
+        if self.async_planner is not None:
+            self.async_planner.shutdown()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
     def save(self, tick_data):
         frame = (self.step - 20)
         Image.fromarray(tick_data["surface"]).save(
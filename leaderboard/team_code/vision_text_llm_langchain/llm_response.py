@@ -22,6 +22,20 @@ class LLM_Agent:
             self.memory = DrivingMemory(emb_type='openai',
                                         rule_path=self.config.rule_path,
                                         emergency_path=self.config.memory_path)
+        elif self.config.llm_type == "local":
+            # any server speaking the OpenAI chat API, e.g. a LAN-hosted model or the stand-in server
+            from langchain_openai import ChatOpenAI
+            print("use local model at {}".format(self.config.llm_base_url))
+            self.llm = ChatOpenAI(
+                model=self.config.llm_model,
+                base_url=self.config.llm_base_url,
+                api_key=self.config.llm_key,
+                temperature=0,
+                max_retries=2,
+            )
+            self.memory = DrivingMemory(emb_type='',
+                                        rule_path=self.config.rule_path,
+                                        emergency_path=self.config.memory_path)
         elif self.config.llm_type == "deepseek":
             self.llm = ChatDeepSeek(
                 model=self.config.llm_model, # deepseek-chat
@@ -9,6 +9,7 @@ import imp
 from collections import deque
 import math
 import re
+import functools
 
 import yaml
 import cv2
@@ -23,6 +24,10 @@ from transformers import Blip2Processor, Blip2ForConditionalGeneration
 from leaderboard.autoagents import autonomous_agent
 from team_code.planner import RoutePlanner, InstructionPlanner
 from team_code.pid_controller import PIDController
+from team_code.scene_captioner import BatchCaptioner, CaptionCache
+from team_code.timing import StageTimer
+from team_code.async_planner import AsyncPlanner
+from team_code.response_cache import ResponseCache
 from .llm_response import LLM_Agent
 
 try:
@@ -196,6 +201,18 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
 
         print("load scenario descriptor")
         self.sce_processor, self.sce_descriptor = self.load_scenario_descriptor()
+        self.caption_cache = None
+        if self.config.caption_cache_size > 0:
+            self.caption_cache = CaptionCache(self.config.caption_cache_size, self.config.caption_cache_distance)
+        self.captioner = BatchCaptioner(self.sce_processor, self.sce_descriptor, self.device, cache=self.caption_cache)
+        self.timer = StageTimer()
+        self.async_planner = AsyncPlanner() if self.config.async_planner else None
+        self.response_cache = None
+        if self.config.response_cache:
+            self.response_cache = ResponseCache(self.config.response_cache_size,
+                                                self.config.response_cache_path,
+                                                self.config.response_cache_speed_step,
+                                                self.config.response_cache_target_step)
 
         # save the meta images
         self.save_path = None
@@ -273,6 +290,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 1200,
                 "height": 900,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_front",
             },
             {
@@ -286,6 +304,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_left",
             },
             {
@@ -299,6 +318,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_right",
             },
             {
@@ -312,6 +332,7 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
                 "width": 400,
                 "height": 300,
                 "fov": 100,
+                "format": "rgb",
                 "id": "rgb_rear",
             },
             {
@@ -346,14 +367,11 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
 
     def tick(self, input_data):
         # based on the input data to find the next ground_truth waypoint
-        rgb_front = cv2.cvtColor(input_data["rgb_front"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_left = cv2.cvtColor(input_data["rgb_left"][1][:, :, :3], cv2.COLOR_BGR2RGB)
-        rgb_right = cv2.cvtColor(
-            input_data["rgb_right"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
-        rgb_rear = cv2.cvtColor(
-            input_data["rgb_rear"][1][:, :, :3], cv2.COLOR_BGR2RGB
-        )
+        # the cameras already deliver RGB images (see the "format" of the sensors)
+        rgb_front = input_data["rgb_front"][1]
+        rgb_left = input_data["rgb_left"][1]
+        rgb_right = input_data["rgb_right"][1]
+        rgb_rear = input_data["rgb_rear"][1]
         gps = input_data["gps"][1][:2]
         speed = input_data["speed"][1]["speed"]
         compass = input_data["imu"][1][-1]
@@ -441,7 +459,9 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             self._init()
 
         self.step += 1
-        tick_data = self.tick(input_data)
+        self.timer.reset()
+        with self.timer.stage('tick'):
+            tick_data = self.tick(input_data)
         # tick_data["rgb_front"] numpy, the shape of each image is [900, 1200, 3]
 
         if self.step < 20:
@@ -509,31 +529,59 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             input_data['notice_text'] = [self.curr_notice]
             input_data['notice_frame_id'] = [self.curr_notice_frame_id]
 
-        with torch.cuda.amp.autocast(enabled=True):
-            # translate the image to words
-            image_descriptions = []
-            for image_opcv in images_list:
-                image = Image.fromarray(image_opcv)
-                s2_time = time.time()
-                inputs = self.sce_processor(images=image, return_tensors="pt").to(self.device, self.sce_descriptor.dtype)
-                generated_ids = self.sce_descriptor.generate(**inputs)
-                caption = self.sce_processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-                print(f"the time to descript the figure is {time.time() - s2_time}, and the caption is {caption}")
-                image_descriptions.append(caption)
-
-            # save the image with caption
-            self.image_id += 1
-            save_path = self.config.image_path + str(self.change_instruction) + "_" + str(self.image_id)
-            save_image_with_caption(images_list, image_descriptions, save_path)
-
-            if self.curr_notice is '':
-                self.curr_notice = 'please notice the traffic lights. When the traffic light is red, please stop util the lights turn green.'
+        # in asynchronous mode, a new request is only prepared once the previous one has finished
+        request_plan = self.async_planner is None or not self.async_planner.busy()
+
+        if request_plan:
+            with torch.cuda.amp.autocast(enabled=True):
+                # translate the image to words
+                # all cameras are captioned in one batch
+                with self.timer.stage('caption'):
+                    image_descriptions = self.captioner(images_list)
+                if self.config.verbose:
+                    print("The captions are ", image_descriptions)
+
+                # save the image with caption
+                self.image_id += 1
+                save_path = self.config.image_path + str(self.change_instruction) + "_" + str(self.image_id)
+                with self.timer.stage('save_caption'):
+                    save_image_with_caption(images_list, image_descriptions, save_path)
+
+                if self.curr_notice is '':
+                    self.curr_notice = 'please notice the traffic lights. When the traffic light is red, please stop util the lights turn green.'
 
             # prompt setting
-            outputs = self.llm_agent.response(waypoint_number=5,
-                                              image_descriptions=image_descriptions,
-                                              drive_information=input_data,)
-        waypoints = outputs['output_waypoints']
+            request = functools.partial(self.llm_agent.response,
+                                        waypoint_number=5,
+                                        image_descriptions=image_descriptions,
+                                        drive_information=input_data,)
+            if self.response_cache is not None:
+                # replay the decision of an equivalent earlier prompt when there is one
+                key = self.response_cache.make_key(image_descriptions + [self.curr_instruction, self.curr_notice],
+                                                   velocity, tick_data['target_point'])
+                request = functools.partial(self.response_cache.get_or_request, key, request)
+            if self.async_planner is not None:
+                self.async_planner.submit(request, timestamp, tick_data['gps'], tick_data['compass'])
+            else:
+                with self.timer.stage('llm'):
+                    outputs = request()
+
+        if self.async_planner is not None:
+            plan = self.async_planner.latest()
+            if plan is None or timestamp - plan.timestamp > self.config.plan_max_age:
+                # the LLM has not produced a recent enough plan, so stop until it does
+                print("No plan newer than {} s is available, brake.".format(self.config.plan_max_age))
+                control = carla.VehicleControl()
+                control.steer = float(0)
+                control.throttle = float(0)
+                control.brake = float(1)
+                self.prev_control = control
+                return control
+            # the plan was made for an older frame, so shift it into the current ego frame
+            outputs = plan.outputs
+            waypoints = plan.waypoints(tick_data['gps'], tick_data['compass'])
+        else:
+            waypoints = outputs['output_waypoints']
         end_prob1 = outputs['end_prob']
 
         if isinstance(end_prob1, list):
@@ -541,7 +589,8 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
         else:
             end_prob = end_prob1
 
-        steer, throttle, brake, metadata = self.control_pid(waypoints, velocity)
+        with self.timer.stage('pid'):
+            steer, throttle, brake, metadata = self.control_pid(waypoints, velocity)
 
         if end_prob > 0.75:
             self.visual_feature_buffer = []
@@ -575,7 +624,8 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
         display_data['waypoints'] = 'Waypoints: (%.1f, %.1f), (%.1f, %.1f)' % (
             waypoints[0][0], -waypoints[0][1], waypoints[1][0], -waypoints[1][1])
         display_data['notice'] = "Notice: %s" % last_notice
-        surface = self._hic.run_interface(display_data)
+        with self.timer.stage('display'):
+            surface = self._hic.run_interface(display_data)
         tick_data['surface'] = surface
 
         if self.step % 2 != 0 and self.step > 4:
@@ -584,10 +634,19 @@ class VisionTextLLMAgent(autonomous_agent.AutonomousAgent):
             self.prev_control = control
 
         if SAVE_PATH is not None:
-            self.save(tick_data)
+            with self.timer.stage('save'):
+                self.save(tick_data)
 
+        if self.config.verbose:
+            print("The time of each stage is", self.timer.summary())
         return control
 
+    def destroy(self):
+        if self.async_planner is not None:
+            self.async_planner.shutdown()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
     def save(self, tick_data):
         frame = (self.step - 20)
         Image.fromarray(tick_data["surface"]).save(
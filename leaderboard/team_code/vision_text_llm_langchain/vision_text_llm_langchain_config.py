@@ -23,11 +23,28 @@ class GlobalConfig:
 
     agent_use_notice = True # False
     sample_rate = 2
+    verbose = False  # print the captions and the time of each stage at every step
+
+    # caption cache
+    caption_cache_size = 0  # number of cached captions, 0 disables the cache
+    caption_cache_distance = 4  # maximum hamming distance between image hashes to reuse a caption
+
+    # asynchronous planning
+    async_planner = False  # query the LLM on a background worker instead of blocking the simulation
+    plan_max_age = 2.0  # seconds of simulation time after which an old plan is not followed anymore
+
+    # LLM response cache
+    response_cache = False  # replay the decision of an earlier prompt with the same captions and bucketed inputs
+    response_cache_size = 256  # number of responses kept in memory
+    response_cache_path = None  # sqlite file to share the responses across routes and runs
+    response_cache_speed_step = 0.5  # m/s, speeds in the same bucket share a response
+    response_cache_target_step = 1.0  # m, target points in the same bucket share a response
 
     # LLM
-    llm_type = 'deepseek' # openai
+    llm_type = 'deepseek' # openai, local
     llm_key = 'api'  # 'sk-xxxxxx'
     llm_model = 'deepseek-chat' # gpt-4.0
+    llm_base_url = None  # server of the local model, e.g. 'http://localhost:8000/v1' for team_code/standin_llm_server.py
     # memory
     rule_path = './Chroma/rule_db'
     memory_path = './Chroma/memory_db'
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Index of the actors by the lane they are at, for behaviors controlling many actors,
+such as the background activity. Each lane, identified by its road and lane ids, keeps
+its actors sorted by their distance along the road (s), so that the actors of a lane, or
+of a part of it, are found without checking all of them. The index is updated incrementally:
+the waypoint of an actor is only computed again once it has moved, and it only changes
+position in the index when its lane or s change.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+
+
+class ActorLaneIndex(object):
+
+    """
+    Actors sorted by their position at each lane
+
+    Args:
+        min_distance (float): distance the actors have to move for their waypoints to be computed again
+    """
+
+    def __init__(self, min_distance=0.1):
+        self._min_distance = min_distance
+        self._lanes = {}  # Dictionary (road_id, lane_id) -> list of (s, actor id), sorted by s
+        self._entries = {}  # Dictionary actor id -> (actor, location, waypoint)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, actor):
+        return actor.id in self._entries
+
+    def update(self, actor, location):
+        """
+        Moves the actor to its position in the index, returning its waypoint.
+        The waypoint is only computed again if the actor has moved since the last update
+        """
+        entry = self._entries.get(actor.id)
+        if entry is not None and entry[1].distance(location) < self._min_distance:
+            return entry[2]
+
+        waypoint = CarlaDataProvider.get_waypoint(location)
+        if entry is not None:
+            old_waypoint = entry[2]
+            if self._same_position(old_waypoint, waypoint):
+                self._entries[actor.id] = (actor, location, waypoint)
+                return waypoint
+            self._remove_from_lane(actor.id, old_waypoint)
+
+        self._entries[actor.id] = (actor, location, waypoint)
+        if waypoint is not None:
+            lane = (waypoint.road_id, waypoint.lane_id)
+            insort(self._lanes.setdefault(lane, []), (waypoint.s, actor.id))
+        return waypoint
+
+    def update_actors(self, actors):
+        """Updates the position of all the actors. Those without a known location keep their last one"""
+        for actor in actors:
+            location = CarlaDataProvider.get_location(actor)
+            if location is not None:
+                self.update(actor, location)
+
+    def get_waypoint(self, actor, location):
+        """Returns the waypoint of the actor, updating its position in the index if needed"""
+        return self.update(actor, location)
+
+    def get_lane(self, actor):
+        """Returns the (road_id, lane_id) of the actor's lane, or None if it isn't indexed"""
+        entry = self._entries.get(actor.id)
+        if entry is None or entry[2] is None:
+            return None
+        return (entry[2].road_id, entry[2].lane_id)
+
+    def get_lane_actors(self, road_id, lane_id, min_s=None, max_s=None):
+        """
+        Returns the actors at the lane sorted by increasing s, optionally only those between min_s and max_s.
+        Note that vehicles at lanes with a negative id drive towards increasing s, and the rest towards decreasing s
+        """
+        lane = self._lanes.get((road_id, lane_id))
+        if not lane:
+            return []
+
+        start = 0 if min_s is None else bisect_left(lane, (min_s, -1))
+        end = len(lane) if max_s is None else bisect_right(lane, (max_s, float('inf')))
+        return [self._entries[actor_id][0] for _, actor_id in lane[start:end]]
+
+    def remove(self, actor):
+        """Removes the actor from the index"""
+        entry = self._entries.pop(actor.id, None)
+        if entry is not None:
+            self._remove_from_lane(actor.id, entry[2])
+
+    def clear(self):
+        """Removes all the actors"""
+        self._lanes.clear()
+        self._entries.clear()
+
+    @staticmethod
+    def _same_position(old_waypoint, new_waypoint):
+        """Checks if both waypoints have the same place at the index"""
+        if old_waypoint is None or new_waypoint is None:
+            return old_waypoint is new_waypoint
+        return (old_waypoint.road_id, old_waypoint.lane_id, old_waypoint.s) == \
+            (new_waypoint.road_id, new_waypoint.lane_id, new_waypoint.s)
+
+    def _remove_from_lane(self, actor_id, waypoint):
+        """Removes the actor from the sorted list of its lane"""
+        if waypoint is None:
+            return
+        lane_key = (waypoint.road_id, waypoint.lane_id)
+        lane = self._lanes.get(lane_key)
+        if not lane:
+            return
+        index = bisect_left(lane, (waypoint.s, actor_id))
+        if index < len(lane) and lane[index] == (waypoint.s, actor_id):
+            lane.pop(index)
+        if not lane:
+            del self._lanes[lane_key]
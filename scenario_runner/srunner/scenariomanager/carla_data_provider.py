@@ -12,6 +12,7 @@ local buffers to avoid blocking calls to CARLA
 
 from __future__ import print_function
 
+import fnmatch
 import math
 import re
 import threading
@@ -21,6 +22,9 @@ from six import iteritems
 import carla
 from agents.navigation.global_route_planner import GlobalRoutePlanner
 
+from srunner.scenariomanager.command_batch import CommandBatch
+from srunner.scenariomanager.waypoint_cache import WaypointCache
+
 
 def calculate_velocity(actor):
     """
@@ -31,6 +35,24 @@ def calculate_velocity(actor):
     return math.sqrt(velocity_squared)
 
 
+class FilteredActorList(list):
+
+    """
+    List of actors with the filter() and find() methods of carla.ActorList
+    """
+
+    def filter(self, wildcard_pattern):
+        """Returns the actors whose type id matches the pattern"""
+        return FilteredActorList([actor for actor in self if fnmatch.fnmatchcase(actor.type_id, wildcard_pattern)])
+
+    def find(self, actor_id):
+        """Returns the actor with that id, or None"""
+        for actor in self:
+            if actor.id == actor_id:
+                return actor
+        return None
+
+
 class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
     """
@@ -48,6 +70,8 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
     In addition it provides access to the map and the transform of all traffic lights
     """
 
+    # The actor information is keyed by actor id, to make the lookups O(1)
+    _registered_actors = {}
     _actor_velocity_map = {}
     _actor_location_map = {}
     _actor_transform_map = {}
@@ -57,10 +81,13 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
     _client = None
     _world = None
     _map = None
+    _waypoint_cache = None
     _sync_flag = False
     _spawn_points = None
     _spawn_index = 0
     _blueprint_library = None
+    _blueprint_index = {}
+    _blueprint_templates = {}
     _all_actors = None
     _ego_vehicle_route = None
     _traffic_manager_port = 8000
@@ -69,6 +96,14 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
     _grp = None
     _runtime_init_flag = False
     _lock = threading.Lock()
+    _tick_callbacks = []
+    _snapshot_refresh = True
+    _saved_rpcs = 0
+    _recycle_keys = {}
+    _parked_actors = {}
+    _max_parked_actors = 100
+    _recycled_actors = 0
+    _command_batch = None
 
     @staticmethod
     def register_actor(actor, transform=None):
@@ -77,24 +112,14 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         If actor already exists, throw an exception
         """
         with CarlaDataProvider._lock:
-            if actor in CarlaDataProvider._actor_velocity_map:
-                raise KeyError(
-                    "Vehicle '{}' already registered. Cannot register twice!".format(actor.id))
-            else:
-                CarlaDataProvider._actor_velocity_map[actor] = 0.0
-            if actor in CarlaDataProvider._actor_location_map:
+            if actor.id in CarlaDataProvider._registered_actors:
                 raise KeyError(
                     "Vehicle '{}' already registered. Cannot register twice!".format(actor.id))
-            elif transform:
-                CarlaDataProvider._actor_location_map[actor] = transform.location
-            else:
-                CarlaDataProvider._actor_location_map[actor] = None
 
-            if actor in CarlaDataProvider._actor_transform_map:
-                raise KeyError(
-                    "Vehicle '{}' already registered. Cannot register twice!".format(actor.id))
-            else:
-                CarlaDataProvider._actor_transform_map[actor] = transform
+            CarlaDataProvider._registered_actors[actor.id] = actor
+            CarlaDataProvider._actor_velocity_map[actor.id] = 0.0
+            CarlaDataProvider._actor_location_map[actor.id] = transform.location if transform else None
+            CarlaDataProvider._actor_transform_map[actor.id] = transform
 
     @staticmethod
     def update_osc_global_params(parameters):
@@ -122,37 +147,103 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
             CarlaDataProvider.register_actor(actor, transform)
 
     @staticmethod
-    def on_carla_tick():
+    def on_carla_tick(snapshot=None):
         """
         Callback from CARLA
+
+        By default, the actor information is read from one world snapshot instead of asking each actor
+        for it. Actors missing from the snapshot fall back to their own (RPC) getters.
+        The snapshot of the current frame can be given, if the caller already has it.
         """
         with CarlaDataProvider._lock:
-            for actor in CarlaDataProvider._actor_velocity_map:
-                if actor is not None and actor.is_alive:
-                    CarlaDataProvider._actor_velocity_map[actor] = calculate_velocity(actor)
-
-            for actor in CarlaDataProvider._actor_location_map:
-                if actor is not None and actor.is_alive:
-                    CarlaDataProvider._actor_location_map[actor] = actor.get_location()
-
-            for actor in CarlaDataProvider._actor_transform_map:
-                if actor is not None and actor.is_alive:
-                    CarlaDataProvider._actor_transform_map[actor] = actor.get_transform()
-
             world = CarlaDataProvider._world
             if world is None:
                 print("WARNING: CarlaDataProvider couldn't find the world")
 
+            if not CarlaDataProvider._snapshot_refresh:
+                snapshot = None
+            elif snapshot is None and world is not None and CarlaDataProvider._registered_actors:
+                snapshot = world.get_snapshot()
+                CarlaDataProvider._saved_rpcs -= 1
+
+            for actor_id, actor in CarlaDataProvider._registered_actors.items():
+                actor_snapshot = snapshot.find(actor_id) if snapshot is not None else None
+                if actor_snapshot is not None:
+                    CarlaDataProvider._update_actor_state(
+                        actor_id, actor_snapshot.get_velocity(), actor_snapshot.get_transform())
+                    CarlaDataProvider._saved_rpcs += 2
+                elif actor is not None and actor.is_alive:
+                    CarlaDataProvider._update_actor_state(actor_id, actor.get_velocity(), actor.get_transform())
+
             CarlaDataProvider._all_actors = None
 
+        # Outside of the lock, as the callbacks are free to query the provider
+        for callback in list(CarlaDataProvider._tick_callbacks):
+            callback()
+
+    @staticmethod
+    def _update_actor_state(actor_id, velocity, transform):
+        """
+        Store the velocity, location and transform of a registered actor
+        """
+        CarlaDataProvider._actor_velocity_map[actor_id] = math.sqrt(velocity.x**2 + velocity.y**2)
+        CarlaDataProvider._actor_location_map[actor_id] = transform.location
+        CarlaDataProvider._actor_transform_map[actor_id] = transform
+
+    @staticmethod
+    def set_snapshot_refresh(flag):
+        """
+        Set whether on_carla_tick reads the actor information from a world snapshot (default),
+        or asks each actor for it
+        """
+        CarlaDataProvider._snapshot_refresh = flag
+
+    @staticmethod
+    def get_saved_rpcs():
+        """
+        @return the amount of actor RPCs avoided by reading the world snapshots
+        """
+        return CarlaDataProvider._saved_rpcs
+
+    @staticmethod
+    def register_tick_callback(callback):
+        """
+        Register a function (without arguments) to be called at the end of every on_carla_tick,
+        once the actor information has been updated
+        """
+        if callback not in CarlaDataProvider._tick_callbacks:
+            CarlaDataProvider._tick_callbacks.append(callback)
+
+    @staticmethod
+    def remove_tick_callback(callback):
+        """
+        Stop calling a function registered with register_tick_callback
+        """
+        if callback in CarlaDataProvider._tick_callbacks:
+            CarlaDataProvider._tick_callbacks.remove(callback)
+
+    @staticmethod
+    def command_batch():
+        """
+        Returns the batch of the actor commands of the current tick, to be used as a context:
+
+            with CarlaDataProvider.command_batch() as batch:
+                batch.set_target_velocity(actor, velocity)
+
+        The commands are applied with one call when the outermost context exits.
+        The scenario managers open it around each tick of the scenario tree
+        """
+        if CarlaDataProvider._command_batch is None:
+            CarlaDataProvider._command_batch = CommandBatch(CarlaDataProvider._client)
+        return CarlaDataProvider._command_batch
+
     @staticmethod
     def get_velocity(actor):
         """
         returns the absolute velocity for the given actor
         """
-        for key in CarlaDataProvider._actor_velocity_map:
-            if key.id == actor.id:
-                return CarlaDataProvider._actor_velocity_map[key]
+        if actor.id in CarlaDataProvider._actor_velocity_map:
+            return CarlaDataProvider._actor_velocity_map[actor.id]
 
         # We are intentionally not throwing here
         # This may cause exception loops in py_trees
@@ -164,9 +255,8 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         """
         returns the location for the given actor
         """
-        for key in CarlaDataProvider._actor_location_map:
-            if key.id == actor.id:
-                return CarlaDataProvider._actor_location_map[key]
+        if actor.id in CarlaDataProvider._actor_location_map:
+            return CarlaDataProvider._actor_location_map[actor.id]
 
         # We are intentionally not throwing here
         # This may cause exception loops in py_trees
@@ -178,9 +268,8 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         """
         returns the transform for the given actor
         """
-        for key in CarlaDataProvider._actor_transform_map:
-            if key.id == actor.id:
-                return CarlaDataProvider._actor_transform_map[key]
+        if actor.id in CarlaDataProvider._actor_transform_map:
+            return CarlaDataProvider._actor_transform_map[actor.id]
 
         # We are intentionally not throwing here
         # This may cause exception loops in py_trees
@@ -193,6 +282,7 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         Set the CARLA client
         """
         CarlaDataProvider._client = client
+        CarlaDataProvider._command_batch = None
 
     @staticmethod
     def get_client():
@@ -210,6 +300,10 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         CarlaDataProvider._sync_flag = world.get_settings().synchronous_mode
         CarlaDataProvider._map = world.get_map()
         CarlaDataProvider._blueprint_library = world.get_blueprint_library()
+        CarlaDataProvider._blueprint_index = {}
+        CarlaDataProvider._blueprint_templates = {}
+        CarlaDataProvider._recycle_keys = {}
+        CarlaDataProvider._parked_actors = {}
         CarlaDataProvider._grp = GlobalRoutePlanner(CarlaDataProvider._map, 2.0)
         CarlaDataProvider.generate_spawn_points()
         CarlaDataProvider.prepare_map()
@@ -237,6 +331,23 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
         return CarlaDataProvider._map
 
+    @staticmethod
+    def get_waypoint_cache():
+        """
+        Get the waypoint cache of the current map, which is kept between routes of the same map
+        """
+        carla_map = CarlaDataProvider.get_map()
+        if CarlaDataProvider._waypoint_cache is None or CarlaDataProvider._waypoint_cache.map_name != carla_map.name:
+            CarlaDataProvider._waypoint_cache = WaypointCache(carla_map)
+        return CarlaDataProvider._waypoint_cache
+
+    @staticmethod
+    def get_waypoint(location, project_to_road=True, lane_type=carla.LaneType.Driving):
+        """
+        Same as get_map().get_waypoint(), but answered by the waypoint cache when possible
+        """
+        return CarlaDataProvider.get_waypoint_cache().get_waypoint(location, project_to_road, lane_type)
+
     @staticmethod
     def get_random_seed():
         """
@@ -257,11 +368,16 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         @return all the world actors. This is an expensive call, hence why it is part of the CDP,
         but as this might not be used by everyone, only get the actors the first time someone
         calls asks for them. 'CarlaDataProvider._all_actors' is reset each tick to None.
+        The actors parked to be recycled are not part of it.
         """
         if CarlaDataProvider._all_actors:
             return CarlaDataProvider._all_actors
 
-        CarlaDataProvider._all_actors = CarlaDataProvider._world.get_actors()
+        all_actors = CarlaDataProvider._world.get_actors()
+        parked_ids = CarlaDataProvider._get_parked_ids()
+        if parked_ids:
+            all_actors = FilteredActorList([actor for actor in all_actors if actor.id not in parked_ids])
+        CarlaDataProvider._all_actors = all_actors
         return CarlaDataProvider._all_actors
 
     @staticmethod
@@ -427,12 +543,13 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         else:
             location = CarlaDataProvider.get_location(actor)
 
-        waypoint = CarlaDataProvider.get_map().get_waypoint(location)
+        waypoint_cache = CarlaDataProvider.get_waypoint_cache()
+        waypoint = waypoint_cache.get_waypoint(location)
         # Create list of all waypoints until next intersection
         list_of_waypoints = []
         while waypoint and not waypoint.is_intersection:
             list_of_waypoints.append(waypoint)
-            waypoint = waypoint.next(2.0)[0]
+            waypoint = waypoint_cache.next(waypoint, 2.0)[0]
 
         # If the list is empty, the actor is in an intersection
         if not list_of_waypoints:
@@ -464,9 +581,10 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         CarlaDataProvider._spawn_index = 0
 
     @staticmethod
-    def create_blueprint(model, rolename='scenario', color=None, actor_category="car", attribute_filter=None):
+    def get_blueprint_ids(model, attribute_filter=None):
         """
-        Function to setup the blueprint of an actor given its model and other relevant parameters
+        Returns the ids of the blueprints matching the model pattern and with the attribute values of the filter.
+        The result is computed once per pattern and filter, until the world changes
         """
         def check_attribute_value(blueprint, name, value):
             """
@@ -475,7 +593,7 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
             if not blueprint.has_attribute(name):
                 return False
 
-            attribute_type = blueprint.get_attribute(key).type
+            attribute_type = blueprint.get_attribute(name).type
             if attribute_type == carla.ActorAttributeType.Bool:
                 return blueprint.get_attribute(name).as_bool() == value
             elif attribute_type == carla.ActorAttributeType.Int:
@@ -487,6 +605,43 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
             return False
 
+        key = (model, tuple(sorted(attribute_filter.items())) if attribute_filter else None)
+        if key not in CarlaDataProvider._blueprint_index:
+            blueprints = CarlaDataProvider._blueprint_library.filter(model)
+            if attribute_filter is not None:
+                for name, value in attribute_filter.items():
+                    blueprints = [x for x in blueprints if check_attribute_value(x, name, value)]
+            CarlaDataProvider._blueprint_index[key] = [x.id for x in blueprints]
+
+        return CarlaDataProvider._blueprint_index[key]
+
+    @staticmethod
+    def get_blueprint(blueprint_id):
+        """
+        Returns a new copy of the blueprint with that id, which can be freely modified
+        """
+        return CarlaDataProvider._blueprint_library.find(blueprint_id)
+
+    @staticmethod
+    def _get_blueprint_template(blueprint):
+        """
+        Returns the attributes of the blueprint used by create_blueprint, computed once per blueprint id:
+        its recommended colors (None if it has no color), and whether it can be made mortal and given a rolename
+        """
+        if blueprint.id not in CarlaDataProvider._blueprint_templates:
+            colors = None
+            if blueprint.has_attribute('color'):
+                colors = list(blueprint.get_attribute('color').recommended_values)
+            CarlaDataProvider._blueprint_templates[blueprint.id] = (
+                colors, blueprint.has_attribute('is_invincible'), blueprint.has_attribute('role_name'))
+
+        return CarlaDataProvider._blueprint_templates[blueprint.id]
+
+    @staticmethod
+    def create_blueprint(model, rolename='scenario', color=None, actor_category="car", attribute_filter=None):
+        """
+        Function to setup the blueprint of an actor given its model and other relevant parameters
+        """
         _actor_blueprint_categories = {
             'car': 'vehicle.tesla.model3',
             'van': 'vehicle.volkswagen.t2',
@@ -503,12 +658,8 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
         # Set the model
         try:
-            blueprints = CarlaDataProvider._blueprint_library.filter(model)
-            if attribute_filter is not None:
-                for key, value in attribute_filter.items():
-                    blueprints = [x for x in blueprints if check_attribute_value(x, key, value)]
-
-            blueprint = CarlaDataProvider._rng.choice(blueprints)
+            blueprint_ids = CarlaDataProvider.get_blueprint_ids(model, attribute_filter)
+            blueprint = CarlaDataProvider.get_blueprint(str(CarlaDataProvider._rng.choice(blueprint_ids)))
         except ValueError:
             # The model is not part of the blueprint library. Let's take a default one for the given category
             bp_filter = "vehicle.*"
@@ -516,11 +667,14 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
             if new_model != '':
                 bp_filter = new_model
             print("WARNING: Actor model {} not available. Using instead {}".format(model, new_model))
-            blueprint = CarlaDataProvider._rng.choice(CarlaDataProvider._blueprint_library.filter(bp_filter))
+            blueprint_ids = CarlaDataProvider.get_blueprint_ids(bp_filter)
+            blueprint = CarlaDataProvider.get_blueprint(str(CarlaDataProvider._rng.choice(blueprint_ids)))
+
+        colors, has_invincible, has_role_name = CarlaDataProvider._get_blueprint_template(blueprint)
 
         # Set the color
         if color:
-            if not blueprint.has_attribute('color'):
+            if colors is None:
                 print(
                     "WARNING: Cannot set Color ({}) for actor {} due to missing blueprint attribute".format(
                         color, blueprint.id))
@@ -535,16 +689,16 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
                         color, blueprint.id, default_color))
                     blueprint.set_attribute('color', default_color)
         else:
-            if blueprint.has_attribute('color') and rolename != 'hero':
-                color = CarlaDataProvider._rng.choice(blueprint.get_attribute('color').recommended_values)
+            if colors is not None and rolename != 'hero':
+                color = CarlaDataProvider._rng.choice(colors)
                 blueprint.set_attribute('color', color)
 
         # Make pedestrians mortal
-        if blueprint.has_attribute('is_invincible'):
+        if has_invincible:
             blueprint.set_attribute('is_invincible', 'false')
 
         # Set the rolename
-        if blueprint.has_attribute('role_name'):
+        if has_role_name:
             blueprint.set_attribute('role_name', rolename)
 
         return blueprint
@@ -584,10 +738,22 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
     @staticmethod
     def request_new_actor(model, spawn_point, rolename='scenario', autopilot=False,
                           random_location=False, color=None, actor_category="car",
-                          attribute_filter=None, tick=True):
+                          attribute_filter=None, tick=True, recycle=False):
         """
         This method tries to create a new actor, returning it if successful (None otherwise).
+
+        With 'recycle', a parked actor of the same model, attribute filter and rolename is reused if available,
+        and the new actor can be parked by park_actors() instead of being destroyed. 'recycle' is the owner
+        of the actor, such as the class of the behavior spawning it, and only its own parked actors are reused,
+        as they keep the traffic manager settings it gave them
         """
+        recycle_key = None
+        if recycle and not random_location and not color:
+            recycle_key = CarlaDataProvider._get_recycle_key(recycle, model, attribute_filter, rolename)
+            actors = CarlaDataProvider._reuse_parked_actors(recycle_key, [spawn_point], autopilot)
+            if actors:
+                return actors[0]
+
         blueprint = CarlaDataProvider.create_blueprint(model, rolename, color, actor_category, attribute_filter)
 
         if random_location:
@@ -630,6 +796,8 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
         CarlaDataProvider._carla_actor_pool[actor.id] = actor
         CarlaDataProvider.register_actor(actor, spawn_point)
+        if recycle_key is not None:
+            CarlaDataProvider._recycle_keys[actor.id] = recycle_key
         return actor
 
     @staticmethod
@@ -710,7 +878,7 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
     @staticmethod
     def request_new_batch_actors(model, amount, spawn_points, autopilot=False,
                                  random_location=False, rolename='scenario',
-                                 attribute_filter=None, tick=True):
+                                 attribute_filter=None, tick=True, recycle=False):
         """
         Simplified version of "request_new_actors". This method also create several actors in batch.
 
@@ -719,12 +887,22 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
 
         Some parameters are the same for all actors (rolename, autopilot and random location)
         while others are randomized (color)
+
+        With 'recycle', the parked actors of the same owner, model, attribute filter and rolename are reused first
         """
 
         SpawnActor = carla.command.SpawnActor      # pylint: disable=invalid-name
         SetAutopilot = carla.command.SetAutopilot  # pylint: disable=invalid-name
         FutureActor = carla.command.FutureActor    # pylint: disable=invalid-name
 
+        recycle_key = None
+        reused_actors = []
+        if recycle and not random_location:
+            recycle_key = CarlaDataProvider._get_recycle_key(recycle, model, attribute_filter, rolename)
+            reused_actors = CarlaDataProvider._reuse_parked_actors(recycle_key, spawn_points[:amount], autopilot)
+            spawn_points = spawn_points[len(reused_actors):]
+            amount -= len(reused_actors)
+
         CarlaDataProvider.generate_spawn_points()
 
         batch = []
@@ -751,14 +929,175 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
                 batch.append(SpawnActor(blueprint, spawn_point).then(
                     SetAutopilot(FutureActor, autopilot, CarlaDataProvider._traffic_manager_port)))
 
-        actors = CarlaDataProvider.handle_actor_batch(batch, tick)
+        actors = CarlaDataProvider.handle_actor_batch(batch, tick) if batch else []
         for actor, command in zip(actors, batch):
             if actor is None:
                 continue
             CarlaDataProvider._carla_actor_pool[actor.id] = actor
             CarlaDataProvider.register_actor(actor, command.transform)
+            if recycle_key is not None:
+                CarlaDataProvider._recycle_keys[actor.id] = recycle_key
 
-        return actors
+        return reused_actors + actors
+
+    @staticmethod
+    def _get_recycle_key(owner, model, attribute_filter, rolename):
+        """
+        Returns the key of the parked actors that can be reused by a request with these parameters
+        """
+        return (owner, model, tuple(sorted(attribute_filter.items())) if attribute_filter else None, rolename)
+
+    @staticmethod
+    def _get_parked_ids():
+        """
+        Returns the ids of the parked actors
+        """
+        return set(actor.id for parked in CarlaDataProvider._parked_actors.values() for actor in parked)
+
+    @staticmethod
+    def _get_parking_transform(index):
+        """
+        Returns the transform at which the parked actors are hidden, far below the map
+        """
+        return carla.Transform(carla.Location(x=10 * (index % 100), y=10 * (index // 100), z=-500))
+
+    @staticmethod
+    def _reuse_parked_actors(recycle_key, spawn_points, autopilot):
+        """
+        Teleports parked actors of that key to the spawn points, with one batch, and returns them.
+        Their physics are enabled again, their autopilot set and they are registered, as if they had just been spawned
+        """
+        ApplyTransform = carla.command.ApplyTransform                          # pylint: disable=invalid-name
+        ApplyTargetVelocity = carla.command.ApplyTargetVelocity                # pylint: disable=invalid-name
+        ApplyTargetAngularVelocity = carla.command.ApplyTargetAngularVelocity  # pylint: disable=invalid-name
+        PhysicsCommand = carla.command.SetSimulatePhysics                      # pylint: disable=invalid-name
+        SetAutopilot = carla.command.SetAutopilot                              # pylint: disable=invalid-name
+
+        parked_actors = CarlaDataProvider._parked_actors.get(recycle_key)
+        if not parked_actors or not CarlaDataProvider._client:
+            return []
+
+        batch = []
+        actors = []
+        for spawn_point in spawn_points:
+            if not parked_actors:
+                break
+            actor = parked_actors.pop()
+
+            # Same vertical shift as when spawning, without modifying the spawn point
+            transform = carla.Transform(
+                carla.Location(spawn_point.location.x, spawn_point.location.y, spawn_point.location.z + 0.2),
+                spawn_point.rotation)
+
+            batch.append(ApplyTransform(actor, transform))
+            batch.append(PhysicsCommand(actor, True))
+            batch.append(ApplyTargetVelocity(actor, carla.Vector3D()))
+            batch.append(ApplyTargetAngularVelocity(actor, carla.Vector3D()))
+            if isinstance(actor, carla.Vehicle):
+                batch.append(SetAutopilot(actor, autopilot, CarlaDataProvider._traffic_manager_port))
+            actors.append((actor, transform))
+
+        CarlaDataProvider._client.apply_batch_sync(batch, False)
+
+        # Until the next tick, the actors are at their new transform
+        for actor, transform in actors:
+            CarlaDataProvider.register_actor(actor, transform)
+        CarlaDataProvider._all_actors = None
+
+        CarlaDataProvider._recycled_actors += len(actors)
+        return [actor for actor, _ in actors]
+
+    @staticmethod
+    def park_actors(actors):
+        """
+        Retires actors spawned with 'recycle', hiding them below the map, with their physics and autopilot
+        disabled, until a new request reuses them. This avoids the spawn and destroy calls, which are expensive
+        for the server. All the actors are moved with one batch.
+
+        The rest of the actors, or those exceeding the maximum amount of parked actors, are destroyed.
+        Parked actors are unregistered and left out of get_all_actors(), but they are still part of the actor pool,
+        so they are destroyed at the cleanup
+        """
+        ApplyTransform = carla.command.ApplyTransform      # pylint: disable=invalid-name
+        PhysicsCommand = carla.command.SetSimulatePhysics  # pylint: disable=invalid-name
+        SetAutopilot = carla.command.SetAutopilot          # pylint: disable=invalid-name
+        SetLightState = carla.command.SetVehicleLightState  # pylint: disable=invalid-name
+        DestroyActor = carla.command.DestroyActor          # pylint: disable=invalid-name
+
+        if not CarlaDataProvider._client:
+            for actor in actors:
+                try:
+                    actor.destroy()
+                except RuntimeError:
+                    pass  # Actor was already destroyed
+            return
+
+        if CarlaDataProvider._command_batch is not None:
+            CarlaDataProvider._command_batch.discard([actor.id for actor in actors])
+
+        parked_ids = CarlaDataProvider._get_parked_ids()
+        parked_amount = len(parked_ids)
+
+        batch = []
+        for actor in actors:
+            if actor.id in parked_ids:
+                continue
+
+            if isinstance(actor, carla.Vehicle):
+                batch.append(SetAutopilot(actor, False, CarlaDataProvider._traffic_manager_port))
+
+            recycle_key = CarlaDataProvider._recycle_keys.get(actor.id)
+            if recycle_key is None or parked_amount >= CarlaDataProvider._max_parked_actors:
+                CarlaDataProvider._recycle_keys.pop(actor.id, None)
+                batch.append(DestroyActor(actor))
+                continue
+
+            transform = CarlaDataProvider._get_parking_transform(parked_amount)
+            batch.append(PhysicsCommand(actor, False))
+            batch.append(ApplyTransform(actor, transform))
+            if isinstance(actor, carla.Vehicle):
+                batch.append(SetLightState(actor, carla.VehicleLightState.NONE))
+
+            # Parked actors aren't updated at each tick
+            with CarlaDataProvider._lock:
+                CarlaDataProvider._registered_actors.pop(actor.id, None)
+                CarlaDataProvider._actor_velocity_map.pop(actor.id, None)
+                CarlaDataProvider._actor_location_map.pop(actor.id, None)
+                CarlaDataProvider._actor_transform_map.pop(actor.id, None)
+
+            CarlaDataProvider._parked_actors.setdefault(recycle_key, []).append(actor)
+            parked_ids.add(actor.id)
+            parked_amount += 1
+
+        if batch:
+            CarlaDataProvider._client.apply_batch_sync(batch, False)
+        CarlaDataProvider._all_actors = None
+
+    @staticmethod
+    def disable_recycling(actor):
+        """
+        Makes park_actors() destroy the actor instead of parking it. Used for actors with a state
+        that can't be reset when reused, such as a traffic manager path
+        """
+        CarlaDataProvider._unpark_actor(actor.id)
+
+    @staticmethod
+    def reset_stats():
+        """
+        Resets the counters of the waypoint cache, the command batch and the actor recycling,
+        keeping their data, so that their statistics are those of the current route
+        """
+        CarlaDataProvider.get_waypoint_cache().reset_stats()
+        CarlaDataProvider.command_batch().reset_stats()
+        CarlaDataProvider._recycled_actors = 0
+
+    @staticmethod
+    def get_actor_recycling_stats():
+        """
+        Returns the amount of reused actors and of currently parked ones
+        """
+        parked = sum(len(actors) for actors in CarlaDataProvider._parked_actors.values())
+        return {'recycled': CarlaDataProvider._recycled_actors, 'parked': parked}
 
     @staticmethod
     def get_actors():
@@ -807,6 +1146,7 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         Remove an actor from the pool using its ID
         """
         if actor_id in CarlaDataProvider._carla_actor_pool:
+            CarlaDataProvider._unpark_actor(actor_id)
             CarlaDataProvider._carla_actor_pool[actor_id].destroy()
             CarlaDataProvider._carla_actor_pool[actor_id] = None
             CarlaDataProvider._carla_actor_pool.pop(actor_id)
@@ -821,12 +1161,24 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         """
         for actor_id in CarlaDataProvider._carla_actor_pool.copy():
             if CarlaDataProvider._carla_actor_pool[actor_id].get_location().distance(location) < distance:
+                CarlaDataProvider._unpark_actor(actor_id)
                 CarlaDataProvider._carla_actor_pool[actor_id].destroy()
                 CarlaDataProvider._carla_actor_pool.pop(actor_id)
 
         # Remove all keys with None values
         CarlaDataProvider._carla_actor_pool = dict({k: v for k, v in CarlaDataProvider._carla_actor_pool.items() if v})
 
+    @staticmethod
+    def _unpark_actor(actor_id):
+        """
+        Removes the actor from the parked and recyclable actors, before it is destroyed
+        """
+        recycle_key = CarlaDataProvider._recycle_keys.pop(actor_id, None)
+        parked_actors = CarlaDataProvider._parked_actors.get(recycle_key, [])
+        for actor in list(parked_actors):
+            if actor.id == actor_id:
+                parked_actors.remove(actor)
+
     @staticmethod
     def get_traffic_manager_port():
         """
@@ -863,6 +1215,7 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
                 else:
                     raise e
 
+        CarlaDataProvider._registered_actors.clear()
         CarlaDataProvider._actor_velocity_map.clear()
         CarlaDataProvider._actor_location_map.clear()
         CarlaDataProvider._actor_transform_map.clear()
@@ -876,6 +1229,14 @@ class CarlaDataProvider(object):  # pylint: disable=too-many-public-methods
         CarlaDataProvider._client = None
         CarlaDataProvider._spawn_points = None
         CarlaDataProvider._spawn_index = 0
+        CarlaDataProvider._blueprint_index = {}
+        CarlaDataProvider._blueprint_templates = {}
         CarlaDataProvider._rng = random.RandomState(CarlaDataProvider._random_seed)
         CarlaDataProvider._grp = None
         CarlaDataProvider._runtime_init_flag = False
+        CarlaDataProvider._tick_callbacks = []
+        CarlaDataProvider._saved_rpcs = 0
+        CarlaDataProvider._recycle_keys = {}
+        CarlaDataProvider._parked_actors = {}
+        CarlaDataProvider._recycled_actors = 0
+        CarlaDataProvider._command_batch = None
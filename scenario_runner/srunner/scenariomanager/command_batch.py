@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Accumulator of the commands sent to the actors during a tick, such as their target velocity or light state.
+
+Instead of one RPC per call, the commands are applied together with one client.apply_batch() call,
+when the outermost context using the batch exits:
+
+    with CarlaDataProvider.command_batch() as batch:
+        batch.set_target_velocity(actor, velocity)
+
+The scenario managers open that context around each tick of the scenario tree, so all the commands
+of the behaviors are applied once per tick. Outside of it, each behavior context applies its own commands.
+"""
+
+import carla
+
+
+class CommandBatch(object):
+
+    """
+    Batch of carla.command's, applied when the outermost context exits
+    """
+
+    def __init__(self, client):
+        """
+        Parameters:
+        - client: the carla.Client applying the commands
+        """
+        self._client = client
+        self._commands = []
+        self._depth = 0
+
+        self.applied_commands = 0
+        self.applied_batches = 0
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, *args):
+        self._depth -= 1
+        if self._depth == 0:
+            self.flush()
+        return False
+
+    def add(self, actor, command):
+        """
+        Adds a command of the actor
+        """
+        self._commands.append((actor.id, command))
+
+    def set_target_velocity(self, actor, velocity):
+        """Same as actor.set_target_velocity()"""
+        self.add(actor, carla.command.ApplyTargetVelocity(actor, velocity))
+
+    def set_transform(self, actor, transform):
+        """Same as actor.set_transform()"""
+        self.add(actor, carla.command.ApplyTransform(actor, transform))
+
+    def set_light_state(self, actor, light_state):
+        """Same as vehicle.set_light_state()"""
+        self.add(actor, carla.command.SetVehicleLightState(actor, light_state))
+
+    def set_autopilot(self, actor, enabled, tm_port):
+        """Same as vehicle.set_autopilot()"""
+        self.add(actor, carla.command.SetAutopilot(actor, enabled, tm_port))
+
+    def discard(self, actor_ids):
+        """
+        Removes the pending commands of the actors, as they are about to be destroyed or parked
+        """
+        actor_ids = set(actor_ids)
+        self._commands = [(actor_id, command) for actor_id, command in self._commands if actor_id not in actor_ids]
+
+    def flush(self):
+        """
+        Applies all the pending commands, without waiting for their responses
+        """
+        if not self._commands:
+            return
+        if self._client is None:
+            raise ValueError("class member \'client'\' not initialized yet")
+
+        commands = [command for _, command in self._commands]
+        self._commands = []
+        self._client.apply_batch(commands)
+
+        self.applied_commands += len(commands)
+        self.applied_batches += 1
+
+    def get_stats(self):
+        """
+        Returns the amount of applied commands and batches
+        """
+        return {'commands': self.applied_commands, 'batches': self.applied_batches}
+
+    def reset_stats(self):
+        """
+        Resets the amount of applied commands and batches
+        """
+        self.applied_commands = 0
+        self.applied_batches = 0
@@ -171,8 +171,9 @@ class ScenarioManager(object):
             if self._agent is not None:
                 self.ego_vehicles[0].apply_control(ego_action)
 
-            # Tick scenario
-            self.scenario_tree.tick_once()
+            # Tick scenario, applying the actor commands of all the behaviors at once
+            with CarlaDataProvider.command_batch():
+                self.scenario_tree.tick_once()
 
             if self._debug_mode:
                 print("\n")
@@ -2849,6 +2849,9 @@ class ActorFlow(AtomicBehavior):
     controls them until another location, and then destroys them.
     Therefore, a parallel termination behavior has to be used.
 
+    The actors reaching the sink are parked by the CarlaDataProvider, and reused at the source
+    by this or other flows. Their collision sensor is destroyed when they are parked.
+
     Important parameters:
     - source_transform (carla.Transform): Transform at which actors will be spawned
     - sink_location (carla.Location): Location at which actors will be deleted
@@ -2911,13 +2914,12 @@ class ActorFlow(AtomicBehavior):
 
     def _spawn_actor(self, transform):
         actor = CarlaDataProvider.request_new_actor(
-            'vehicle.*', transform, rolename='scenario',
-            attribute_filter=self._attribute_filter, tick=False
+            'vehicle.*', transform, rolename='scenario', autopilot=True,
+            attribute_filter=self._attribute_filter, tick=False, recycle=self.__class__
         )
         if actor is None:
             return py_trees.common.Status.RUNNING
 
-        actor.set_autopilot(True, CarlaDataProvider.get_traffic_manager_port())
         self._tm.set_path(actor, [self._sink_location])
         self._tm.auto_lane_change(actor, False)
         self._tm.set_desired_speed(actor, 3.6 * self._speed)
@@ -2932,6 +2934,8 @@ class ActorFlow(AtomicBehavior):
 
             sensor = self._world.spawn_actor(self._collision_bp, carla.Transform(), attach_to=actor)
             sensor.listen(lambda _: self.stop_constant_velocity())
+        else:
+            self._tm.ignore_vehicles_percentage(actor, 0)
 
         self._tm.ignore_lights_percentage(actor, 100)
         self._tm.ignore_signs_percentage(actor, 100)
@@ -2940,19 +2944,26 @@ class ActorFlow(AtomicBehavior):
 
     def update(self):
         """Controls the created actors and creaes / removes other when needed"""
-        # Control the vehicles, removing them when needed
+        # Control the vehicles, parking them when needed
+        parked_actors = []
         for actor, sensor in zip(list(self._actor_list), list(self._collision_sensor_list)):
             location = CarlaDataProvider.get_location(actor)
             if not location:
                 continue
             sink_distance = self._sink_location.distance(location)
             if sink_distance < self._sink_dist:
+                # The parked actor can be reused by other flows, so it doesn't keep the sensor
                 if sensor is not None:
                     sensor.stop()
                     sensor.destroy()
                 self._collision_sensor_list.remove(sensor)
-                actor.destroy()
+                if self._is_constant_velocity_active:
+                    actor.disable_constant_velocity()
                 self._actor_list.remove(actor)
+                parked_actors.append(actor)
+
+        if parked_actors:
+            CarlaDataProvider.park_actors(parked_actors)
 
         # Spawn new actors if needed
         if len(self._actor_list) == 0:
@@ -2999,12 +3010,11 @@ class ActorFlow(AtomicBehavior):
             # Patched by removing its movement
             try:
                 actor.disable_constant_velocity()
-                actor.set_autopilot(False, CarlaDataProvider.get_traffic_manager_port())
                 actor.set_target_velocity(carla.Vector3D(0,0,0))
                 actor.set_target_angular_velocity(carla.Vector3D(0,0,0))
-                actor.destroy()
             except RuntimeError:
                 pass  # Actor was already destroyed
+        CarlaDataProvider.park_actors(self._actor_list)
 
 
 class OppositeActorFlow(AtomicBehavior):
@@ -3097,7 +3107,7 @@ class OppositeActorFlow(AtomicBehavior):
     def _spawn_actor(self):
         actor = CarlaDataProvider.request_new_actor(
             'vehicle.*', self._source_transform, rolename='scenario',
-            attribute_filter=self._attribute_filter, tick=False
+            attribute_filter=self._attribute_filter, tick=False, recycle=self.__class__
         )
         if actor is None:
             return py_trees.common.Status.RUNNING
@@ -3110,7 +3120,8 @@ class OppositeActorFlow(AtomicBehavior):
 
     def update(self):
         """Controls the created actors and creates / removes other when needed"""
-        # Control the vehicles, removing them when needed
+        # Control the vehicles, parking them when needed
+        parked_actors = []
         for actor_data in list(self._actor_list):
             actor, controller = actor_data
             location = CarlaDataProvider.get_location(actor)
@@ -3118,11 +3129,14 @@ class OppositeActorFlow(AtomicBehavior):
                 continue
             sink_distance = self._sink_location.distance(location)
             if sink_distance < self._sink_dist:
-                actor.destroy()
+                parked_actors.append(actor)
                 self._actor_list.remove(actor_data)
             else:
                 actor.apply_control(controller.run_step())
 
+        if parked_actors:
+            CarlaDataProvider.park_actors(parked_actors)
+
         # Spawn new actors if needed
         if len(self._actor_list) == 0:
             distance = self._spawn_dist + 1
@@ -3148,12 +3162,11 @@ class OppositeActorFlow(AtomicBehavior):
             # Patched by removing its movement
             try:
                 actor.disable_constant_velocity()
-                actor.set_autopilot(False, CarlaDataProvider.get_traffic_manager_port())
                 actor.set_target_velocity(carla.Vector3D(0,0,0))
                 actor.set_target_angular_velocity(carla.Vector3D(0,0,0))
-                actor.destroy()
             except RuntimeError:
                 pass  # Actor was already destroyed
+        CarlaDataProvider.park_actors([actor for actor, _ in self._actor_list])
 
 
 class InvadingActorFlow(AtomicBehavior):
@@ -3214,7 +3227,7 @@ class InvadingActorFlow(AtomicBehavior):
     def _spawn_actor(self):
         actor = CarlaDataProvider.request_new_actor(
             'vehicle.*', self._source_transform, rolename='scenario',
-            attribute_filter=self._attribute_filter, tick=False
+            attribute_filter=self._attribute_filter, tick=False, recycle=self.__class__
         )
         if actor is None:
             return py_trees.common.Status.RUNNING
@@ -3225,7 +3238,8 @@ class InvadingActorFlow(AtomicBehavior):
 
     def update(self):
         """Controls the created actors and creates / removes other when needed"""
-        # Control the vehicles, removing them when needed
+        # Control the vehicles, parking them when needed
+        parked_actors = []
         for actor_data in list(self._actor_list):
             actor, controller = actor_data
             location = CarlaDataProvider.get_location(actor)
@@ -3233,11 +3247,14 @@ class InvadingActorFlow(AtomicBehavior):
                 continue
             sink_distance = self._sink_location.distance(location)
             if sink_distance < self._sink_dist:
-                actor.destroy()
+                parked_actors.append(actor)
                 self._actor_list.remove(actor_data)
             else:
                 actor.apply_control(controller.run_step())
 
+        if parked_actors:
+            CarlaDataProvider.park_actors(parked_actors)
+
         # Spawn new actors if needed
         if len(self._actor_list) == 0:
             distance = self._spawn_dist + 1
@@ -3263,12 +3280,11 @@ class InvadingActorFlow(AtomicBehavior):
             # Patched by removing its movement
             try:
                 actor.disable_constant_velocity()
-                actor.set_autopilot(False, CarlaDataProvider.get_traffic_manager_port())
                 actor.set_target_velocity(carla.Vector3D(0,0,0))
                 actor.set_target_angular_velocity(carla.Vector3D(0,0,0))
-                actor.destroy()
             except RuntimeError:
                 pass  # Actor was already destroyed
+        CarlaDataProvider.park_actors([actor for actor, _ in self._actor_list])
 
 
 class BicycleFlow(AtomicBehavior):
@@ -3346,7 +3362,7 @@ class BicycleFlow(AtomicBehavior):
 
         actor = CarlaDataProvider.request_new_actor(
             'vehicle.*', transform, rolename='scenario no lights',
-            attribute_filter={'base_type': 'bicycle'}, tick=False
+            attribute_filter={'base_type': 'bicycle'}, tick=False, recycle=self.__class__
         )
         if actor is None:
             return
@@ -3364,7 +3380,8 @@ class BicycleFlow(AtomicBehavior):
 
     def update(self):
         """Controls the created actors and creaes / removes other when needed"""
-        # Control the vehicles, removing them when needed
+        # Control the vehicles, parking them when needed
+        parked_actors = []
         for actor_data in list(self._actor_data):
             actor, controller = actor_data
             location = CarlaDataProvider.get_location(actor)
@@ -3372,11 +3389,14 @@ class BicycleFlow(AtomicBehavior):
                 continue
             sink_distance = self._sink_location.distance(location)
             if sink_distance < self._sink_dist:
-                actor.destroy()
+                parked_actors.append(actor)
                 self._actor_data.remove(actor_data)
             else:
                 actor.apply_control(controller.run_step())
 
+        if parked_actors:
+            CarlaDataProvider.park_actors(parked_actors)
+
         # Spawn new actors if needed
         if len(self._actor_data) == 0:
             distance = self._spawn_dist + 1
@@ -3406,12 +3426,11 @@ class BicycleFlow(AtomicBehavior):
             # Patched by removing its movement
             try:
                 actor.disable_constant_velocity()
-                actor.set_autopilot(False, CarlaDataProvider.get_traffic_manager_port())
                 actor.set_target_velocity(carla.Vector3D(0,0,0))
                 actor.set_target_angular_velocity(carla.Vector3D(0,0,0))
-                actor.destroy()
             except RuntimeError:
                 pass  # Actor was already destroyed
+        CarlaDataProvider.park_actors([actor for actor, _ in self._actor_data])
 
 
 class OpenVehicleDoor(AtomicBehavior):
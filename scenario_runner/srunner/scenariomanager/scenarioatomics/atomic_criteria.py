@@ -26,6 +26,7 @@ from agents.tools.misc import get_speed
 from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
 from srunner.scenariomanager.timer import GameTime
 from srunner.scenariomanager.traffic_events import TrafficEvent, TrafficEventType
+from srunner.tools.route_geometry import get_route_geometry
 
 
 class Criterion(py_trees.behaviour.Behaviour):
@@ -1008,7 +1009,7 @@ class OutsideRouteLanesTest(Criterion):
         self._route = route
         self._current_index = 0
         self._route_length = len(self._route)
-        self._route_transforms, _ = zip(*self._route)
+        self._route_geometry = get_route_geometry(self._route)
 
         self._map = CarlaDataProvider.get_map()
         self._last_ego_waypoint = self._map.get_waypoint(self.actor.get_location())
@@ -1051,30 +1052,21 @@ class OutsideRouteLanesTest(Criterion):
         if self._outside_lane_active or (self._wrong_direction_active and self._wrong_lane_active):
             self.test_status = "FAILURE"
 
-        # Get the traveled distance
-        for index in range(self._current_index + 1,
-                           min(self._current_index + self.WINDOWS_SIZE + 1, self._route_length)):
-            # Get the dot product to know if it has passed this location
-            route_transform = self._route_transforms[index]
-            route_location = route_transform.location
+        # Get the traveled distance, checking if the actor has passed the next route points
+        for index in self._route_geometry.get_passed_indices(
+                location, self._current_index + 1, self._current_index + self.WINDOWS_SIZE + 1):
+            # Get the distance traveled and add it to the total distance
+            new_dist = self._route_geometry.distance(self._current_index, index)
+            self._total_distance += new_dist
 
-            wp_dir = route_transform.get_forward_vector()  # Waypoint's forward vector
-            wp_veh = location - route_location  # vector waypoint - vehicle
+            # And to the wrong one if outside route lanes
+            if self._outside_lane_active or (self._wrong_direction_active and self._wrong_lane_active):
+                self._wrong_distance += new_dist
 
-            if wp_veh.dot(wp_dir) > 0:
-                # Get the distance traveled and add it to the total distance
-                prev_route_location = self._route_transforms[self._current_index].location
-                new_dist = prev_route_location.distance(route_location)
-                self._total_distance += new_dist
+            if self._wrong_distance:
+                self._set_traffic_event()
 
-                # And to the wrong one if outside route lanes
-                if self._outside_lane_active or (self._wrong_direction_active and self._wrong_lane_active):
-                    self._wrong_distance += new_dist
-
-                if self._wrong_distance:
-                    self._set_traffic_event()
-
-                self._current_index = index
+            self._current_index = index
 
         self.logger.debug("%s.update()[%s->%s]" % (self.__class__.__name__, self.status, new_status))
         return new_status
@@ -1107,8 +1099,8 @@ class OutsideRouteLanesTest(Criterion):
         """
         Detects if the ego_vehicle is outside driving lanes
         """
-        driving_wp = self._map.get_waypoint(location, lane_type=carla.LaneType.Driving)
-        parking_wp = self._map.get_waypoint(location, lane_type=carla.LaneType.Parking)
+        driving_wp = CarlaDataProvider.get_waypoint(location, lane_type=carla.LaneType.Driving)
+        parking_wp = CarlaDataProvider.get_waypoint(location, lane_type=carla.LaneType.Parking)
 
         driving_distance = location.distance(driving_wp.transform.location)
         if parking_wp is not None:  # Some towns have no parking
@@ -1129,7 +1121,7 @@ class OutsideRouteLanesTest(Criterion):
         """
         Detects if the ego_vehicle has invaded a wrong lane
         """
-        waypoint = self._map.get_waypoint(location, lane_type=carla.LaneType.Driving)
+        waypoint = CarlaDataProvider.get_waypoint(location, lane_type=carla.LaneType.Driving)
         lane_id = waypoint.lane_id
         road_id = waypoint.road_id
 
@@ -1205,7 +1197,7 @@ class WrongLaneTest(Criterion):
         if self._terminate_on_failure and (self.test_status == "FAILURE"):
             new_status = py_trees.common.Status.FAILURE
 
-        lane_waypoint = self._map.get_waypoint(self.actor.get_location())
+        lane_waypoint = CarlaDataProvider.get_waypoint(self.actor.get_location())
         current_lane_id = lane_waypoint.lane_id
         current_road_id = lane_waypoint.road_id
 
@@ -1295,7 +1287,7 @@ class WrongLaneTest(Criterion):
         """
         if not self._in_lane:
 
-            lane_waypoint = self._map.get_waypoint(self.actor.get_location())
+            lane_waypoint = CarlaDataProvider.get_waypoint(self.actor.get_location())
             current_lane_id = lane_waypoint.lane_id
             current_road_id = lane_waypoint.road_id
 
@@ -1415,21 +1407,13 @@ class InRouteTest(Criterion):
             self._offroad_min = self._offroad_min
 
         self._world = CarlaDataProvider.get_world()
-        self._route_transforms, _ = zip(*self._route)
+        self._route_geometry = get_route_geometry(self._route)
         self._route_length = len(self._route)
         self._current_index = 0
         self._out_route_distance = 0
         self._in_safe_route = True
 
-        self._accum_meters = []
-        prev_loc = self._route_transforms[0].location
-        for i, tran in enumerate(self._route_transforms):
-            loc = tran.location
-            d = loc.distance(prev_loc)
-            accum = 0 if i == 0 else self._accum_meters[i - 1]
-
-            self._accum_meters.append(d + accum)
-            prev_loc = loc
+        self._accum_meters = self._route_geometry.accum_meters
 
         # Blackboard variable
         blackv = py_trees.blackboard.Blackboard()
@@ -1452,17 +1436,9 @@ class InRouteTest(Criterion):
 
             off_route = True
 
-            shortest_distance = float('inf')
-            closest_index = -1
-
             # Get the closest distance
-            for index in range(self._current_index,
-                               min(self._current_index + self.WINDOWS_SIZE + 1, self._route_length)):
-                ref_location = self._route_transforms[index].location
-                distance = math.sqrt(((location.x - ref_location.x) ** 2) + ((location.y - ref_location.y) ** 2))
-                if distance <= shortest_distance:
-                    closest_index = index
-                    shortest_distance = distance
+            closest_index, shortest_distance = self._route_geometry.get_closest_index(
+                location, self._current_index, self._current_index + self.WINDOWS_SIZE + 1)
 
             if closest_index == -1 or shortest_distance == float('inf'):
                 return new_status
@@ -1475,7 +1451,7 @@ class InRouteTest(Criterion):
             # If actor advanced a step, record the distance
             if self._current_index != closest_index:
 
-                new_dist = self._accum_meters[closest_index] - self._accum_meters[self._current_index]
+                new_dist = float(self._accum_meters[closest_index] - self._accum_meters[self._current_index])
 
                 # If too far from the route, add it and check if its value
                 if not self._in_safe_route:
@@ -1537,10 +1513,10 @@ class RouteCompletionTest(Criterion):
 
         self._index = 0
         self._route_length = len(self._route)
-        self._route_transforms, _ = zip(*self._route)
+        self._route_geometry = get_route_geometry(self._route)
         self._route_accum_perc = self._get_acummulated_percentages()
 
-        self.target_location = self._route_transforms[-1].location
+        self.target_location = self._route[-1][0].location
 
         self._traffic_event = TrafficEvent(event_type=TrafficEventType.ROUTE_COMPLETION, frame=0)
         self._traffic_event.set_dict({'route_completed': self.actual_value})
@@ -1549,17 +1525,7 @@ class RouteCompletionTest(Criterion):
 
     def _get_acummulated_percentages(self):
         """Gets the accumulated percentage of each of the route transforms"""
-        accum_meters = []
-        prev_loc = self._route_transforms[0].location
-        for i, tran in enumerate(self._route_transforms):
-            d = tran.location.distance(prev_loc)
-            new_d = 0 if i == 0 else accum_meters[i - 1]
-
-            accum_meters.append(d + new_d)
-            prev_loc = tran.location
-
-        max_dist = accum_meters[-1]
-        return [x / max_dist * 100 for x in accum_meters]
+        return self._route_geometry.get_accumulated_percentages().tolist()
 
     def update(self):
         """
@@ -1576,16 +1542,12 @@ class RouteCompletionTest(Criterion):
 
         elif self.test_status in ('RUNNING', 'INIT'):
 
-            for index in range(self._index, min(self._index + self.WINDOWS_SIZE + 1, self._route_length)):
-                # Get the dot product to know if it has passed this location
-                route_transform = self._route_transforms[index]
-                route_location = route_transform.location
-                wp_dir = route_transform.get_forward_vector()          # Waypoint's forward vector
-                wp_veh = location - route_location                     # vector route - vehicle
-
-                if wp_veh.dot(wp_dir) > 0:
-                    self._index = index
-                    self.actual_value = self._route_accum_perc[self._index]
+            # Get the dot product to know if it has passed the next locations
+            index = self._route_geometry.get_last_passed_index(
+                location, self._index, self._index + self.WINDOWS_SIZE + 1)
+            if index is not None:
+                self._index = index
+                self.actual_value = self._route_accum_perc[self._index]
 
             self.actual_value = round(self.actual_value, 2)
             self._traffic_event.set_dict({'route_completed': self.actual_value})
@@ -1976,15 +1938,8 @@ class MinimumSpeedRouteTest(Criterion):
         self.actual_value = 100
 
         self._route = route
-        self._accum_dist = []
-        prev_trans = None
-        for trans, _ in route:
-            if prev_trans:
-                dist = trans.location.distance(prev_trans.location)
-                self._accum_dist.append(dist + self._accum_dist[-1])
-            else:
-                self._accum_dist.append(0)
-            prev_trans = trans
+        self._route_geometry = get_route_geometry(self._route)
+        self._accum_dist = self._route_geometry.accum_meters.tolist()
         self._route_length = len(self._route)
 
         self._checkpoints = checkpoints
@@ -2014,15 +1969,10 @@ class MinimumSpeedRouteTest(Criterion):
         if location is None:
             return new_status
 
-        for index in range(self._index, min(self._index + self.WINDOWS_SIZE + 1, self._route_length)):
-            # Get the dot product to know if it has passed this location
-            route_transform = self._route[index][0]
-            route_location = route_transform.location
-            wp_dir = route_transform.get_forward_vector()
-            wp_veh = location - route_location
-
-            if wp_veh.dot(wp_dir) > 0:
-                self._index = index
+        # Get the dot product to know if it has passed the next locations
+        index = self._route_geometry.get_last_passed_index(location, self._index, self._index + self.WINDOWS_SIZE + 1)
+        if index is not None:
+            self._index = index
 
         if self._accum_dist[self._index] - self._current_dist > self._checkpoint_dist:
             self._set_traffic_event()
@@ -15,6 +15,7 @@ import operator
 import py_trees
 
 from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+from srunner.tools.route_geometry import get_route_geometry
 
 
 class GameTime(object):
@@ -186,17 +187,8 @@ class RouteTimeoutBehavior(py_trees.behaviour.Behaviour):
         self._current_index = 0
 
         self._route_length = len(self._route)
-        self._route_transforms, _ = zip(*self._route)
-
-        self._route_accum_meters = []
-        prev_loc = self._route_transforms[0].location
-        for i, tran in enumerate(self._route_transforms):
-            loc = tran.location
-            d = loc.distance(prev_loc)
-            accum = 0 if i == 0 else self._route_accum_meters[i - 1]
-
-            self._route_accum_meters.append(d + accum)
-            prev_loc = loc
+        self._route_geometry = get_route_geometry(self._route)
+        self._route_accum_meters = self._route_geometry.accum_meters.tolist()
 
     def initialise(self):
         """
@@ -217,13 +209,10 @@ class RouteTimeoutBehavior(py_trees.behaviour.Behaviour):
         if ego_location is None:
             return new_status
 
-        new_index = self._current_index
-
-        for index in range(self._current_index, min(self._current_index + self._wsize + 1, self._route_length)):
-            route_transform = self._route_transforms[index]
-            route_veh_vec = ego_location - route_transform.location
-            if route_veh_vec.dot(route_transform.get_forward_vector()) > 0:
-                new_index = index
+        new_index = self._route_geometry.get_last_passed_index(
+            ego_location, self._current_index, self._current_index + self._wsize + 1)
+        if new_index is None:
+            new_index = self._current_index
 
         # Update the timeout value
         if new_index > self._current_index:
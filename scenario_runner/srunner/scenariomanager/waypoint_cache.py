@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Cache of the map waypoint queries done every tick by the criteria, the background traffic and the agents.
+
+Locations are quantized to a grid of 'resolution' meters, and all the locations of the same cell share
+the waypoint of the first one that was queried. The cells are kept in a LRU cache, and so are the results
+of Waypoint.next(), keyed by the waypoint id, which identifies its road, section, lane and s.
+"""
+
+from collections import OrderedDict
+
+import carla
+
+
+class WaypointCache(object):
+
+    """
+    LRU caches of the Map.get_waypoint() and Waypoint.next() results, only calling them on cache misses
+    """
+
+    def __init__(self, carla_map, resolution=0.1, max_size=100000):
+        """
+        Parameters:
+        - carla_map: the carla.Map queried on cache misses
+        - resolution: side of the grid cells, in meters
+        - max_size: maximum amount of entries of each cache
+        """
+        self._map = carla_map
+        self.map_name = carla_map.name
+        self._resolution = resolution
+        self._max_size = max_size
+        self._waypoints = OrderedDict()
+        self._next_waypoints = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.next_hits = 0
+        self.next_misses = 0
+
+    def _cached(self, cache, key, compute):
+        if key in cache:
+            cache.move_to_end(key)
+            return True, cache[key]
+
+        value = compute()
+        cache[key] = value
+        if len(cache) > self._max_size:
+            cache.popitem(last=False)
+        return False, value
+
+    def get_waypoint(self, location, project_to_road=True, lane_type=carla.LaneType.Driving):
+        """
+        Same as carla.Map.get_waypoint(), for the cell of the location
+        """
+        key = (round(location.x / self._resolution), round(location.y / self._resolution),
+               round(location.z / self._resolution), project_to_road, lane_type)
+        hit, waypoint = self._cached(self._waypoints, key,
+                                     lambda: self._map.get_waypoint(location, project_to_road, lane_type))
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return waypoint
+
+    def next(self, waypoint, distance):
+        """
+        Same as waypoint.next(distance)
+        """
+        hit, waypoints = self._cached(self._next_waypoints, (waypoint.id, distance), lambda: waypoint.next(distance))
+        if hit:
+            self.next_hits += 1
+        else:
+            self.next_misses += 1
+        return waypoints
+
+    def get_stats(self):
+        """
+        Returns the hits, misses, hit rate and size of both caches
+        """
+        def stats(hits, misses, cache):
+            total = hits + misses
+            return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0, 'size': len(cache)}
+
+        return {
+            'get_waypoint': stats(self.hits, self.misses, self._waypoints),
+            'next': stats(self.next_hits, self.next_misses, self._next_waypoints)
+        }
+
+    def clear(self):
+        """
+        Empties the caches and resets their counters
+        """
+        self._waypoints.clear()
+        self._next_waypoints.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Resets the counters, keeping the cached waypoints
+        """
+        self.hits = 0
+        self.misses = 0
+        self.next_hits = 0
+        self.next_misses = 0
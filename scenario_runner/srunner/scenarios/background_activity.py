@@ -15,6 +15,7 @@ import carla
 
 from agents.navigation.local_planner import RoadOption
 
+from srunner.scenariomanager.actor_lane_index import ActorLaneIndex
 from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
 from srunner.scenariomanager.scenarioatomics.atomic_behaviors import AtomicBehavior
 from srunner.tools.scenario_helper import get_same_dir_lanes, get_opposite_dir_lanes
@@ -114,7 +115,7 @@ class Source(object):
 
         # For junction sources
         self.entry_lane_wp = entry_lane_wp
-        self.previous_lane_keys = []  # Source lane and connecting lanes of the previous junction
+        self.previous_lanes = []  # (road_id, lane_id) of the source lane and connecting lanes of the previous junction
 
 
 class Junction(object):
@@ -190,7 +191,10 @@ class BackgroundBehavior(AtomicBehavior):
         self._route_index = 0
         self._get_route_data(route)
         self._actors_speed_perc = {}  # Dictionary actor - percentage
+        self._actors_desired_speed = {}  # Dictionary actor - speed sent to the Traffic Manager
         self._all_actors = []
+        self._actor_index = ActorLaneIndex()  # Actors sorted by their position at each lane
+        self._actor_lists = {}  # Dictionary actor id - lists of the behavior that contain the actor
         self._lane_width_threshold = 2.25  # Used to stop some behaviors at narrow lanes to avoid problems [m]
 
         self._spawn_vertical_shift = 0.2
@@ -309,6 +313,9 @@ class BackgroundBehavior(AtomicBehavior):
         # Update ego's route position. For robustness, the route point is used for most calculus
         self._update_ego_data()
 
+        # The actors have moved, so update their position at the lane index
+        self._actor_index.update_actors(self._all_actors)
+
         # Parameters and scenarios
         self._update_parameters()
 
@@ -344,13 +351,14 @@ class BackgroundBehavior(AtomicBehavior):
     def terminate(self, new_status):
         """Destroy all actors"""
         all_actors = list(self._actors_speed_perc)
-        for actor in list(all_actors):
-            self._destroy_actor(actor)
+        for actor in all_actors:
+            self._remove_actor_info(actor)
+        CarlaDataProvider.park_actors(all_actors)
         super(BackgroundBehavior, self).terminate(new_status)
 
     def _check_background_actors(self):
         """Checks if the Traffic Manager has removed a backgroudn actor"""
-        alive_ids = [actor.id for actor in CarlaDataProvider.get_all_actors().filter('vehicle*')]
+        alive_ids = set(actor.id for actor in CarlaDataProvider.get_all_actors().filter('vehicle*'))
         for actor in list(self._all_actors):
             if actor.id not in alive_ids:
                 self._remove_actor_info(actor)
@@ -849,7 +857,7 @@ class BackgroundBehavior(AtomicBehavior):
                 # TODO: Map the actors to the junction entry to have full control of them.
                 # This should remove the 'at_oppo_entry_lane'.
                 self._add_actor_dict_element(junction.actor_dict, actor)
-                if actor not in self._scenario_stopped_actors:
+                if not self._is_actor_in_list(actor, self._scenario_stopped_actors):
                     self._actors_speed_perc[actor] = 100
 
         for lane_key in self._road_dict:
@@ -905,7 +913,7 @@ class BackgroundBehavior(AtomicBehavior):
             # Instead, let them move freely until they are automatically destroyed.
             self._actors_speed_perc[actor] = 100
             if actor_dict[actor]['at_oppo_entry_lane']:
-                self._opposite_actors.append(actor)
+                self._add_actor_to_list(self._opposite_actors, actor)
                 self._tm.ignore_lights_percentage(actor, 100)
                 self._tm.ignore_signs_percentage(actor, 100)
                 continue
@@ -914,12 +922,12 @@ class BackgroundBehavior(AtomicBehavior):
             exit_key = actor_dict[actor]['exit_lane_key']
             if exit_key in route_exit_keys:
                 if not self._active_junctions:
-                    self._road_dict[exit_key].actors.append(actor)
+                    self._add_actor_to_list(self._road_dict[exit_key].actors, actor)
                 else:
                     entry_sources = self._active_junctions[0].entry_sources
                     for entry_source in entry_sources: # Add it to the back source
                         if exit_key == get_lane_key(entry_source.wp):
-                            entry_sources.actors.append(actor)
+                            self._add_actor_to_list(entry_source.actors, actor)
                             break
                 continue
 
@@ -995,12 +1003,14 @@ class BackgroundBehavior(AtomicBehavior):
     def _add_incoming_actors(self, junction, source):
         """Checks nearby actors that will pass through the source, adding them to it"""
         source_location = source.wp.transform.location
-        if not source.previous_lane_keys:
-            source.previous_lane_keys = [get_lane_key(prev_wp) for prev_wp in source.wp.previous(self._reuse_dist)]
-            source.previous_lane_keys.append(get_lane_key(source.wp))
-
-        for actor in self._all_actors:
-            if actor in source.actors:
+        if not source.previous_lanes:
+            prev_wps = source.wp.previous(self._reuse_dist)
+            source.previous_lanes = [(prev_wp.road_id, prev_wp.lane_id) for prev_wp in prev_wps]
+            source.previous_lanes.append((source.wp.road_id, source.wp.lane_id))
+
+        # Only the actors at those lanes will pass through the source
+        for actor in [a for lane in source.previous_lanes for a in self._actor_index.get_lane_actors(*lane)]:
+            if self._is_actor_in_list(actor, source.actors):
                 continue  # Don't use actors already part of the source
 
             actor_location = CarlaDataProvider.get_location(actor)
@@ -1009,13 +1019,9 @@ class BackgroundBehavior(AtomicBehavior):
             if source_location.distance(actor_location) > self._reuse_dist:
                 continue  # Don't use actors far away
 
-            actor_wp = self._map.get_waypoint(actor_location)
-            if get_lane_key(actor_wp) not in source.previous_lane_keys:
-                continue  # Don't use actors that won't pass through the source
-
             self._actors_speed_perc[actor] = 100
             self._remove_actor_info(actor)
-            source.actors.append(actor)
+            self._add_actor_to_list(source.actors, actor)
 
             at_oppo_entry_lane = get_lane_key(source.entry_lane_wp) in junction.opposite_entry_keys
             self._add_actor_dict_element(junction.actor_dict, actor, at_oppo_entry_lane=at_oppo_entry_lane)
@@ -1110,9 +1116,10 @@ class BackgroundBehavior(AtomicBehavior):
                 speed = self._ego_actor.get_velocity().length()
                 if len(source.actors):
                     speed = min(speed, source.actors[-1].get_velocity().length())
-                actor.set_target_velocity(speed * forward_vec)
+                with CarlaDataProvider.command_batch() as batch:
+                    batch.set_target_velocity(actor, speed * forward_vec)
 
-                source.actors.append(actor)
+                self._add_actor_to_list(source.actors, actor)
 
     ################################
     ## Behavior related functions ##
@@ -1150,6 +1157,7 @@ class BackgroundBehavior(AtomicBehavior):
 
             # Spawn actors
             actors = self._spawn_actors(spawn_wps)
+            self._register_actor_list(actors)
 
             self._road_dict[get_lane_key(wp)] = Source(
                 prev_wp, actors, active=self._active_road_sources
@@ -1294,6 +1302,7 @@ class BackgroundBehavior(AtomicBehavior):
                 for actor in actors:
                     self._add_actor_dict_element(junction.actor_dict, actor, exit_lane_key=exit_lane_key)
                 junction.exit_dict[exit_lane_key]['actors'] = actors
+                self._register_actor_list(actors)
 
     def _update_junction_sources(self):
         """Checks the actor sources to see if new actors have to be created"""
@@ -1334,7 +1343,7 @@ class BackgroundBehavior(AtomicBehavior):
                     if junction.stop_non_route_entries and get_lane_key(source.entry_lane_wp) not in junction.route_entry_keys:
                         self._actors_speed_perc[actor] = 0
                     self._add_actor_dict_element(actor_dict, actor, at_oppo_entry_lane=at_oppo_entry_lane)
-                    source.actors.append(actor)
+                    self._add_actor_to_list(source.actors, actor)
 
     def _monitor_topology_changes(self, prev_index):
         """
@@ -1428,6 +1437,7 @@ class BackgroundBehavior(AtomicBehavior):
                         spawn_wps.insert(0, next_wp)
 
                     actors = self._spawn_actors(spawn_wps)
+                    self._register_actor_list(actors)
 
                     if get_lane_key(source_wp) not in self._road_dict:
                         # Lanes created away from the center won't affect the ids of other lanes, so just add the new id
@@ -1496,8 +1506,9 @@ class BackgroundBehavior(AtomicBehavior):
                 source_actors = []
                 for i, (actor, _) in enumerate(actors_sorted_with_dist):
                     if i >= min_index and i <= max_index:
-                        source_actors.append(actor)
+                        self._add_actor_to_list(source_actors, actor)
                         self._tm.set_path(actor, side_path)
+                        CarlaDataProvider.disable_recycling(actor)
                     else:
                         self._destroy_actor(actor)
 
@@ -1603,8 +1614,8 @@ class BackgroundBehavior(AtomicBehavior):
                     continue
                 self._tm.ignore_lights_percentage(actor, 100)
                 self._tm.ignore_signs_percentage(actor, 100)
-                self._opposite_actors.append(actor)
-                source.actors.append(actor)
+                self._add_actor_to_list(self._opposite_actors, actor)
+                self._add_actor_to_list(source.actors, actor)
 
     def _update_parameters(self):
         """
@@ -1741,27 +1752,29 @@ class BackgroundBehavior(AtomicBehavior):
         """
         Stops all road vehicles in front of the ego. Use `_start_road_front_vehicles` to make them move again.
         """
-        for lane in self._road_dict:
-            for actor in self._road_dict[lane].actors:
-                location = CarlaDataProvider.get_location(actor)
-                if location and not self._is_location_behind_ego(location):
-                    self._scenario_stopped_actors.append(actor)
-                    self._actors_speed_perc[actor] = 0
-                    self._tm.update_vehicle_lights(actor, False)
-                    lights = actor.get_light_state()
-                    lights |= carla.VehicleLightState.Brake
-                    actor.set_light_state(carla.VehicleLightState(lights))
+        with CarlaDataProvider.command_batch() as batch:
+            for lane in self._road_dict:
+                for actor in self._road_dict[lane].actors:
+                    location = CarlaDataProvider.get_location(actor)
+                    if location and not self._is_location_behind_ego(location):
+                        self._add_actor_to_list(self._scenario_stopped_actors, actor)
+                        self._actors_speed_perc[actor] = 0
+                        self._tm.update_vehicle_lights(actor, False)
+                        lights = actor.get_light_state()
+                        lights |= carla.VehicleLightState.Brake
+                        batch.set_light_state(actor, carla.VehicleLightState(lights))
 
     def _start_road_front_vehicles(self):
         """
         Restarts all road vehicles stopped by `_stop_road_front_vehicles`.
         """
-        for actor in self._scenario_stopped_actors:
-            self._actors_speed_perc[actor] = 100
-            self._tm.update_vehicle_lights(actor, True)
-            lights = actor.get_light_state()
-            lights &= ~carla.VehicleLightState.Brake
-            actor.set_light_state(carla.VehicleLightState(lights))
+        with CarlaDataProvider.command_batch() as batch:
+            for actor in self._scenario_stopped_actors:
+                self._actors_speed_perc[actor] = 100
+                self._tm.update_vehicle_lights(actor, True)
+                lights = actor.get_light_state()
+                lights &= ~carla.VehicleLightState.Brake
+                batch.set_light_state(actor, carla.VehicleLightState(lights))
         self._scenario_stopped_actors = []
 
     def _stop_road_back_vehicles(self):
@@ -1773,7 +1786,7 @@ class BackgroundBehavior(AtomicBehavior):
                 location = CarlaDataProvider.get_location(actor)
                 if location and self._is_location_behind_ego(location):
                     self._actors_speed_perc[actor] = 0
-                    self._scenario_stopped_back_actors.append(actor)
+                    self._add_actor_to_list(self._scenario_stopped_back_actors, actor)
 
     def _start_road_back_vehicles(self):
         """
@@ -1785,19 +1798,20 @@ class BackgroundBehavior(AtomicBehavior):
 
     def _move_actors_forward(self, actors, space):
         """Teleports the actors forward a set distance"""
-        for actor in list(actors):
-            location = CarlaDataProvider.get_location(actor)
-            if not location:
-                continue
+        with CarlaDataProvider.command_batch() as batch:
+            for actor in list(actors):
+                location = CarlaDataProvider.get_location(actor)
+                if not location:
+                    continue
 
-            actor_wp = self._map.get_waypoint(location)
-            new_actor_wps = actor_wp.next(space)
-            if len(new_actor_wps) > 0:
-                new_transform = new_actor_wps[0].transform
-                new_transform.location.z += 0.2
-                actor.set_transform(new_transform)
-            else:
-                self._destroy_actor(actor)
+                actor_wp = self._actor_index.get_waypoint(actor, location)
+                new_actor_wps = actor_wp.next(space)
+                if len(new_actor_wps) > 0:
+                    new_transform = new_actor_wps[0].transform
+                    new_transform.location.z += 0.2
+                    batch.set_transform(actor, new_transform)
+                else:
+                    self._destroy_actor(actor)
 
     def _switch_route_sources(self, enabled):
         """
@@ -1847,7 +1861,7 @@ class BackgroundBehavior(AtomicBehavior):
         opposite_loc = opposite_wp.transform.location
 
         for actor in list(self._opposite_actors):
-            location = actor.get_location()
+            location = CarlaDataProvider.get_location(actor)
             if not location:
                 continue
 
@@ -1855,7 +1869,8 @@ class BackgroundBehavior(AtomicBehavior):
             if collision_dist < destruction_dist:
                 self._destroy_actor(actor)
             elif collision_dist < stop_dist:
-                actor.set_target_velocity(carla.Vector3D())
+                with CarlaDataProvider.command_batch() as batch:
+                    batch.set_target_velocity(actor, carla.Vector3D())
 
     def _remove_road_lane(self, lane_wp):
         """Removes a road lane"""
@@ -1921,12 +1936,13 @@ class BackgroundBehavior(AtomicBehavior):
             source_dist += spawn_dist
 
         actors = []
-        for spawn_wp in spawn_wps:
-            actor = self._spawn_actor(spawn_wp)
-            if not actor:
-                continue
-            actor.set_target_velocity(spawn_wp.transform.get_forward_vector() * ego_speed)
-            actors.append(actor)
+        with CarlaDataProvider.command_batch() as batch:
+            for spawn_wp in spawn_wps:
+                actor = self._spawn_actor(spawn_wp)
+                if not actor:
+                    continue
+                batch.set_target_velocity(actor, spawn_wp.transform.get_forward_vector() * ego_speed)
+                self._add_actor_to_list(actors, actor)
 
         self._road_dict[add_lane_key] = Source(prev_wp, actors, active=self._active_road_sources)
 
@@ -2109,12 +2125,15 @@ class BackgroundBehavior(AtomicBehavior):
     def _initialise_actor(self, actor):
         """
         Save the actor into the needed structures, disable its lane changes and set the leading distance.
+        Reused actors are also made to respect the traffic lights and signs again.
         """
+        self._tm.ignore_lights_percentage(actor, 0)
+        self._tm.ignore_signs_percentage(actor, 0)
         self._tm.auto_lane_change(actor, self._vehicle_lane_change)
         self._tm.update_vehicle_lights(actor, self._vehicle_lights)
         self._tm.distance_to_leading_vehicle(actor, self._vehicle_leading_distance)
         self._tm.vehicle_lane_offset(actor, self._vehicle_offset)
-        self._all_actors.append(actor)
+        self._add_actor_to_list(self._all_actors, actor)
 
     def _spawn_actor(self, spawn_wp, ego_dist=0):
         """Spawns an actor"""
@@ -2129,7 +2148,7 @@ class BackgroundBehavior(AtomicBehavior):
 
         actor = CarlaDataProvider.request_new_actor(
             'vehicle.*', spawn_transform, 'background', True,
-            attribute_filter={'base_type': 'car', 'has_lights': True}, tick=False
+            attribute_filter={'base_type': 'car', 'has_lights': True}, tick=False, recycle=self.__class__
         )
 
         if not actor:
@@ -2151,7 +2170,7 @@ class BackgroundBehavior(AtomicBehavior):
 
         actors = CarlaDataProvider.request_new_batch_actors(
             'vehicle.*', len(spawn_transforms), spawn_transforms, True, False, 'background',
-            attribute_filter=self._attribute_filter, tick=False)
+            attribute_filter=self._attribute_filter, tick=False, recycle=self.__class__)
 
         if not actors:
             return actors
@@ -2174,7 +2193,8 @@ class BackgroundBehavior(AtomicBehavior):
         )
         actor = CarlaDataProvider.request_new_actor(
             'vehicle.*', new_transform, rolename='background',
-            autopilot=True, random_location=False, attribute_filter=self._attribute_filter, tick=False)
+            autopilot=True, random_location=False, attribute_filter=self._attribute_filter, tick=False,
+            recycle=self.__class__)
 
         if not actor:
             return actor
@@ -2197,7 +2217,7 @@ class BackgroundBehavior(AtomicBehavior):
         Not applied to those behind it so that they can catch up it
         """
         # Updates their speed
-        scenario_actors = self._scenario_stopped_actors + self._scenario_stopped_back_actors
+        scenario_actors = set(self._scenario_stopped_actors + self._scenario_stopped_back_actors)
         for lane_key in self._road_dict:
             for i, actor in enumerate(self._road_dict[lane_key].actors):
                 location = CarlaDataProvider.get_location(actor)
@@ -2215,20 +2235,21 @@ class BackgroundBehavior(AtomicBehavior):
                     continue
 
                 # TODO: Lane changes are weird with the TM, so just stop them
-                actor_wp = self._map.get_waypoint(location)
+                actor_wp = self._actor_index.get_waypoint(actor, location)
                 if actor_wp.lane_width < self._lane_width_threshold:
 
                     # Ensure only ending lanes are affected. not sure if it is needed though
-                    next_wps = actor_wp.next(0.5)
+                    next_wps = CarlaDataProvider.get_waypoint_cache().next(actor_wp, 0.5)
                     if next_wps and next_wps[0].lane_width < actor_wp.lane_width:
-                        actor.set_target_velocity(carla.Vector3D(0, 0, 0))
                         self._actors_speed_perc[actor] = 0
                         lights = actor.get_light_state()
                         lights |= carla.VehicleLightState.RightBlinker
                         lights |= carla.VehicleLightState.LeftBlinker
                         lights |= carla.VehicleLightState.Position
-                        actor.set_light_state(carla.VehicleLightState(lights))
-                        actor.set_autopilot(False, self._tm_port)
+                        with CarlaDataProvider.command_batch() as batch:
+                            batch.set_target_velocity(actor, carla.Vector3D(0, 0, 0))
+                            batch.set_light_state(actor, carla.VehicleLightState(lights))
+                            batch.set_autopilot(actor, False, self._tm_port)
                         continue
 
                 self._set_road_actor_speed(location, actor)
@@ -2412,7 +2433,7 @@ class BackgroundBehavior(AtomicBehavior):
 
                 # Monitor its entry
                 elif state == JUNCTION_ENTRY:
-                    actor_wp = self._map.get_waypoint(location)
+                    actor_wp = self._actor_index.get_waypoint(actor, location)
                     if self._is_junction(actor_wp) and junction.contains_wp(actor_wp):
                         if junction.clear_middle:
                             self._destroy_actor(actor)  # Don't clutter the junction if a junction scenario is active
@@ -2421,7 +2442,7 @@ class BackgroundBehavior(AtomicBehavior):
 
                 # Monitor its exit and destroy an actor if needed
                 elif state == JUNCTION_MIDDLE:
-                    actor_wp = self._map.get_waypoint(location)
+                    actor_wp = self._actor_index.get_waypoint(actor, location)
                     actor_lane_key = get_lane_key(actor_wp)
                     if not self._is_junction(actor_wp) and actor_lane_key in exit_dict:
                         if i < max_index and actor_lane_key in junction.route_exit_keys:
@@ -2447,7 +2468,7 @@ class BackgroundBehavior(AtomicBehavior):
                             actors = exit_dict[actor_lane_key]['actors']
                             if len(actors) > 0 and len(actors) >= exit_dict[actor_lane_key]['max_actors']:
                                 self._destroy_actor(actors[0])  # This is always the front most vehicle
-                            actors.append(actor)
+                            self._add_actor_to_list(actors, actor)
 
                 # Change them to "road mode" when far enough from the junction
                 elif state == JUNCTION_EXIT:
@@ -2488,7 +2509,7 @@ class BackgroundBehavior(AtomicBehavior):
 
             # Ending / starting lanes create issues as the lane width gradually decreases until reaching 0,
             # where the lane starts / ends. Set their speed to 0, and they'll eventually dissapear.
-            actor_wp = self._map.get_waypoint(location)
+            actor_wp = self._actor_index.get_waypoint(actor, location)
             if actor_wp.lane_width < self._lane_width_threshold:
                 self._actors_speed_perc[actor] = 0
 
@@ -2504,54 +2525,48 @@ class BackgroundBehavior(AtomicBehavior):
 
             # TODO: Fix very high speed traffic
             speed = min(speed, 90)
-            self._tm.set_desired_speed(actor, speed)
 
-    def _remove_actor_info(self, actor):
-        """Removes all the references of the actor"""
+            # The speed is kept by the Traffic Manager, so only send the changes
+            if self._actors_desired_speed.get(actor) != speed:
+                self._tm.set_desired_speed(actor, speed)
+                self._actors_desired_speed[actor] = speed
 
-        for lane in self._road_dict:
-            if actor in self._road_dict[lane].actors:
-                self._road_dict[lane].actors.remove(actor)
-                break
+    def _add_actor_to_list(self, actor_list, actor):
+        """Adds the actor to one of the behavior's lists, remembering it for when the actor is removed"""
+        actor_list.append(actor)
+        self._actor_lists.setdefault(actor.id, []).append(actor_list)
 
-        if actor in self._opposite_actors:
-            self._opposite_actors.remove(actor)
-        if actor in self._scenario_stopped_actors:
-            self._scenario_stopped_actors.remove(actor)
-        if actor in self._scenario_stopped_back_actors:
-            self._scenario_stopped_back_actors.remove(actor)
+    def _register_actor_list(self, actor_list):
+        """Remembers a new list of the behavior, for when its actors are removed"""
+        for actor in actor_list:
+            self._actor_lists.setdefault(actor.id, []).append(actor_list)
 
-        for opposite_source in self._opposite_sources:
-            if actor in opposite_source.actors:
-                opposite_source.actors.remove(actor)
-                break
+    def _is_actor_in_list(self, actor, actor_list):
+        """Checks if the actor is part of the list, without searching it"""
+        return any(other_list is actor_list for other_list in self._actor_lists.get(actor.id, []))
+
+    def _remove_actor_info(self, actor):
+        """Removes all the references of the actor"""
+        # Only the lists the actor was added to are searched.
+        # Some might no longer be used by the behavior, which is harmless
+        for actor_list in self._actor_lists.pop(actor.id, []):
+            if actor in actor_list:
+                actor_list.remove(actor)
 
         for junction in self._active_junctions:
             junction.actor_dict.pop(actor, None)
 
-            for entry_source in junction.entry_sources:
-                if actor in entry_source.actors:
-                    entry_source.actors.remove(actor)
-                    break
-
-            for exit_keys in junction.exit_dict:
-                exit_actors = junction.exit_dict[exit_keys]['actors']
-                if actor in exit_actors:
-                    exit_actors.remove(actor)
-                    break
-
         self._actors_speed_perc.pop(actor, None)
-        if actor in self._all_actors:
-            self._all_actors.remove(actor)
+        self._actors_desired_speed.pop(actor, None)
+        self._actor_index.remove(actor)
 
     def _destroy_actor(self, actor):
-        """Destroy the actor and all its references"""
+        """
+        Removes all the references of the actor, parking it to be reused by the next spawned actor.
+        Actors not spawned by this behavior are destroyed instead
+        """
         self._remove_actor_info(actor)
-        try:
-            actor.set_autopilot(False, self._tm_port)
-            actor.destroy()
-        except RuntimeError:
-            pass
+        CarlaDataProvider.park_actors([actor])
 
     def _update_ego_data(self):
         """
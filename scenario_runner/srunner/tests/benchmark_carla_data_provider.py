@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Micro-benchmark of the per tick cost of the CarlaDataProvider against the amount of registered actors.
+It uses the CARLA mocks, so it has to be run with them in the PYTHONPATH:
+
+    PYTHONPATH=srunner/tests/carla_mocks:. python srunner/tests/benchmark_carla_data_provider.py
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+import carla
+from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+
+
+def register_actors(amount):
+    """
+    Register 'amount' mocked vehicles, with different ids and locations
+    """
+    actors = []
+    for i in range(amount):
+        actor = carla.Vehicle()
+        actor.id = i
+        actor.location = carla.Location(x=i, y=2 * i)
+        actor.transform = carla.Transform(actor.location, carla.Rotation(yaw=i % 360))
+        actor.velocity = carla.Vector3D(x=1.0, y=0.5)
+        actors.append(actor)
+
+    CarlaDataProvider.register_actors(actors, [actor.transform for actor in actors])
+    return actors
+
+
+def simulate_tick(actors, snapshot):
+    """
+    One tick: the provider update, plus one query of each kind per actor, as the criteria
+    and behaviors do with the actors they control
+    """
+    CarlaDataProvider.on_carla_tick(snapshot)
+    for actor in actors:
+        CarlaDataProvider.get_velocity(actor)
+        CarlaDataProvider.get_location(actor)
+        CarlaDataProvider.get_transform(actor)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argparser.add_argument('--actors', default=[10, 50, 100, 200, 500, 1000], type=int, nargs='+',
+                           help='Amounts of registered actors to measure')
+    argparser.add_argument('--ticks', default=200, type=int, help='Ticks measured per amount of actors')
+    argparser.add_argument('--no-snapshot', action='store_true',
+                           help='Refresh the actors with their own getters instead of a world snapshot')
+    args = argparser.parse_args()
+
+    CarlaDataProvider.set_world(carla.Client().get_world())
+
+    print("{:>8} | {:>12} | {:>16} | {:>16}".format("actors", "ms / tick", "us / actor tick", "saved RPCs / tick"))
+    for amount in args.actors:
+        CarlaDataProvider.set_snapshot_refresh(not args.no_snapshot)
+        actors = register_actors(amount)
+        snapshot = None if args.no_snapshot else carla.WorldSnapshot(actors)
+        duration = timeit.timeit(lambda: simulate_tick(actors, snapshot), number=args.ticks) / args.ticks
+        saved_rpcs = CarlaDataProvider.get_saved_rpcs() / args.ticks
+        print("{:>8} | {:>12.3f} | {:>16.3f} | {:>16.1f}".format(
+            amount, 1000 * duration, 1e6 * duration / amount, saved_rpcs))
+        CarlaDataProvider.cleanup()
+        CarlaDataProvider.set_world(carla.Client().get_world())
+
+    CarlaDataProvider.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@ class command:
     def SpawnActor(blueprint, point):
         new_command = command()
         new_command.blueprint = copy.deepcopy(blueprint)
+        new_command.transform = point
         return new_command
 
     def SetSimulatePhysics(blueprint, physics):
@@ -26,13 +27,19 @@ class command:
     def FutureActor():
         return None
 
-    def ApplyTransform():
+    def ApplyTransform(actor, transform):
+        return None
+
+    def ApplyTargetVelocity(actor, velocity):
+        return None
+
+    def ApplyTargetAngularVelocity(actor, angular_velocity):
         return None
 
     def SetAutopilot(actor, autopilot, port):
         return None
 
-    def SetVehicleLightState():
+    def SetVehicleLightState(actor, light_state):
         return None
 
     def DestroyActor(actor):
@@ -122,6 +129,14 @@ class Transform:
         self.rotation = rotation
 
 
+class LaneType:
+    NONE = 1
+    Driving = 2
+    Parking = 16
+    Sidewalk = 32
+    Any = -2
+
+
 class Waypoint():
     transform = Transform(Location(), Rotation())
     road_id = 0
@@ -172,6 +187,10 @@ class WeatherParameters:
     mie_scattering_scale = 0.000000
     rayleigh_scattering_scale = 0.033100
 
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
 
 class WorldSettings:
     synchronous_mode = False
@@ -214,6 +233,7 @@ class Actor:
         self.location = Location()
         self.rotation = Rotation()
         self.transform = Transform(self.location, self.rotation)
+        self.velocity = Vector3D()
         self.is_alive = True
 
     def get_transform(self):
@@ -222,6 +242,9 @@ class Actor:
     def get_location(self):
         return self.location
 
+    def get_velocity(self):
+        return self.velocity
+
     def get_world(self):
         return World()
 
@@ -243,12 +266,42 @@ class Vehicle(Actor):
     is_vehicle = True
 
 
+class VehicleLightState:
+    NONE = 0
+
+
+class ActorSnapshot:
+
+    def __init__(self, actor):
+        self.id = actor.id
+        self._velocity = actor.get_velocity()
+        self._transform = actor.get_transform()
+
+    def get_velocity(self):
+        return self._velocity
+
+    def get_transform(self):
+        return self._transform
+
+
+class WorldSnapshot:
+
+    def __init__(self, actors):
+        self._actors = {actor.id: ActorSnapshot(actor) for actor in actors if actor.is_alive}
+
+    def find(self, actor_id):
+        return self._actors.get(actor_id)
+
+
 class World:
     actors = []
 
     def get_settings(self):
         return WorldSettings()
 
+    def get_snapshot(self):
+        return WorldSnapshot(self.actors)
+
     def get_map(self):
         return Map()
 
@@ -290,6 +343,9 @@ class Client:
     def get_trafficmanager(self, port):
         return None
 
+    def apply_batch(self, batch):
+        pass
+
     def apply_batch_sync(self, batch, sync_mode=False):
         class Response:
             def __init__(self, id):
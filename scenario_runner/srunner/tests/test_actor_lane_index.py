@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the index of the actors by lane
+"""
+
+import math
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import carla
+from srunner.scenariomanager.actor_lane_index import ActorLaneIndex
+from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+
+
+class Location(carla.Location):
+    """Location of the mocks, with a real distance"""
+
+    def distance(self, other):
+        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2 + (self.z - other.z) ** 2)
+
+
+def make_waypoint(location):
+    """Returns a waypoint like object, with the lane given by the y coordinate and s by the x one"""
+    return SimpleNamespace(road_id=1, lane_id=-1 if location.y < 3.5 else -2, s=location.x)
+
+
+class TestActorLaneIndex(TestCase):
+    """
+    Test class for the ActorLaneIndex
+    """
+
+    def setUp(self):
+        self.index = ActorLaneIndex()
+        self.actors = []
+        for i in range(4):
+            actor = carla.Vehicle()
+            actor.id = 300 + i
+            self.actors.append(actor)
+
+        patcher = patch.object(CarlaDataProvider, 'get_waypoint', side_effect=make_waypoint)
+        self.get_waypoint = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sorted_lanes(self):
+        """
+        The actors of each lane are sorted by s, and can be limited to part of the lane
+        """
+        for actor, x, y in zip(self.actors, (30, 10, 20, 15), (0, 0, 0, 5)):
+            self.index.update(actor, Location(x=x, y=y))
+
+        self.assertEqual(self.index.get_lane_actors(1, -1), [self.actors[1], self.actors[2], self.actors[0]])
+        self.assertEqual(self.index.get_lane_actors(1, -1, min_s=10, max_s=20), [self.actors[1], self.actors[2]])
+        self.assertEqual(self.index.get_lane_actors(1, -1, min_s=21), [self.actors[0]])
+        self.assertEqual(self.index.get_lane_actors(1, -2), [self.actors[3]])
+        self.assertEqual(self.index.get_lane_actors(2, -1), [])
+        self.assertEqual(self.index.get_lane(self.actors[3]), (1, -2))
+        self.assertEqual(len(self.index), 4)
+
+    def test_incremental_updates(self):
+        """
+        Waypoints are only computed again once the actor moves, changing its place at the index
+        """
+        waypoint = self.index.update(self.actors[0], Location(x=10))
+        self.index.update(self.actors[1], Location(x=20))
+        self.assertIs(self.index.get_waypoint(self.actors[0], Location(x=10.05)), waypoint)
+        self.assertEqual(self.get_waypoint.call_count, 2)
+
+        # Overtakes the other actor and changes lane
+        self.index.update(self.actors[0], Location(x=25))
+        self.assertEqual(self.index.get_lane_actors(1, -1), [self.actors[1], self.actors[0]])
+        self.index.update(self.actors[0], Location(x=25, y=5))
+        self.assertEqual(self.index.get_lane_actors(1, -1), [self.actors[1]])
+        self.assertEqual(self.index.get_lane_actors(1, -2), [self.actors[0]])
+        self.assertEqual(self.get_waypoint.call_count, 4)
+
+    def test_update_actors(self):
+        """
+        All actors are updated from their locations, keeping the last one of those without it
+        """
+        locations = {self.actors[0].id: Location(x=5), self.actors[1].id: Location(x=8, y=5)}
+        with patch.object(CarlaDataProvider, 'get_location', side_effect=lambda a: locations.get(a.id)):
+            self.index.update_actors(self.actors)
+
+        self.assertEqual(len(self.index), 2)
+        self.assertIn(self.actors[1], self.index)
+        self.assertNotIn(self.actors[2], self.index)
+        self.assertIsNone(self.index.get_lane(self.actors[2]))
+
+    def test_remove_and_clear(self):
+        """
+        Removed actors are no longer part of their lane
+        """
+        for actor, x in zip(self.actors, (5, 5, 8, 12)):
+            self.index.update(actor, Location(x=x))
+
+        self.index.remove(self.actors[1])
+        self.index.remove(self.actors[1])
+        self.assertEqual(self.index.get_lane_actors(1, -1), [self.actors[0], self.actors[2], self.actors[3]])
+
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.get_lane_actors(1, -1), [])
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the actor information buffered by the CarlaDataProvider
+"""
+
+from unittest import TestCase
+import carla
+from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+
+
+class CountingBlueprintLibrary(object):
+    """
+    Blueprint library whose filter() calls are counted
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.filter_calls = 0
+
+    def filter(self, model):
+        self.filter_calls += 1
+        return [self.find(blueprint_id) for blueprint_id in self.ids if blueprint_id.startswith(model.rstrip('*'))]
+
+    def find(self, blueprint_id):
+        blueprint = carla.CarlaBluePrint()
+        blueprint.id = blueprint_id
+        return blueprint
+
+
+class CountingClient(carla.Client):
+    """
+    Client whose command batches are counted
+    """
+
+    def __init__(self):
+        self.batches = 0
+
+    def apply_batch_sync(self, batch, sync_mode=False):
+        self.batches += 1
+        return super(CountingClient, self).apply_batch_sync(batch, sync_mode)
+
+
+class TestCarlaDataProvider(TestCase):
+    """
+    Test class for the actor state lookups of the CarlaDataProvider
+    """
+
+    def setUp(self):
+        CarlaDataProvider.set_world(carla.Client().get_world())
+        self.actors = []
+        for i in range(5):
+            actor = carla.Vehicle()
+            actor.id = 100 + i
+            actor.location = carla.Location(x=i)
+            actor.transform = carla.Transform(actor.location, carla.Rotation(yaw=10 * i))
+            actor.velocity = carla.Vector3D(x=3.0 * i, y=4.0 * i)
+            self.actors.append(actor)
+        CarlaDataProvider.register_actors(self.actors)
+
+    def tearDown(self):
+        CarlaDataProvider.cleanup()
+
+    def test_lookups_after_tick(self):
+        """
+        The buffered information matches the actors after a tick
+        """
+        CarlaDataProvider.on_carla_tick()
+        for i, actor in enumerate(self.actors):
+            self.assertAlmostEqual(CarlaDataProvider.get_velocity(actor), 5.0 * i)
+            self.assertEqual(CarlaDataProvider.get_location(actor).x, i)
+            self.assertEqual(CarlaDataProvider.get_transform(actor).rotation.yaw, 10 * i)
+
+    def test_unknown_actor(self):
+        """
+        Unregistered actors are not found, but don't raise
+        """
+        actor = carla.Vehicle()
+        actor.id = 1
+        self.assertEqual(CarlaDataProvider.get_velocity(actor), 0.0)
+        self.assertIsNone(CarlaDataProvider.get_location(actor))
+        self.assertIsNone(CarlaDataProvider.get_transform(actor))
+
+    def test_register_twice(self):
+        """
+        Registering an actor id twice raises
+        """
+        with self.assertRaises(KeyError):
+            CarlaDataProvider.register_actor(self.actors[0])
+
+    def test_snapshot_refresh(self):
+        """
+        Actors are read from the snapshot, and the ones missing from it use their own getters
+        """
+        snapshot = carla.WorldSnapshot(self.actors[1:])
+        self.actors[0].location = carla.Location(x=-1)
+        self.actors[0].transform = carla.Transform(self.actors[0].location, carla.Rotation())
+
+        CarlaDataProvider.on_carla_tick(snapshot)
+        self.assertEqual(CarlaDataProvider.get_saved_rpcs(), 2 * (len(self.actors) - 1))
+        for i, actor in enumerate(self.actors):
+            self.assertEqual(CarlaDataProvider.get_location(actor).x, -1 if i == 0 else i)
+            self.assertAlmostEqual(CarlaDataProvider.get_velocity(actor), 5.0 * i)
+
+    def test_no_snapshot_refresh(self):
+        """
+        Without the snapshot refresh, the given snapshot is ignored
+        """
+        CarlaDataProvider.set_snapshot_refresh(False)
+        try:
+            CarlaDataProvider.on_carla_tick(carla.WorldSnapshot(self.actors))
+        finally:
+            CarlaDataProvider.set_snapshot_refresh(True)
+        self.assertEqual(CarlaDataProvider.get_saved_rpcs(), 0)
+        self.assertEqual(CarlaDataProvider.get_transform(self.actors[3]).rotation.yaw, 30)
+
+    def test_blueprint_index(self):
+        """
+        The blueprint library is only filtered once per model, and each blueprint is a new copy
+        """
+        library = CountingBlueprintLibrary(['vehicle.a', 'vehicle.b', 'walker.c'])
+        CarlaDataProvider._blueprint_library = library  # pylint: disable=protected-access
+
+        blueprints = [CarlaDataProvider.create_blueprint('vehicle.*', 'background') for _ in range(5)]
+        self.assertEqual(library.filter_calls, 1)
+        self.assertEqual(CarlaDataProvider.get_blueprint_ids('vehicle.*'), ['vehicle.a', 'vehicle.b'])
+        self.assertTrue(all(bp.id in ('vehicle.a', 'vehicle.b') for bp in blueprints))
+        self.assertTrue(all(bp.attributes['role_name'] == 'background' for bp in blueprints))
+        self.assertEqual(len({id(bp) for bp in blueprints}), 5)
+
+        # Unknown models use the default one of their category
+        blueprint = CarlaDataProvider.create_blueprint('walker.x', actor_category='trailer')
+        self.assertIn(blueprint.id, ['vehicle.a', 'vehicle.b'])
+
+    def test_actor_recycling(self):
+        """
+        Parked actors are reused by the requests of the same owner, model, filter and rolename, with one batch each
+        """
+        client = CountingClient()
+        CarlaDataProvider.set_client(client)
+        world = CarlaDataProvider.get_world()
+        world.get_actors = lambda ids=None: carla.ActorList([a for a in world.actors if ids is None or a.id in ids])
+        self.addCleanup(delattr, world, 'get_actors')
+
+        actor = CarlaDataProvider.request_new_actor('vehicle.*', carla.Transform(), tick=False, recycle='flow')
+        other = CarlaDataProvider.request_new_actor('vehicle.*', carla.Transform(), tick=False)
+        self.assertIn(actor, CarlaDataProvider.get_all_actors())
+        CarlaDataProvider.park_actors([actor, other])
+        CarlaDataProvider.park_actors([actor])
+        self.assertEqual(client.batches, 1)
+        self.assertEqual(CarlaDataProvider.get_actor_recycling_stats(), {'recycled': 0, 'parked': 1})
+
+        # Parked actors aren't updated nor listed
+        CarlaDataProvider.on_carla_tick()
+        self.assertNotIn(actor.id, CarlaDataProvider._registered_actors)  # pylint: disable=protected-access
+        self.assertIsNone(CarlaDataProvider.get_all_actors().find(actor.id))
+
+        # Only the requests with the same parameters reuse the actor
+        background_actor = CarlaDataProvider.request_new_actor(
+            'vehicle.*', carla.Transform(), rolename='background', tick=False, recycle='flow')
+        self.assertIsNot(background_actor, actor)
+        other_owner_actor = CarlaDataProvider.request_new_actor(
+            'vehicle.*', carla.Transform(), tick=False, recycle='other flow')
+        self.assertIsNot(other_owner_actor, actor)
+
+        spawn_points = [carla.Transform(carla.Location(x=20)), carla.Transform(carla.Location(x=30))]
+        actors = CarlaDataProvider.request_new_batch_actors(
+            'vehicle.*', 2, spawn_points, tick=False, recycle='flow')
+        self.assertIs(actors[0], actor)
+        self.assertIsNot(actors[1], actor)
+        self.assertEqual(CarlaDataProvider.get_location(actor).x, 20)
+        self.assertIn(actor, CarlaDataProvider.get_all_actors())
+        self.assertEqual(CarlaDataProvider.get_actor_recycling_stats(), {'recycled': 1, 'parked': 0})
+
+        # Actors whose recycling is disabled are destroyed instead
+        CarlaDataProvider.disable_recycling(actor)
+        CarlaDataProvider.park_actors([actor])
+        self.assertEqual(CarlaDataProvider.get_actor_recycling_stats(), {'recycled': 1, 'parked': 0})
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the batch of actor commands
+"""
+
+from unittest import TestCase
+
+import carla
+from srunner.scenariomanager.carla_data_provider import CarlaDataProvider
+
+
+class RecordingClient(carla.Client):
+    """
+    Client keeping the applied command batches
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def apply_batch(self, batch):
+        self.batches.append(batch)
+
+
+class TestCommandBatch(TestCase):
+    """
+    Test class for the CommandBatch of the CarlaDataProvider
+    """
+
+    def setUp(self):
+        self.client = RecordingClient()
+        CarlaDataProvider.set_client(self.client)
+        self.actors = []
+        for i in range(3):
+            actor = carla.Vehicle()
+            actor.id = 200 + i
+            self.actors.append(actor)
+
+    def tearDown(self):
+        CarlaDataProvider.cleanup()
+
+    def test_nested_contexts(self):
+        """
+        The commands of nested contexts are applied with one batch, when the outermost one exits
+        """
+        with CarlaDataProvider.command_batch():
+            for actor in self.actors:
+                with CarlaDataProvider.command_batch() as batch:
+                    batch.set_target_velocity(actor, carla.Vector3D())
+                    batch.set_autopilot(actor, False, 8000)
+            self.assertEqual(self.client.batches, [])
+
+        self.assertEqual(len(self.client.batches), 1)
+        self.assertEqual(len(self.client.batches[0]), 6)
+        self.assertEqual(CarlaDataProvider.command_batch().get_stats(), {'commands': 6, 'batches': 1})
+
+        # Empty batches aren't sent
+        with CarlaDataProvider.command_batch():
+            pass
+        self.assertEqual(len(self.client.batches), 1)
+
+        CarlaDataProvider.command_batch().reset_stats()
+        self.assertEqual(CarlaDataProvider.command_batch().get_stats(), {'commands': 0, 'batches': 0})
+
+    def test_discard(self):
+        """
+        The pending commands of the discarded actors aren't applied
+        """
+        with CarlaDataProvider.command_batch() as batch:
+            for actor in self.actors:
+                batch.set_transform(actor, carla.Transform())
+            batch.discard([self.actors[0].id, self.actors[2].id])
+
+        self.assertEqual(len(self.client.batches[0]), 1)
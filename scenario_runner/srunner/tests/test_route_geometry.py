@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the vectorized route geometry
+"""
+
+import math
+from unittest import TestCase
+
+import carla
+from srunner.tools.route_geometry import RouteGeometry, get_route_geometry
+
+
+class TestRouteGeometry(TestCase):
+    """
+    Test class for the RouteGeometry queries, on a route that goes 10 meters along x and then 10 along y
+    """
+
+    def setUp(self):
+        self.route = []
+        for i in range(11):
+            self.route.append((carla.Transform(carla.Location(x=i), carla.Rotation(yaw=0)), None))
+        for i in range(1, 11):
+            self.route.append((carla.Transform(carla.Location(x=10, y=i), carla.Rotation(yaw=90)), None))
+        self.geometry = RouteGeometry(self.route)
+
+    def test_accumulated_distance(self):
+        """
+        The accumulated meters and percentages increase one meter per point
+        """
+        self.assertEqual(len(self.geometry), 21)
+        self.assertAlmostEqual(self.geometry.length, 20)
+        self.assertAlmostEqual(self.geometry.accum_meters[15], 15)
+        self.assertAlmostEqual(self.geometry.get_accumulated_percentages()[5], 25)
+        self.assertAlmostEqual(self.geometry.distance(9, 12), math.sqrt(5))
+
+    def test_passed_indices(self):
+        """
+        Points are passed when the location is ahead of them, in their direction
+        """
+        location = carla.Location(x=10.5, y=1.5)
+        self.assertEqual(self.geometry.get_passed_indices(location, 8, 14), [8, 9, 10, 11])
+        self.assertEqual(self.geometry.get_last_passed_index(location, 8, 14), 11)
+        self.assertIsNone(self.geometry.get_last_passed_index(location, 12, 14))
+        self.assertEqual(self.geometry.get_passed_indices(location, 19, 40), [])
+
+    def test_closest_index(self):
+        """
+        The closest point is searched in 2D, and only within the given window
+        """
+        index, distance = self.geometry.get_closest_index(carla.Location(x=3.2, z=50), 0, 21)
+        self.assertEqual(index, 3)
+        self.assertAlmostEqual(distance, 0.2)
+        self.assertEqual(self.geometry.get_closest_index(carla.Location(x=3.2), 6, 9)[0], 6)
+        self.assertEqual(self.geometry.get_closest_index(carla.Location(x=3.2), 30, 40), (-1, float('inf')))
+
+    def test_transform_close(self):
+        """
+        Transforms are close to the route if both their position and yaw match one of the points
+        """
+        self.assertTrue(self.geometry.is_transform_close(
+            carla.Transform(carla.Location(x=10.5, y=5), carla.Rotation(yaw=95)), 2.0, 10))
+        self.assertTrue(self.geometry.is_transform_close(
+            carla.Transform(carla.Location(x=4, y=1), carla.Rotation(yaw=355)), 2.0, 10))
+        self.assertFalse(self.geometry.is_transform_close(
+            carla.Transform(carla.Location(x=10.5, y=5), carla.Rotation(yaw=180)), 2.0, 10))
+        self.assertFalse(self.geometry.is_transform_close(
+            carla.Transform(carla.Location(x=4, y=3), carla.Rotation(yaw=0)), 2.0, 10))
+
+    def test_shared_geometry(self):
+        """
+        The geometry is shared between the users of the same route
+        """
+        geometry = get_route_geometry(self.route)
+        self.assertIs(get_route_geometry(self.route), geometry)
+        self.assertIsNot(get_route_geometry(list(self.route)), geometry)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the manifest of the scenario registry
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from srunner.tools.scenario_registry import ScenarioRegistry, build_scenario_manifest
+
+
+class TestScenarioRegistry(TestCase):
+    """
+    Test class for the scenario manifest, which is built without importing the scenario modules
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        modules = {
+            'first.py': "class Helper(object):\n    pass\n\nclass First(BasicScenario):\n    pass\n",
+            'second.py': "import first\n\nclass Second(first.First):\n    pass\n\nclass Third(Second):\n    pass\n",
+            'other.txt': "class NotAModule(BasicScenario):\n    pass\n",
+        }
+        for name, source in modules.items():
+            with open(os.path.join(self.folder, name), 'w', encoding='utf-8') as fd:
+                fd.write(source)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_manifest(self):
+        """
+        Only the classes inheriting from BasicScenario are part of the manifest
+        """
+        manifest = build_scenario_manifest(self.folder)
+        self.assertEqual(manifest, {'First': 'first', 'Second': 'second', 'Third': 'second'})
+
+    def test_save_and_load(self):
+        """
+        A saved manifest is loaded back as is, and unknown scenarios raise a KeyError
+        """
+        path = os.path.join(self.folder, 'manifest.json')
+        ScenarioRegistry.from_folder(self.folder).save(path)
+        registry = ScenarioRegistry.from_file(path)
+
+        self.assertEqual(len(registry), 3)
+        self.assertIn('Third', registry)
+        self.assertEqual(registry.get_module_name('Third'), 'second')
+        with self.assertRaises(KeyError):
+            registry['Helper']  # pylint: disable=pointless-statement
+
+    def test_scenarios_folder(self):
+        """
+        The scenarios of the repository are found through intermediate classes
+        """
+        manifest = build_scenario_manifest()
+        self.assertEqual(manifest['SignalizedJunctionLeftTurn'], 'signalized_junction_left_turn')
+        self.assertNotIn('BasicScenario', manifest)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides some basic unit tests for the waypoint cache
+"""
+
+from unittest import TestCase
+
+import carla
+from srunner.scenariomanager.waypoint_cache import WaypointCache
+
+
+class CountingWaypoint(object):
+    """
+    Waypoint whose next() calls are counted
+    """
+
+    def __init__(self, carla_map, location, lane_type):
+        self.id = hash((round(location.x), round(location.y)))
+        self.location = location
+        self.lane_type = lane_type
+        self._map = carla_map
+
+    def next(self, distance):
+        self._map.calls += 1
+        return [CountingWaypoint(self._map, carla.Location(self.location.x + distance, self.location.y),
+                                 self.lane_type)]
+
+
+class CountingMap(object):
+    """
+    Map whose get_waypoint() calls are counted
+    """
+    name = "Town01"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_waypoint(self, location, project_to_road=True, lane_type=carla.LaneType.Driving):
+        self.calls += 1
+        return CountingWaypoint(self, location, lane_type)
+
+
+class TestWaypointCache(TestCase):
+    """
+    Test class for the WaypointCache
+    """
+
+    def test_get_waypoint(self):
+        """
+        Locations of the same cell and lane type share their waypoint
+        """
+        carla_map = CountingMap()
+        cache = WaypointCache(carla_map, resolution=0.1)
+
+        waypoint = cache.get_waypoint(carla.Location(10.01, 5.0, 0.0))
+        self.assertIs(cache.get_waypoint(carla.Location(10.03, 4.99, 0.0)), waypoint)
+        self.assertIsNot(cache.get_waypoint(carla.Location(10.2, 5.0, 0.0)), waypoint)
+        parking = cache.get_waypoint(carla.Location(10.01, 5.0, 0.0), lane_type=carla.LaneType.Parking)
+        self.assertEqual(parking.lane_type, carla.LaneType.Parking)
+
+        self.assertEqual(carla_map.calls, 3)
+        stats = cache.get_stats()['get_waypoint']
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 3, 3))
+        self.assertAlmostEqual(stats['hit_rate'], 0.25)
+
+    def test_next(self):
+        """
+        The next waypoints are cached by waypoint id and distance
+        """
+        carla_map = CountingMap()
+        cache = WaypointCache(carla_map)
+        waypoint = cache.get_waypoint(carla.Location(0, 0, 0))
+
+        next_waypoints = cache.next(waypoint, 2.0)
+        self.assertIs(cache.next(waypoint, 2.0), next_waypoints)
+        self.assertEqual(cache.next(waypoint, 4.0)[0].location.x, 4.0)
+        self.assertEqual(carla_map.calls, 3)
+        self.assertEqual(cache.get_stats()['next']['hits'], 1)
+
+    def test_lru(self):
+        """
+        The least recently used cells are evicted first
+        """
+        carla_map = CountingMap()
+        cache = WaypointCache(carla_map, resolution=1.0, max_size=2)
+        first = cache.get_waypoint(carla.Location(0, 0, 0))
+        cache.get_waypoint(carla.Location(10, 0, 0))
+        cache.get_waypoint(carla.Location(0, 0, 0))
+        cache.get_waypoint(carla.Location(20, 0, 0))
+
+        self.assertIs(cache.get_waypoint(carla.Location(0, 0, 0)), first)
+        cache.get_waypoint(carla.Location(10, 0, 0))
+        self.assertEqual(carla_map.calls, 4)
+
+        cache.reset_stats()
+        self.assertEqual(cache.get_stats()['get_waypoint'], {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'size': 2})
+
+        cache.clear()
+        self.assertEqual(cache.get_stats()['get_waypoint']['size'], 0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Vectorized geometry of a route, shared by all the criteria and behaviors that follow the ego's
+progress through it, so that each of them doesn't loop over the route transforms on its own.
+"""
+
+import numpy as np
+
+
+class RouteGeometry(object):
+
+    """
+    Numpy arrays with the positions, yaws (degrees), forward vectors and accumulated
+    distance (meters) of each point of the route, plus the queries done over them
+    """
+
+    def __init__(self, route):
+        """
+        Parameters:
+        - route: list of (carla.Transform, RoadOption) pairs, as returned by interpolate_trajectory
+        """
+        self.positions = np.array([[t.location.x, t.location.y, t.location.z] for t, _ in route],
+                                  dtype=np.float64).reshape(-1, 3)
+        self.yaws = np.array([t.rotation.yaw for t, _ in route], dtype=np.float64)
+        pitches = np.radians([t.rotation.pitch for t, _ in route])
+        yaws = np.radians(self.yaws)
+
+        # Same as carla.Rotation.get_forward_vector()
+        self.forward_vectors = np.stack([np.cos(pitches) * np.cos(yaws),
+                                         np.cos(pitches) * np.sin(yaws),
+                                         np.sin(pitches)], axis=1).reshape(-1, 3)
+
+        steps = np.linalg.norm(np.diff(self.positions, axis=0), axis=1)
+        self.accum_meters = np.concatenate([[0.0], np.cumsum(steps)])
+        self.length = float(self.accum_meters[-1]) if len(self.accum_meters) else 0.0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get_accumulated_percentages(self):
+        """
+        Returns the percentage of the route completed at each of its points
+        """
+        if self.length <= 0:
+            return np.zeros(len(self))
+        return self.accum_meters / self.length * 100
+
+    def distance(self, start_index, end_index):
+        """
+        Straight line distance between two route points
+        """
+        return float(np.linalg.norm(self.positions[end_index] - self.positions[start_index]))
+
+    def get_passed_indices(self, location, start_index, end_index):
+        """
+        Returns the indices in [start_index, end_index) whose points have been passed by the location,
+        that is, the location is ahead of the point, in the direction of the route
+        """
+        end_index = min(end_index, len(self))
+        if start_index >= end_index:
+            return []
+
+        offsets = np.array([location.x, location.y, location.z]) - self.positions[start_index:end_index]
+        passed = np.einsum('ij,ij->i', offsets, self.forward_vectors[start_index:end_index]) > 0
+        return (start_index + np.flatnonzero(passed)).tolist()
+
+    def get_last_passed_index(self, location, start_index, end_index):
+        """
+        Returns the highest index in [start_index, end_index) passed by the location, None if there is none
+        """
+        passed = self.get_passed_indices(location, start_index, end_index)
+        return passed[-1] if passed else None
+
+    def get_closest_index(self, location, start_index, end_index):
+        """
+        Returns the index in [start_index, end_index) of the point closest to the location in 2D,
+        the last one in case of a tie, along with the distance to it. (-1, inf) if the range is empty
+        """
+        end_index = min(end_index, len(self))
+        if start_index >= end_index:
+            return -1, float('inf')
+
+        offsets = self.positions[start_index:end_index, :2] - np.array([location.x, location.y])
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        closest = len(distances) - 1 - int(np.argmin(distances[::-1]))
+        return start_index + closest, float(distances[closest])
+
+    def is_transform_close(self, transform, dist_threshold, angle_threshold):
+        """
+        Checks if any route point is closer than 'dist_threshold' to the transform, with a difference
+        in yaw smaller than 'angle_threshold'. The height difference is signed, as in the trigger points,
+        which are defined above the route
+        """
+        if len(self) == 0:
+            return False
+
+        location = transform.location
+        dxy = np.hypot(location.x - self.positions[:, 0], location.y - self.positions[:, 1])
+        dz = location.z - self.positions[:, 2]
+        dyaw = (float(transform.rotation.yaw) - self.yaws) % 360
+
+        close = (dz < dist_threshold) & (dxy < dist_threshold) \
+            & ((dyaw < angle_threshold) | (dyaw > (360 - angle_threshold)))
+        return bool(close.any())
+
+
+_CACHED_ROUTE = None
+_CACHED_GEOMETRY = None
+
+
+def get_route_geometry(route):
+    """
+    Returns the RouteGeometry of the route. The one of the last route is kept, so all the users of
+    the same route list share it
+    """
+    global _CACHED_ROUTE, _CACHED_GEOMETRY  # pylint: disable=global-statement
+    if route is not _CACHED_ROUTE or len(route) != len(_CACHED_GEOMETRY):
+        _CACHED_GEOMETRY = RouteGeometry(route)
+        _CACHED_ROUTE = route
+    return _CACHED_GEOMETRY
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+Registry of the scenario classes available at the 'srunner/scenarios' folder.
+
+The classes are found by parsing the source of the scenario modules instead of importing them,
+resulting in a manifest of class name to module name, which is built once per process and can also
+be stored as a json file. Modules are only imported the first time one of their scenarios is requested.
+"""
+
+from __future__ import print_function
+
+import ast
+import importlib
+import json
+import os
+
+SCENARIOS_PACKAGE = 'srunner.scenarios'
+SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scenarios')
+BASE_SCENARIO_CLASS = 'BasicScenario'
+
+
+def build_scenario_manifest(scenarios_dir=SCENARIOS_DIR):
+    """
+    Parses all the modules of the folder, returning a dictionary with the module name of each class
+    that inherits from BasicScenario, either directly or through other classes of the folder
+    """
+    class_bases = {}
+    for file_name in sorted(os.listdir(scenarios_dir)):
+        module_name, extension = os.path.splitext(file_name)
+        if extension != '.py' or module_name == '__init__':
+            continue
+
+        with open(os.path.join(scenarios_dir, file_name), 'rb') as fd:
+            tree = ast.parse(fd.read(), filename=file_name)
+
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = set()
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    bases.add(base.id)
+                elif isinstance(base, ast.Attribute):
+                    bases.add(base.attr)
+            class_bases[node.name] = (module_name, bases)
+
+    # Propagate the inheritance until no more scenario classes are found
+    scenario_classes = {BASE_SCENARIO_CLASS}
+    while True:
+        new_classes = {name for name, (_, bases) in class_bases.items()
+                       if name not in scenario_classes and bases & scenario_classes}
+        if not new_classes:
+            break
+        scenario_classes |= new_classes
+
+    return {name: module_name for name, (module_name, _) in class_bases.items()
+            if name in scenario_classes and name != BASE_SCENARIO_CLASS}
+
+
+class ScenarioRegistry(object):
+
+    """
+    Dictionary-like access to the scenario classes, by their name. Raises a KeyError for unknown names
+    """
+
+    def __init__(self, manifest):
+        """
+        Parameters:
+        - manifest: dictionary with the name of the module of each scenario class
+        """
+        self._manifest = dict(manifest)
+        self._classes = {}
+
+    @classmethod
+    def from_folder(cls, scenarios_dir=SCENARIOS_DIR):
+        """
+        Creates the registry by parsing the scenario modules of the folder
+        """
+        return cls(build_scenario_manifest(scenarios_dir))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Creates the registry from a manifest saved with save()
+        """
+        with open(path, 'r', encoding='utf-8') as fd:
+            return cls(json.load(fd))
+
+    def save(self, path):
+        """
+        Writes the manifest to a json file
+        """
+        with open(path, 'w', encoding='utf-8') as fd:
+            json.dump(self._manifest, fd, indent=2, sort_keys=True)
+
+    def __contains__(self, name):
+        return name in self._manifest
+
+    def __getitem__(self, name):
+        if name not in self._classes:
+            module_name = self._manifest[name]
+
+            # Imported here, as it brings in all the atomics, which the manifest doesn't need
+            from srunner.scenarios.basic_scenario import BasicScenario  # pylint: disable=import-outside-toplevel
+
+            module = importlib.import_module('{}.{}'.format(SCENARIOS_PACKAGE, module_name))
+            scenario_class = getattr(module, name)
+            if not issubclass(scenario_class, BasicScenario):
+                raise KeyError("'{}' isn't a scenario class".format(name))
+            self._classes[name] = scenario_class
+        return self._classes[name]
+
+    def __len__(self):
+        return len(self._manifest)
+
+    def keys(self):
+        """
+        Returns the names of all the scenario classes
+        """
+        return self._manifest.keys()
+
+    def get_module_name(self, name):
+        """
+        Returns the name of the module with the scenario class
+        """
+        return self._manifest[name]
+
+
+_REGISTRY = None
+
+
+def get_scenario_registry():
+    """
+    Returns the registry of the 'srunner/scenarios' folder, creating it the first time it is requested.
+    If the SCENARIO_MANIFEST environment variable points to an existing manifest file, it is used instead
+    """
+    global _REGISTRY  # pylint: disable=global-statement
+    if _REGISTRY is None:
+        manifest_path = os.getenv('SCENARIO_MANIFEST')
+        if manifest_path and os.path.isfile(manifest_path):
+            _REGISTRY = ScenarioRegistry.from_file(manifest_path)
+        else:
+            _REGISTRY = ScenarioRegistry.from_folder()
+    return _REGISTRY
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ARGPARSER = argparse.ArgumentParser(description="Writes the manifest of the 'srunner/scenarios' folder, "
+                                                    "to be used through the SCENARIO_MANIFEST environment variable")
+    ARGPARSER.add_argument('path', help='Path of the json manifest')
+    ScenarioRegistry.from_folder().save(ARGPARSER.parse_args().path)